@@ -1,23 +1,77 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from configuration.config import Config
 from models.user_model import db
 from routes.auth_routes import auth_bp
-from flask_jwt_extended import JWTManager
 from flask_mail import Mail
 from sqlalchemy import text
+from utils.hashing_executor import init_hashing_executor, HashingUnavailable
+from utils.user_utils import calibrate_bcrypt_rounds
+from utils.password_policy import init_password_policy
+from utils.password_hashers import init_password_hasher
+from utils.auth_utils import init_refresh_token_cache, init_token_version_cache, init_verification_tokens, get_user_token_version
+from utils.token_store import init_token_store
+from utils.user_cache import init_user_cache
+from utils.email_filter import init_email_filter
+from utils.token_denylist import init_access_token_denylist
+from utils.jwt_keys import init_jwt_keys
+from utils.jwt_decode_cache import CachingJWTManager, init_jwt_decode_cache
+from utils.json_provider import init_json_provider
+from utils.db_routing import init_replica_router
+from utils.db_pool import init_db_pool, pool_stats
+from commands import register_commands
+from services.token_reaper import TokenReaper
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # PICK THE BCRYPT COST THAT HITS THE TARGET LATENCY ON THIS HARDWARE
+    if app.config.get('PASSWORD_HASHER', 'bcrypt') == 'bcrypt' and not app.config.get('BCRYPT_ROUNDS'):
+        app.config['BCRYPT_ROUNDS'] = calibrate_bcrypt_rounds(
+            target_ms=app.config.get('BCRYPT_TARGET_MS', 250),
+            min_rounds=app.config.get('BCRYPT_MIN_ROUNDS', 10)
+        )
+
+    init_password_hasher(app)  # UNKNOWN ALGORITHM OR MISSING argon2-cffi FAILS HERE, NOT ON FIRST LOGIN
+
     # Initialize extensions
+    init_json_provider(app)  # ORJSON WHEN INSTALLED, STDLIB OTHERWISE
+    init_db_pool(app)  # POOL SIZING FROM DB_POOL_*, PGBOUNCER COMPATIBILITY
     db.init_app(app)
-    jwt = JWTManager(app)
+    init_replica_router(app)  # NONE WITHOUT SQLALCHEMY_REPLICA_URIS
+    jwt = CachingJWTManager(app)  # SKIPS SIGNATURE CHECKS FOR TOKENS ALREADY VERIFIED BY THIS PROCESS
+    jwt_decode_cache = init_jwt_decode_cache(app)
+    jwt_keys = init_jwt_keys(app, jwt)  # NONE WITH THE DEFAULT HS256 SHARED SECRET
     mail = Mail(app)  # INITIALIZE FLASK-MAIL
+    hashing_executor = init_hashing_executor(app)
+    init_password_policy(app)
+    refresh_token_cache = init_refresh_token_cache(app)
+    token_version_cache = init_token_version_cache(app)
+    init_token_store(app)
+    init_verification_tokens(app)  # SIGNED LINKS NEED A REAL SECRET_KEY
+    user_cache = init_user_cache(app)  # NONE IF USER_CACHE_ENABLED IS OFF
+    email_filter = init_email_filter(app)  # NONE UNLESS EMAIL_FILTER_ENABLED
+    access_token_denylist = init_access_token_denylist(app) if app.config.get('JWT_DENYLIST_ENABLED', True) else None
+
+    # REVOKED ACCESS TOKENS ARE REJECTED BY @jwt_required()
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        # LOGGED OUT (BLOOM FILTER FAST PATH)
+        if access_token_denylist is not None and access_token_denylist.is_revoked(jwt_payload['jti']):
+            return True
+        # LOGGED OUT EVERYWHERE SINCE THE TOKEN WAS ISSUED (CACHED PER USER)
+        return jwt_payload.get('ver', 0) != get_user_token_version(int(jwt_payload['sub']))
 
     # Register blueprints
     app.register_blueprint(auth_bp)
 
+    # Register management commands (flask --app app <command>)
+    register_commands(app)
+
+    # OPTIONAL IN-PROCESS REAPER (OR RUN `flask --app app reap-tokens` FROM CRON)
+    if app.config.get('REAPER_ENABLED'):
+        app.extensions['token_reaper'] = TokenReaper(app, app.config.get('REAPER_INTERVAL', 300)).start()
+
     # Home/status route
     @app.route("/")
     def home():
@@ -38,6 +92,46 @@ def create_app(config_class=Config):
             "database": db_status
         })
 
+    # PUBLIC KEYS FOR SERVICES THAT VERIFY OUR TOKENS LOCALLY
+    if jwt_keys is not None:
+        @app.route("/.well-known/jwks.json")
+        def jwks():
+            jwt_keys.maybe_reload()
+            response = jsonify(jwt_keys.jwks())
+            response.headers['Cache-Control'] = f"public, max-age={app.config.get('JWKS_MAX_AGE', 300)}"
+            response.add_etag()
+            return response.make_conditional(request)
+
+    # Runtime metrics route
+    @app.route("/metrics")
+    def metrics():
+        stats = {
+            "hashing": hashing_executor.stats(),
+            "refresh_token_cache": refresh_token_cache.stats(),
+            "token_version_cache": token_version_cache.stats(),
+            "db_pool": pool_stats(db.engine)
+        }
+        if app.extensions.get('replica_router') is not None:
+            stats["replicas"] = app.extensions['replica_router'].stats()
+        if email_filter is not None:
+            stats["email_filter"] = email_filter.stats()
+        if user_cache is not None:
+            stats["user_cache"] = user_cache.stats()
+        if jwt_decode_cache is not None:
+            stats["jwt_decode_cache"] = jwt_decode_cache.stats()
+        if 'access_token_denylist' in app.extensions:
+            stats["access_token_denylist"] = app.extensions['access_token_denylist'].stats()
+        if 'token_reaper' in app.extensions:
+            stats["token_reaper"] = app.extensions['token_reaper'].stats()
+        return jsonify(stats)
+
+    # PASSWORD HASHING POOL IS SATURATED - ASK CLIENT TO RETRY
+    @app.errorhandler(HashingUnavailable)
+    def hashing_unavailable(e):
+        response = jsonify({"error": "Service is busy, please try again shortly"})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,81 @@
+"""
+Compare access token decoding per request: full verification vs the verified claims cache
+
+Usage:
+    python benchmarks/bench_jwt_decode.py [--seconds 2] [--sessions 1000]
+
+Each algorithm decodes tokens of --sessions distinct sessions round-robin,
+the way @jwt_required() sees them. Asymmetric algorithms are skipped if
+cryptography is not installed. No database is needed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import JWTManager, create_access_token, decode_token
+from app import create_app
+from configuration.test_config import TestConfig
+from utils.jwt_decode_cache import get_jwt_decode_cache
+from utils.jwt_keys import generate_key
+
+
+def bench(decode, tokens, seconds):
+    """Decode the tokens round-robin for the given duration"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for token in tokens:
+            decode(token)
+        count += len(tokens)
+    elapsed = time.perf_counter() - start
+    return count / elapsed, elapsed / count * 1_000_000
+
+
+def run(algorithm, keys_dir, args):
+    """Report uncached and cached decode rates for one algorithm"""
+    class BenchConfig(TestConfig):
+        JWT_ALGORITHM = algorithm
+        JWT_KEYS_DIR = keys_dir
+        JWT_DECODE_CACHE_SIZE = max(args.sessions, 1)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        manager = app.extensions['flask-jwt-extended']
+        tokens = [create_access_token(identity=str(i)) for i in range(args.sessions)]
+
+        rows = [
+            ("verify every time", lambda token: JWTManager._decode_jwt_from_config(manager, token)),
+            ("decode cache", decode_token),
+        ]
+        for label, decode in rows:
+            per_second, us_per_decode = bench(decode, tokens, args.seconds)
+            print(f"{algorithm:<8} {label:<18} {per_second:>14.0f} {us_per_decode:>10.1f}")
+        print(f"{'':<8} {'cache hit rate':<18} {get_jwt_decode_cache().stats()['hit_rate']:>14.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help="time spent per row")
+    parser.add_argument('--sessions', type=int, default=1000, help="distinct tokens in rotation")
+    args = parser.parse_args()
+
+    print(f"{'alg':<8} {'path':<18} {'decodes/s':>14} {'us/decode':>10}")
+    run('HS256', None, args)
+    for algorithm in ('RS256', 'EdDSA'):
+        with tempfile.TemporaryDirectory() as keys_dir:
+            try:
+                generate_key(keys_dir, algorithm, kid='bench')
+            except RuntimeError as e:
+                # OPTIONAL DEPENDENCY NOT INSTALLED
+                print(f"{algorithm:<8} skipped: {e}")
+                continue
+            os.utime(os.path.join(keys_dir, 'bench.pem'), (0, 0))  # PUBLISHED LONG AGO
+            run(algorithm, keys_dir, args)
+
+
+if __name__ == '__main__':
+    main()
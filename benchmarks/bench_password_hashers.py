@@ -0,0 +1,54 @@
+"""
+Benchmark password hashing throughput per core for each registered algorithm
+
+Usage:
+    python benchmarks/bench_password_hashers.py [--seconds 3]
+
+Parameters are read from Config (and therefore the environment), so the
+numbers reflect what the login nodes would actually do.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configuration.config import Config
+from utils.password_hashers import HASHERS, get_hasher_config
+
+
+def bench(algorithm, params, seconds):
+    """Hash repeatedly on one core for the given duration"""
+    hasher = HASHERS[algorithm]
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.hash("Benchmark-Password-123!", **params)
+        count += 1
+    elapsed = time.perf_counter() - start
+    return count / elapsed, elapsed / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help="time spent per algorithm")
+    args = parser.parse_args()
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config['BCRYPT_ROUNDS'] = config.get('BCRYPT_ROUNDS') or 12
+
+    print(f"{'algorithm':<10} {'params':<60} {'hashes/s/core':>14} {'ms/hash':>9}")
+    for algorithm in HASHERS:
+        algorithm, params = get_hasher_config(dict(config, PASSWORD_HASHER=algorithm))
+        try:
+            per_second, ms_per_hash = bench(algorithm, params, args.seconds)
+        except RuntimeError as e:
+            # OPTIONAL DEPENDENCY NOT INSTALLED
+            print(f"{algorithm:<10} skipped: {e}")
+            continue
+        print(f"{algorithm:<10} {str(params):<60} {per_second:>14.1f} {ms_per_hash:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
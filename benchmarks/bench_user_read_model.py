@@ -0,0 +1,109 @@
+"""
+Compare user lookups on the login/refresh paths: ORM instances vs column-projected Core snapshots
+
+Usage:
+    python benchmarks/bench_user_read_model.py [--iterations 2000] [--users 200]
+
+Runs against the TestConfig database (TEST_DB_* environment variables)
+and removes the rows it creates. Each lookup ends its session like a
+request does. Memory is the tracemalloc peak above the baseline during
+one lookup (the transient objects it builds), latency is measured in a
+separate pass without tracing.
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from configuration.test_config import TestConfig
+from models.user_model import db, User
+from utils.user_cache import load_user_credentials, load_user_snapshot
+
+
+def orm_login(email, user_id):
+    """The previous login read: a full User instance in the identity map"""
+    user = User.query.filter(User.email_matches(email)).first()
+    return user.password_hash, user.token_version, user.to_dict()
+
+
+def core_login(email, user_id):
+    credentials = load_user_credentials(email)
+    return credentials.password_hash, credentials.token_version, credentials.user.to_dict()
+
+
+def orm_refresh(email, user_id):
+    """The previous refresh read"""
+    user = db.session.get(User, user_id)
+    return user.id, user.email, user.role
+
+
+def core_refresh(email, user_id):
+    # UNCACHED - COMPARES THE DATABASE READ ITSELF
+    user = load_user_snapshot(user_id)
+    return user.id, user.email, user.role
+
+
+def run(label, lookup, users, iterations):
+    """Report latency and transient memory per lookup"""
+    def once(i):
+        email, user_id = users[i % len(users)]
+        lookup(email, user_id)
+        db.session.remove()  # END OF REQUEST
+
+    for i in range(len(users)):
+        once(i)  # WARM UP STATEMENT CACHES AND CONNECTIONS
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        once(i)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peak_total = 0
+    samples = min(iterations, 500)
+    for i in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        once(i)
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    print(f"{label:<14} {elapsed / iterations * 1000:>8.3f} {peak_total / samples / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        rows = [
+            User(name="Bench", email=f"bench-{i}-{secrets.token_hex(4)}@example.com", password_hash="x", is_verified=True)
+            for i in range(args.users)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        users = [(user.email, user.id) for user in rows]
+        db.session.remove()
+
+        try:
+            print(f"{'path':<14} {'ms/lookup':>8} {'peak KiB/op':>12}")
+            run("orm login", orm_login, users, args.iterations)
+            run("core login", core_login, users, args.iterations)
+            run("orm refresh", orm_refresh, users, args.iterations)
+            run("core refresh", core_refresh, users, args.iterations)
+        finally:
+            User.query.filter(User.id.in_([user_id for _, user_id in users])).delete()
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
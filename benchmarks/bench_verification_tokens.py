@@ -0,0 +1,111 @@
+"""
+Compare database round trips of email verification: legacy SELECT/DELETE flow vs DELETE ... RETURNING
+
+Usage:
+    python benchmarks/bench_verification_tokens.py [--iterations 200]
+
+Runs against the TestConfig database (TEST_DB_* environment variables)
+and removes the rows it creates.
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app
+from configuration.test_config import TestConfig
+from models.user_model import db, User
+from models.verification_model import VerificationToken
+from services.auth_service import AuthService
+
+
+def legacy_verify_email(token):
+    """The original flow: SELECT token, DELETE, COMMIT, SELECT user, UPDATE, COMMIT"""
+    token_record = VerificationToken.query.filter_by(token=token).first()
+    if not token_record or token_record.expires_at < datetime.now(timezone.utc) or token_record.token_type != 'email':
+        return False
+    user_id = token_record.user_id
+    db.session.delete(token_record)
+    db.session.commit()
+    user = db.session.get(User, user_id)
+    user.is_verified = True
+    db.session.commit()
+    return True
+
+
+def run(label, verify, users, counters):
+    """Verify every user once and report round trips and latency"""
+    tokens = []
+    for user in users:
+        token = secrets.token_urlsafe(32)
+        db.session.add(VerificationToken(
+            user_id=user.id,
+            token=token,
+            token_type='email',
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
+        ))
+        tokens.append(token)
+    db.session.commit()
+    db.session.expire_all()
+
+    counters.update(statements=0, commits=0)
+    start = time.perf_counter()
+    for token in tokens:
+        assert verify(token)
+    elapsed = time.perf_counter() - start
+
+    n = len(tokens)
+    print(
+        f"{label:<22} {counters['statements'] / n:>10.1f} {counters['commits'] / n:>8.1f} "
+        f"{(counters['statements'] + counters['commits']) / n:>12.1f} {elapsed / n * 1000:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        users = [
+            User(name="Bench", email=f"bench-{i}-{secrets.token_hex(4)}@example.com", password_hash="x")
+            for i in range(args.iterations)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+        counters = {'statements': 0, 'commits': 0}
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_statement(*args):
+            counters['statements'] += 1
+
+        @event.listens_for(db.engine, 'commit')
+        def count_commit(*args):
+            counters['commits'] += 1
+
+        auth_service = AuthService()
+        try:
+            print(f"{'flow':<22} {'statements':>10} {'commits':>8} {'round trips':>12} {'ms/op':>8}")
+            run("legacy select/delete", legacy_verify_email, users, counters)
+            User.query.filter(User.id.in_(user_ids)).update({'is_verified': False})
+            db.session.commit()
+            run("delete ... returning", lambda token: auth_service.verify_email(token)[0], users, counters)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+            event.remove(db.engine, 'commit', count_commit)
+            VerificationToken.query.filter(VerificationToken.user_id.in_(user_ids)).delete()
+            User.query.filter(User.id.in_(user_ids)).delete()
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+from commands.password_commands import build_breached_filter_command
+from commands.token_commands import reap_tokens_command, manage_token_partitions_command
+from commands.jwt_commands import generate_jwt_key_command
+from commands.user_commands import migrate_emails_command
+
+
+def register_commands(app):
+    """Register the management commands on the Flask CLI"""
+    app.cli.add_command(build_breached_filter_command)
+    app.cli.add_command(reap_tokens_command)
+    app.cli.add_command(manage_token_partitions_command)
+    app.cli.add_command(generate_jwt_key_command)
+    app.cli.add_command(migrate_emails_command)
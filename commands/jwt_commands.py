@@ -0,0 +1,22 @@
+import click
+from flask import current_app
+from utils.jwt_keys import generate_key, ASYMMETRIC_ALGORITHMS
+
+
+@click.command('generate-jwt-key')
+@click.option('--algorithm', type=click.Choice(ASYMMETRIC_ALGORITHMS), default=None, help="Key type [JWT_ALGORITHM]")
+@click.option('--kid', default=None, help="Key ID (defaults to the current UTC time)")
+@click.option('--directory', type=click.Path(file_okay=False), default=None, help="Keyset directory [JWT_KEYS_DIR]")
+def generate_jwt_key_command(algorithm, kid, directory):
+    """Add a signing key to the JWT keyset (it starts signing once published for JWKS_MAX_AGE)"""
+    config = current_app.config
+    directory = directory or config.get('JWT_KEYS_DIR')
+    if not directory:
+        raise click.ClickException("Set JWT_KEYS_DIR or pass --directory")
+
+    algorithm = algorithm or config.get('JWT_ALGORITHM')
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise click.ClickException(f"JWT_ALGORITHM={algorithm} does not use a keyset, pass --algorithm")
+
+    path = generate_key(directory, algorithm, kid)
+    click.echo(f"Wrote {path} ({algorithm})")
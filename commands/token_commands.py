@@ -0,0 +1,42 @@
+import click
+from flask import current_app
+from models.user_model import db
+from services.token_reaper import reap_expired_tokens
+from services.token_partitions import manage_partitions, is_partitioned, partitions_ahead
+
+
+@click.command('reap-tokens')
+@click.option('--batch-size', type=int, default=None, help="Rows deleted per statement [REAPER_BATCH_SIZE]")
+@click.option('--max-rows-per-second', type=int, default=None, help="Deletion rate cap, 0 = unlimited [REAPER_MAX_ROWS_PER_SECOND]")
+@click.option('--max-batches', type=int, default=None, help="Stop after this many batches per table")
+def reap_tokens_command(batch_size, max_rows_per_second, max_batches):
+    """Delete expired/revoked refresh tokens, expired verification tokens and expired denylist entries in batches"""
+    config = current_app.config
+    result = reap_expired_tokens(
+        batch_size=batch_size or config.get('REAPER_BATCH_SIZE', 1000),
+        max_rows_per_second=config.get('REAPER_MAX_ROWS_PER_SECOND', 0) if max_rows_per_second is None else max_rows_per_second,
+        max_batches=max_batches,
+        revoked_grace_seconds=config.get('REAPER_REVOKED_GRACE_SECONDS', 86400)
+    )
+    click.echo(
+        f"Deleted {result['refresh_tokens']} refresh tokens, "
+        f"{result['verification_tokens']} verification tokens and "
+        f"{result['revoked_access_tokens']} revoked access tokens in {result['seconds']}s "
+        f"({result['rows_per_second']} rows/s)"
+    )
+
+
+@click.command('manage-token-partitions')
+@click.option('--months-ahead', type=int, default=None, help="Future months to create partitions for [REFRESH_TOKEN_PARTITIONS_AHEAD]")
+@click.option('--drop-expired/--keep-expired', default=True, show_default=True, help="Detach and drop fully expired partitions")
+def manage_token_partitions_command(months_ahead, drop_expired):
+    """Create upcoming refresh_tokens partitions and drop fully expired ones"""
+    if not is_partitioned(db.session.connection()):
+        raise click.ClickException("refresh_tokens is not partitioned (set REFRESH_TOKENS_PARTITIONED=true)")
+
+    result = manage_partitions(
+        months_ahead=months_ahead if months_ahead is not None else partitions_ahead(),
+        drop_expired=drop_expired
+    )
+    click.echo(f"Created: {', '.join(result['created']) or 'none'}")
+    click.echo(f"Dropped: {', '.join(result['dropped']) or 'none'}")
@@ -0,0 +1,26 @@
+import click
+from services.user_emails import migrate_emails
+
+
+@click.command('migrate-emails')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help="Rows lowercased per transaction")
+@click.option('--dry-run', is_flag=True, help="Only report case-duplicates and rows to lowercase")
+def migrate_emails_command(batch_size, dry_run):
+    """Report case-duplicate emails, then add the lower(email) unique index and lowercase stored emails"""
+    result = migrate_emails(batch_size=batch_size, dry_run=dry_run)
+
+    for email, user_ids in result["duplicates"]:
+        click.echo(f"Duplicate {email}: users {', '.join(str(user_id) for user_id in user_ids)}")
+    if result["duplicates"]:
+        raise click.ClickException(
+            f"{len(result['duplicates'])} emails are registered more than once ignoring case - "
+            f"merge or delete the extra accounts, then run again"
+        )
+
+    if dry_run:
+        click.echo(f"No case-duplicates; {result['normalized']} emails would be lowercased")
+        return
+    click.echo(
+        f"{'Created' if result['index_created'] else 'Found'} index uq_users_email_lower; "
+        f"lowercased {result['normalized']} emails"
+    )
@@ -17,11 +17,97 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # CONNECTION POOL PER WORKER PROCESS - (SIZE + OVERFLOW) x WORKERS MUST STAY UNDER THE SERVER'S max_connections
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))  # EXTRA CONNECTIONS FOR BURSTS, CLOSED WHEN RETURNED
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # SECONDS TO WAIT FOR A CONNECTION BEFORE FAILING
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # SECONDS - REPLACE CONNECTIONS BEFORE IDLE TIMEOUTS, -1 = NEVER
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'False').lower() == 'true'  # TEST CONNECTIONS ON CHECKOUT (ONE ROUND TRIP)
+    # PGBOUNCER WITH pool_mode=transaction IN FRONT OF THE DATABASE - NO SERVER-SIDE PREPARED STATEMENTS
+    DB_PGBOUNCER_TRANSACTION_MODE = os.getenv('DB_PGBOUNCER_TRANSACTION_MODE', 'False').lower() == 'true'
+    
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING
+    }
+    
+    # READ REPLICAS FOR LAG-TOLERANT READS (/auth/me, EMAIL LOOKUPS, INTROSPECTION) - COMMA-SEPARATED URIS, NONE = PRIMARY ONLY
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv('SQLALCHEMY_REPLICA_URIS', '').split(',') if uri.strip()]
+    REPLICA_EJECT_SECONDS = int(os.getenv('REPLICA_EJECT_SECONDS', 30))  # A FAILED REPLICA GETS NO READS FOR THIS LONG
+    
     # JWT CONFIG
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 HOUR
     JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES', 2592000))  # 30 DAYS
     
+    # ASYMMETRIC SIGNING (RS256/EdDSA...) WITH A ROTATING KEYSET - HS256 KEEPS USING JWT_SECRET_KEY
+    JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+    JWT_KEYS_DIR = os.getenv('JWT_KEYS_DIR')  # '<kid>.pem' FILES, SEE `flask --app app generate-jwt-key`
+    JWT_KEYS_RELOAD_INTERVAL = int(os.getenv('JWT_KEYS_RELOAD_INTERVAL', 60))  # SECONDS
+    JWKS_MAX_AGE = int(os.getenv('JWKS_MAX_AGE', 300))  # CACHE-CONTROL OF /.well-known/jwks.json - NEW KEYS SIGN AFTER JWKS_MAX_AGE + JWT_KEYS_RELOAD_INTERVAL
+    
+    # VERIFIED ACCESS TOKEN CLAIMS CACHE (PER PROCESS) - SIZE 0 DISABLES IT
+    JWT_DECODE_CACHE_SIZE = int(os.getenv('JWT_DECODE_CACHE_SIZE', 10000))
+    JWT_DECODE_CACHE_TTL = int(os.getenv('JWT_DECODE_CACHE_TTL', 300))  # SECONDS, ENTRIES NEVER OUTLIVE THE TOKEN'S exp
+    
+    # ACCESS TOKEN REVOCATION (LOGOUT) - BLOOM FILTER IN FRONT OF THE TOKEN STORE
+    JWT_DENYLIST_ENABLED = os.getenv('JWT_DENYLIST_ENABLED', 'True').lower() == 'true'
+    JWT_DENYLIST_CAPACITY = int(os.getenv('JWT_DENYLIST_CAPACITY', 100000))  # REVOCATIONS PER TOKEN LIFETIME
+    JWT_DENYLIST_FP_RATE = float(os.getenv('JWT_DENYLIST_FP_RATE', 0.001))
+    JWT_DENYLIST_SYNC_INTERVAL = int(os.getenv('JWT_DENYLIST_SYNC_INTERVAL', 5))  # SECONDS - OTHER WORKERS' REVOCATIONS
+    
+    # SINGLE-USE REFRESH TOKENS - EACH REFRESH RETURNS A NEW ONE, REUSE REVOKES THE FAMILY
+    JWT_REFRESH_TOKEN_ROTATION = os.getenv('JWT_REFRESH_TOKEN_ROTATION', 'False').lower() == 'true'
+    
+    # VALIDATED REFRESH TOKEN CACHE (PER PROCESS) - SIZE 0 DISABLES IT
+    REFRESH_TOKEN_CACHE_SIZE = int(os.getenv('REFRESH_TOKEN_CACHE_SIZE', 10000))
+    REFRESH_TOKEN_CACHE_TTL = int(os.getenv('REFRESH_TOKEN_CACHE_TTL', 30))  # SECONDS
+    
+    # PER-USER TOKEN VERSION CACHE (PER PROCESS) - BOUNDS HOW LONG OTHER WORKERS ACCEPT TOKENS AFTER "LOG OUT EVERYWHERE"
+    TOKEN_VERSION_CACHE_SIZE = int(os.getenv('TOKEN_VERSION_CACHE_SIZE', 10000))
+    TOKEN_VERSION_CACHE_TTL = int(os.getenv('TOKEN_VERSION_CACHE_TTL', 5))  # SECONDS
+    
+    # READ-THROUGH USER SNAPSHOT CACHE: 'local' (PER PROCESS) OR 'redis' (SHARED, OPTIONAL redis PACKAGE)
+    USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', 'True').lower() == 'true'
+    USER_CACHE = os.getenv('USER_CACHE', 'local')
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))  # SECONDS - BOUNDS STALENESS OF OTHER WORKERS' WRITES (local)
+    USER_CACHE_REDIS_URL = os.getenv('USER_CACHE_REDIS_URL')  # DEFAULTS TO TOKEN_STORE_REDIS_URL
+    
+    # BLOOM FILTER OF REGISTERED EMAILS - LOGIN/REGISTER/FORGOT-PASSWORD SKIP THE DB FOR UNKNOWN ADDRESSES
+    EMAIL_FILTER_ENABLED = os.getenv('EMAIL_FILTER_ENABLED', 'False').lower() == 'true'
+    EMAIL_FILTER_FP_RATE = float(os.getenv('EMAIL_FILTER_FP_RATE', 0.01))
+    EMAIL_FILTER_HEADROOM = float(os.getenv('EMAIL_FILTER_HEADROOM', 2.0))  # CAPACITY = USERS x HEADROOM (GROWTH UNTIL THE NEXT REBUILD)
+    EMAIL_FILTER_REBUILD_INTERVAL = int(os.getenv('EMAIL_FILTER_REBUILD_INTERVAL', 3600))  # SECONDS
+    EMAIL_FILTER_SYNC_INTERVAL = int(os.getenv('EMAIL_FILTER_SYNC_INTERVAL', 5))  # SECONDS - OTHER WORKERS' REGISTRATIONS
+    
+    # RANGE-PARTITION refresh_tokens BY MONTH OF expires_at (SCHEMA MODE - CHOOSE BEFORE CREATING TABLES)
+    REFRESH_TOKENS_PARTITIONED = os.getenv('REFRESH_TOKENS_PARTITIONED', 'False').lower() == 'true'
+    REFRESH_TOKEN_PARTITIONS_AHEAD = int(os.getenv('REFRESH_TOKEN_PARTITIONS_AHEAD', 3))  # MUST COVER JWT_REFRESH_TOKEN_EXPIRES
+    
+    # TOKEN STATE BACKEND: 'sql' (PRIMARY DATABASE), 'memory' (SINGLE NODE/TESTS) OR 'redis'
+    TOKEN_STORE = os.getenv('TOKEN_STORE', 'sql')
+    TOKEN_STORE_REDIS_URL = os.getenv('TOKEN_STORE_REDIS_URL', 'redis://localhost:6379/0')
+    TOKEN_STORE_PREFIX = os.getenv('TOKEN_STORE_PREFIX', 'auth:')
+    
+    # SIGNED, STATELESS VERIFICATION/RESET LINKS - NO verification_tokens ROWS ARE WRITTEN
+    VERIFICATION_TOKENS_STATELESS = os.getenv('VERIFICATION_TOKENS_STATELESS', 'False').lower() == 'true'
+    VERIFICATION_TOKENS_STATELESS_UNTIL = os.getenv('VERIFICATION_TOKENS_STATELESS_UNTIL')  # ISO DATE - KEEP ACCEPTING SIGNED LINKS AFTER SWITCHING OFF
+    
+    # BATCH TOKEN INTROSPECTION (POST /auth/introspect) - COMMA-SEPARATED X-API-Key VALUES, NONE = DISABLED
+    INTROSPECTION_API_KEYS = [key for key in os.getenv('INTROSPECTION_API_KEYS', '').split(',') if key]
+    INTROSPECTION_MAX_TOKENS = int(os.getenv('INTROSPECTION_MAX_TOKENS', 100))
+    
+    # EXPIRED TOKEN REAPER
+    REAPER_ENABLED = os.getenv('REAPER_ENABLED', 'False').lower() == 'true'  # IN-PROCESS BACKGROUND THREAD
+    REAPER_INTERVAL = int(os.getenv('REAPER_INTERVAL', 300))  # SECONDS BETWEEN RUNS
+    REAPER_BATCH_SIZE = int(os.getenv('REAPER_BATCH_SIZE', 1000))
+    REAPER_MAX_ROWS_PER_SECOND = int(os.getenv('REAPER_MAX_ROWS_PER_SECOND', 5000))  # 0 = UNLIMITED
+    REAPER_REVOKED_GRACE_SECONDS = int(os.getenv('REAPER_REVOKED_GRACE_SECONDS', 86400))  # KEEP REVOKED ROWS FOR REUSE DETECTION
+    
     # EMAIL CONFIG
     MAIL_SERVER = os.getenv('MAIL_SERVER')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 25))
@@ -35,3 +121,34 @@ class Config:
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5000')
     SECRET_KEY = os.getenv('SECRET_KEY', 'development-key')
     PORT = int(os.getenv('PORT', 5000))
+    
+    # PASSWORD POLICY CONFIG
+    PASSWORD_MIN_LENGTH = int(os.getenv('PASSWORD_MIN_LENGTH', 8))
+    PASSWORD_REQUIRE_UPPER = os.getenv('PASSWORD_REQUIRE_UPPER', 'True').lower() == 'true'
+    PASSWORD_REQUIRE_LOWER = os.getenv('PASSWORD_REQUIRE_LOWER', 'True').lower() == 'true'
+    PASSWORD_REQUIRE_DIGIT = os.getenv('PASSWORD_REQUIRE_DIGIT', 'True').lower() == 'true'
+    PASSWORD_REQUIRE_SPECIAL = os.getenv('PASSWORD_REQUIRE_SPECIAL', 'True').lower() == 'true'
+    PASSWORD_SPECIAL_CHARS = os.getenv('PASSWORD_SPECIAL_CHARS', '!@#$%^&*(),.?":{}|<>')
+    # BUILT WITH: flask --app app build-breached-filter <wordlist.txt> <output.bloom>
+    BREACHED_PASSWORD_FILTER_PATH = os.getenv('BREACHED_PASSWORD_FILTER_PATH')
+    
+    # PASSWORD HASHING ALGORITHM - 'bcrypt', 'scrypt' OR 'argon2id' (NEEDS argon2-cffi)
+    # EXISTING HASHES OF OTHER ALGORITHMS ARE UPGRADED ON THE NEXT SUCCESSFUL LOGIN
+    PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'bcrypt')
+    SCRYPT_LN = int(os.getenv('SCRYPT_LN', 15))  # N = 2^LN, MEMORY = 128 * R * N BYTES
+    SCRYPT_R = int(os.getenv('SCRYPT_R', 8))
+    SCRYPT_P = int(os.getenv('SCRYPT_P', 1))
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 65536))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+    
+    # BCRYPT COST CONFIG - LEAVE BCRYPT_ROUNDS UNSET TO CALIBRATE AT STARTUP
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 0)) or None
+    BCRYPT_TARGET_MS = int(os.getenv('BCRYPT_TARGET_MS', 250))  # TARGET HASHING LATENCY
+    BCRYPT_MIN_ROUNDS = int(os.getenv('BCRYPT_MIN_ROUNDS', 10))
+    
+    # PASSWORD HASHING POOL CONFIG
+    HASHING_POOL_ENABLED = os.getenv('HASHING_POOL_ENABLED', 'True').lower() == 'true'
+    HASHING_POOL_WORKERS = int(os.getenv('HASHING_POOL_WORKERS', 0)) or None  # NONE = ONE PER CORE
+    HASHING_POOL_MAX_QUEUE = int(os.getenv('HASHING_POOL_MAX_QUEUE', 64))
+    HASHING_POOL_TIMEOUT = float(os.getenv('HASHING_POOL_TIMEOUT', 5.0))  # SECONDS
@@ -38,5 +38,17 @@ class TestConfig(Config):
     # FRONTEND URL FOR TESTING
     FRONTEND_URL = 'http://localhost:3000'
     
+    # CHEAPEST BCRYPT COST FOR FASTER TESTS (SKIPS CALIBRATION)
+    BCRYPT_ROUNDS = 4
+    SCRYPT_LN = 4
+    ARGON2_TIME_COST = 1
+    ARGON2_MEMORY_COST = 1024
+    
+    # HASH INLINE INSTEAD OF SPAWNING WORKER PROCESSES
+    HASHING_POOL_ENABLED = False
+    
+    # NO BACKGROUND THREADS IN TESTS
+    REAPER_ENABLED = False
+    
     # PRESERVE EXCEPTIONS FOR BETTER ERROR MESSAGES IN TESTS
     PRESERVE_CONTEXT_ON_EXCEPTION = False
\ No newline at end of file
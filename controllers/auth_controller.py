@@ -1,7 +1,9 @@
-from flask import request, jsonify, make_response
+import hmac
+from flask import request, jsonify, make_response, current_app
 from services.auth_service import AuthService
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from models.user_model import User
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 
 
 class AuthController:
@@ -71,11 +73,13 @@ class AuthController:
         if error:
             return jsonify({"error": error}), 401
         
-        # CREATE RESPONSE WITH HTTP-ONLY COOKIE FOR ACCESS TOKEN
-        response = make_response(jsonify({
+        # SEND REFRESH TOKEN IN RESPONSE FOR STORAGE
+        # CLIENT SHOULD STORE THIS SECURELY
+        response = jsonify({
             "message": "Login successful",
-            "user": result["user"]
-        }))
+            "user": result["user"],
+            "refresh_token": result["refresh_token"]
+        })
         
         # SET ACCESS TOKEN IN HTTP-ONLY COOKIE
         response.set_cookie(
@@ -87,10 +91,6 @@ class AuthController:
             samesite='Lax'  # HELPS PREVENT CSRF
         )
         
-        # SEND REFRESH TOKEN IN RESPONSE FOR STORAGE
-        # CLIENT SHOULD STORE THIS SECURELY
-        response.json["refresh_token"] = result["refresh_token"]
-        
         return response
     
     def refresh(self):
@@ -103,14 +103,26 @@ class AuthController:
         refresh_token = data.get('refresh_token')
         print("Received refresh token:", refresh_token)  # FOR DEBUGGING PURPOSES
         
+        # COLLECT DEVICE INFO FOR ROTATED REFRESH TOKENS
+        request_info = {
+            "ip": request.remote_addr,
+            "device": request.user_agent.string
+        }
+        
         # GET NEW ACCESS TOKEN
-        result, error = self.auth_service.refresh_access_token(refresh_token)
+        result, error = self.auth_service.refresh_access_token(refresh_token, request_info)
         
         if error:
             return jsonify({"error": error}), 401
         
+        body = {"message": "Token refreshed successfully"}
+        
+        # WITH ROTATION ENABLED THE OLD REFRESH TOKEN IS NOW REVOKED - CLIENT MUST STORE THE NEW ONE
+        if "refresh_token" in result:
+            body["refresh_token"] = result["refresh_token"]
+        
         # CREATE RESPONSE WITH HTTP-ONLY COOKIE FOR NEW ACCESS TOKEN
-        response = make_response(jsonify({"message": "Token refreshed successfully"}))
+        response = make_response(jsonify(body))
         
         # SET NEW ACCESS TOKEN IN HTTP-ONLY COOKIE
         response.set_cookie(
@@ -129,8 +141,15 @@ class AuthController:
         data = request.get_json() or {}
         refresh_token = data.get('refresh_token')
         
-        # INVALIDATE REFRESH TOKEN
-        self.auth_service.logout(refresh_token)
+        # PICK UP THE ACCESS TOKEN IF ONE WAS SENT - AN EXPIRED OR INVALID ONE NEEDS NO REVOKING
+        try:
+            verify_jwt_in_request(optional=True)
+            access_claims = get_jwt()
+        except (JWTExtendedException, PyJWTError):
+            access_claims = None
+        
+        # INVALIDATE REFRESH AND ACCESS TOKENS
+        self.auth_service.logout(refresh_token, access_claims)
         
         # CLEAR ACCESS TOKEN COOKIE
         response = make_response(jsonify({"message": "Logout successful"}))
@@ -138,6 +157,20 @@ class AuthController:
         
         return response
     
+    @jwt_required()
+    def logout_all(self):
+        """Log user out of every session on every device"""
+        success, message = self.auth_service.logout_all(int(get_jwt_identity()))
+        
+        if not success:
+            return jsonify({"error": message}), 404
+        
+        # CLEAR ACCESS TOKEN COOKIE
+        response = make_response(jsonify({"message": message}))
+        response.delete_cookie('access_token')
+        
+        return response
+    
     def forgot_password(self):
         """Request password reset email"""
         data = request.get_json()
@@ -175,14 +208,38 @@ class AuthController:
         
         return jsonify({"message": message}), 200
     
+    def introspect(self):
+        """Check a batch of access/refresh tokens for an internal service (API key required)"""
+        # COMPARE AGAINST EVERY CONFIGURED KEY IN CONSTANT TIME
+        api_key = request.headers.get('X-API-Key', '')
+        keys = current_app.config.get('INTROSPECTION_API_KEYS') or []
+        if not api_key or not any(hmac.compare_digest(api_key.encode('utf-8'), key.encode('utf-8')) for key in keys):
+            return jsonify({"error": "Invalid API key"}), 401
+        
+        data = request.get_json(silent=True)
+        tokens = data.get('tokens') if isinstance(data, dict) else None
+        if not isinstance(tokens, list) or not tokens:
+            return jsonify({"error": "A list of tokens is required"}), 400
+        
+        # ACCEPT PLAIN STRINGS OR RFC 7662 STYLE {"token": ..., "token_type_hint": ...} OBJECTS
+        tokens = [token.get('token') if isinstance(token, dict) else token for token in tokens]
+        if not all(isinstance(token, str) for token in tokens):
+            return jsonify({"error": "Tokens must be strings"}), 400
+        
+        max_tokens = current_app.config.get('INTROSPECTION_MAX_TOKENS', 100)
+        if len(tokens) > max_tokens:
+            return jsonify({"error": f"At most {max_tokens} tokens per request"}), 400
+        
+        return jsonify({"results": self.auth_service.introspect_tokens(tokens)}), 200
+    
     @jwt_required()
     def get_current_user(self):
         """Get current user details (protected route example)"""
         # GET USER ID FROM ACCESS TOKEN
         user_id = get_jwt_identity()
         print("Current user ID from token:", user_id)  # FOR DEBUGGING PURPOSES
-        # GET USER FROM DATABASE
-        user = User.query.get(int(user_id))
+        # GET USER SNAPSHOT (READ-THROUGH CACHE)
+        user = self.auth_service.get_user(int(user_id))
         
         if not user:
             return jsonify({"error": "User not found"}), 404
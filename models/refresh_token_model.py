@@ -1,19 +1,39 @@
 from datetime import datetime, timezone
 from models.user_model import db
+from configuration.config import Config
+
+# SCHEMA MODE IS FIXED AT IMPORT TIME FROM THE ENVIRONMENT (REFRESH_TOKENS_PARTITIONED)
+PARTITIONED = Config.REFRESH_TOKENS_PARTITIONED
 
 class RefreshToken(db.Model):
     """Model for storing refresh tokens"""
     __tablename__ = 'refresh_tokens'
     
-    id = db.Column(db.Integer, primary_key=True)
-    token = db.Column(db.String(255), unique=True, nullable=False)
+    if PARTITIONED:
+        # RANGE-PARTITIONED BY expires_at (MONTHLY) - UNIQUE KEYS MUST INCLUDE THE PARTITION KEY.
+        # THE PRIMARY KEY BECOMES (id, expires_at), SO LOOKUPS OF '<id>.<secret>' TOKENS CANNOT PRUNE
+        # PARTITIONS: EACH IS ONE INDEX PROBE PER LIVE PARTITION (ABOUT REFRESH_TOKEN_PARTITIONS_AHEAD + 2)
+        __table_args__ = (
+            db.UniqueConstraint('token', 'expires_at'),
+            {'postgresql_partition_by': 'RANGE (expires_at)'}
+        )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # LEGACY RAW TOKENS ONLY - NEW TOKENS ARE '<id>.<secret>' AND ONLY THE SECRET'S DIGEST IS STORED
+    token = db.Column(db.String(255), unique=not PARTITIONED, nullable=True)
+    token_hash = db.Column(db.CHAR(64), nullable=True)  # HEX SHA-256 OF THE SECRET
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # SHARED BY ALL TOKENS ROTATED FROM THE SAME LOGIN - REVOKED TOGETHER ON REUSE
+    family_id = db.Column(db.String(32), nullable=True, index=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # users.token_version AT ISSUE
     ip_address = db.Column(db.String(45), nullable=True)  # IPV6 CAN BE UP TO 45 CHARS
     user_agent = db.Column(db.String(255), nullable=True)
     is_revoked = db.Column(db.Boolean, default=False)
+    # THE REAPER'S REUSE-DETECTION GRACE PERIOD RUNS FROM HERE (NULL FOR ROWS REVOKED BEFORE THE COLUMN EXISTED)
+    revoked_at = db.Column(db.DateTime(timezone=True), nullable=True)
     # ADD timezone=True TO STORE TIMEZONE-AWARE DATETIMES
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, primary_key=PARTITIONED)
     
     def __repr__(self):
         return f'<RefreshToken {self.id} for user {self.user_id}>'
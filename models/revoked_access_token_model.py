@@ -0,0 +1,14 @@
+from datetime import datetime, timezone
+from models.user_model import db
+
+class RevokedAccessToken(db.Model):
+    """Model for access tokens (JWT IDs) revoked before their expiry"""
+    __tablename__ = 'revoked_access_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)  # ROW IS USELESS AFTER THIS
+    revoked_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True,
+                           default=lambda: datetime.now(timezone.utc))  # DENYLIST SYNC CURSOR
+
+    def __repr__(self):
+        return f'<RevokedAccessToken {self.jti}>'
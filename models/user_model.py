@@ -1,18 +1,22 @@
 from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
+from utils.user_utils import normalize_email
+from utils.db_routing import RoutingSession
 
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # READ REPLICA ROUTING, SEE utils/db_routing.py
 
 class User(db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)  # UNIQUE THROUGH uq_users_email_lower (STORED LOWERCASE)
     role = db.Column(db.String(20), nullable=False, default='user')  # 'user' or 'admin'
     is_verified = db.Column(db.Boolean, default=False)
     password_hash = db.Column(db.String(255), nullable=False)
+    # BUMPED TO LOG OUT EVERYWHERE - TOKENS CARRY THE VERSION THEY WERE ISSUED UNDER
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     # ADDED timezone=True TO STORE TIMEZONE-AWARE DATETIMES
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(
@@ -21,17 +25,27 @@ class User(db.Model):
         onupdate=lambda: datetime.now(timezone.utc)
     )
     
+    # CASE-INSENSITIVE UNIQUENESS - EMAIL LOOKUPS FILTER ON lower(email) TO USE IT
+    __table_args__ = (
+        db.Index('uq_users_email_lower', db.func.lower(email), unique=True),
+    )
+    
     def __repr__(self):
         return f'<User {self.email}>'
     
+    @classmethod
+    def email_matches(cls, email):
+        """Filter condition for a case-insensitive email lookup (a single probe of uq_users_email_lower)"""
+        return db.func.lower(cls.email) == normalize_email(email)
+    
     def to_dict(self):
-        """Convert user to dictionary (exclude password)"""
+        """Convert user to dictionary (exclude password) - datetimes are left to the JSON provider"""
         return {
             'id': self.id,
             'name': self.name,
             'email': self.email,
             'role': self.role,
             'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
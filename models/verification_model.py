@@ -4,6 +4,10 @@ from models.user_model import db
 class VerificationToken(db.Model):
     """Model for email verification and password reset tokens"""
     __tablename__ = 'verification_tokens'
+    # ONE LIVE TOKEN PER USER AND PURPOSE - NEW LINKS OVERWRITE THE OLD ROW (UPSERT)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'token_type', name='uq_verification_tokens_user_type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
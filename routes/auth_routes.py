@@ -31,6 +31,11 @@ def logout():
     """Log user out and invalidate tokens"""
     return auth_controller.logout()
 
+@auth_bp.route('/logout-all', methods=['POST'])
+def logout_all():
+    """Log user out of every session (requires access token)"""
+    return auth_controller.logout_all()
+
 # PASSWORD RESET ROUTES
 @auth_bp.route('/forgot-password', methods=['POST'])
 def forgot_password():
@@ -42,6 +47,12 @@ def reset_password(token):
     """Reset password using token from email"""
     return auth_controller.reset_password(token)
 
+# INTERNAL SERVICE ROUTES
+@auth_bp.route('/introspect', methods=['POST'])
+def introspect():
+    """Check a batch of access/refresh tokens (requires X-API-Key)"""
+    return auth_controller.introspect()
+
 # PROTECTED ROUTE EXAMPLE
 @auth_bp.route('/me', methods=['GET'])
 def get_current_user():
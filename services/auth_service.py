@@ -1,22 +1,35 @@
 from datetime import datetime, timezone
 from models.user_model import db, User
-from models.refresh_token_model import RefreshToken
 from services.email_service import EmailService
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 import re
+import secrets
 from utils.auth_utils import (
     generate_verification_token,
     validate_verification_token,
     create_refresh_token,
     validate_refresh_token,
-    revoke_refresh_token
-)
-from utils.user_utils import (
-    hash_password, 
-    check_password,
-    validate_password_strength
+    revoke_refresh_token,
+    rotate_refresh_token,
+    invalidate_user_refresh_tokens,
+    bump_user_token_version,
+    forget_user_token_version,
+    get_user_token_version
 )
+from utils.user_cache import get_user_snapshot, load_user_snapshot_by_email, load_user_credentials, forget_user
+from utils.user_utils import validate_password_strength, needs_rehash, normalize_email, hash_password
+from utils.email_filter import get_email_filter
+from utils.password_hashers import get_hasher_config
+from utils.password_policy import get_password_policy
+from utils.hashing_executor import get_hashing_executor, HashingUnavailable
+from utils.token_denylist import get_access_token_denylist
+from utils.token_store import get_token_store
+from utils.db_routing import replica_reads
 
 class AuthService:
     def __init__(self):
@@ -27,12 +40,36 @@ class AuthService:
         if self.email_service is None:
             self.email_service = EmailService()
         return self.email_service
+    
+    def _hasher_config(self):
+        """Preferred hashing algorithm and its parameters from config"""
+        return get_hasher_config(current_app.config)
+    
+    def _dummy_password_hash(self):
+        """Hash of a random password with the preferred algorithm, checked against for unknown emails"""
+        dummy = current_app.extensions.get('dummy_password_hash')
+        if dummy is None:
+            dummy = hash_password(secrets.token_urlsafe(16), *self._hasher_config())
+            current_app.extensions['dummy_password_hash'] = dummy
+        return dummy
+    
+    def _email_might_exist(self, email):
+        """False only if the registered email filter knows the email is not registered"""
+        email_filter = get_email_filter()
+        return email_filter is None or email_filter.might_exist(email)
+    
+    @replica_reads
+    def _find_user_by_email(self, email):
+        """Snapshot of the user registered with an email, or None (may be answered by a read replica)"""
+        return load_user_snapshot_by_email(email)
         
     def register_user(self, name, email, password):
         """Register a new user"""
-        # CHECK IF USER ALREADY EXISTS
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
+        # STORE THE CANONICAL FORM - "Foo@x.com" AND "foo@x.com" ARE ONE ACCOUNT
+        email = normalize_email(email)
+        
+        # CHECK IF USER ALREADY EXISTS (SKIPPED FOR DEFINITELY NEW EMAILS - THE UNIQUE INDEX STILL DECIDES)
+        if self._email_might_exist(email) and self._find_user_by_email(email):
             return None, "Email already registered"
             
         # VALIDATE EMAIL FORMAT
@@ -40,7 +77,7 @@ class AuthService:
             return None, "Invalid email format"
             
         # VALIDATE PASSWORD STRENGTH USING UTILITY FUNCTION
-        is_valid, message = validate_password_strength(password)
+        is_valid, message = validate_password_strength(password, get_password_policy())
         if not is_valid:
             return None, message
             
@@ -50,12 +87,20 @@ class AuthService:
             email=email,
             is_verified=False,
             role='user',
-            password_hash=hash_password(password)  
+            password_hash=get_hashing_executor().hash_password(password, *self._hasher_config())  # HASHED ON THE BOUNDED POOL
         )
         
-        # SAVE TO DATABASE
+        # SAVE TO DATABASE - THE UNIQUE lower(email) INDEX SETTLES CONCURRENT SIGN-UPS
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None, "Email already registered"
+        
+        email_filter = get_email_filter()
+        if email_filter is not None:
+            email_filter.add(email)
         
         # GENERATE VERIFICATION TOKEN USING UTILITY FUNCTION
         verification_token = generate_verification_token(
@@ -79,29 +124,51 @@ class AuthService:
         
     def verify_email(self, token):
         """Verify user email with token"""
-        # UTILITY FUNCTION TO VALIDATE TOKEN
-        user_id = validate_verification_token(token, 'email')
+        # CONSUME TOKEN AND MARK USER AS VERIFIED IN ONE TRANSACTION
+        user_id = validate_verification_token(token, 'email', commit=False)
         
         if not user_id:
+            db.session.commit()  # KEEP THE PURGE OF AN EXPIRED TOKEN
             return False, "Invalid or expired verification link"
             
-        user = User.query.get(user_id)
-        if not user:
-            return False, "User not found"
-            
-        # MARK USER AS VERIFIED
-        user.is_verified = True
+        result = db.session.execute(
+            update(User).where(User.id == user_id).values(is_verified=True)
+        )
         db.session.commit()
         
+        if not result.rowcount:
+            return False, "User not found"
+        
+        forget_user(user_id)
         return True, "Email verified successfully! You can now log in."
         
     def authenticate_user(self, email, password, request_info=None):
         """Authenticate user and generate tokens"""
-        user = User.query.filter_by(email=email).first()
+        # COLUMN-PROJECTED READ - NO ORM INSTANCE FOR A READ-ONLY PATH
+        credentials = load_user_credentials(email) if self._email_might_exist(email) else None
         
-        # CHECK IF USER EXISTS AND PASSWORD IS CORRECT
-        if not user or not check_password(password, user.password_hash):  # DIRECTLY USE UTILITY FUNCTION
+        # UNKNOWN EMAIL - SAME HASHING WORK AS A WRONG PASSWORD SO RESPONSE TIMES DO NOT REVEAL REGISTERED EMAILS
+        if not credentials:
+            get_hashing_executor().check_password(password, self._dummy_password_hash())
             return None, "Invalid email or password"
+        
+        # CHECK IF PASSWORD IS CORRECT
+        if not get_hashing_executor().check_password(password, credentials.password_hash):  # CHECKED ON THE BOUNDED POOL
+            return None, "Invalid email or password"
+        
+        user = credentials.user
+        
+        # MIGRATE TO THE PREFERRED ALGORITHM/PARAMETERS WHILE WE HAVE THE PLAINTEXT
+        algorithm, params = self._hasher_config()
+        if needs_rehash(credentials.password_hash, algorithm, params):
+            try:
+                new_hash = get_hashing_executor().hash_password(password, algorithm, params)
+                db.session.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+                db.session.commit()
+                forget_user(user.id)
+            except HashingUnavailable:
+                # NOT WORTH FAILING THE LOGIN OVER - TRY AGAIN NEXT TIME
+                current_app.logger.warning(f"Skipped password rehash for user {user.id}: hashing pool busy")
             
         # CHECK IF USER IS VERIFIED
         if not user.is_verified:
@@ -112,7 +179,8 @@ class AuthService:
             identity=str(user.id),
             additional_claims={
                 "email": user.email,
-                "role": user.role
+                "role": user.role,
+                "ver": credentials.token_version
             }
         )
         
@@ -121,7 +189,8 @@ class AuthService:
             user_id=user.id,
             expires_seconds=current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 2592000),
             ip_address=request_info.get('ip') if request_info else None,
-            user_agent=request_info.get('device') if request_info else None
+            user_agent=request_info.get('device') if request_info else None,
+            token_version=credentials.token_version
         )
         
         return {
@@ -130,16 +199,30 @@ class AuthService:
             "user": user.to_dict()
         }, None
         
-    def refresh_access_token(self, refresh_token_str):
+    def refresh_access_token(self, refresh_token_str, request_info=None):
         """Generate new access token using refresh token"""
-        # VALIDATE REFRESH TOKEN USING UTILITY FUNCTION
-        is_valid, user_id = validate_refresh_token(refresh_token_str)
+        new_refresh_token = None
+        
+        if current_app.config.get('JWT_REFRESH_TOKEN_ROTATION'):
+            # SINGLE-USE REFRESH TOKENS - REVOKE THE PRESENTED ONE AND ISSUE ITS SUCCESSOR
+            new_refresh_token, user_id = rotate_refresh_token(
+                refresh_token_str,
+                expires_seconds=current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 2592000),
+                ip_address=request_info.get('ip') if request_info else None,
+                user_agent=request_info.get('device') if request_info else None
+            )
+            is_valid = new_refresh_token is not None
+        else:
+            # VALIDATE REFRESH TOKEN USING UTILITY FUNCTION
+            is_valid, user_id = validate_refresh_token(refresh_token_str)
         
         if not is_valid or not user_id:
             return None, "Invalid or expired refresh token"
             
-        user = User.query.get(user_id)
-        if not user:
+        # CACHED SNAPSHOT AND TOKEN VERSION (BOTH ALREADY WARM FROM VALIDATION ON THE HOT PATH)
+        user = get_user_snapshot(user_id)
+        token_version = get_user_token_version(user_id)
+        if not user or token_version is None:
             return None, "User not found"
             
         # GENERATE NEW ACCESS TOKEN
@@ -147,22 +230,147 @@ class AuthService:
             identity=str(user.id),
             additional_claims={
                 "email": user.email,
-                "role": user.role
+                "role": user.role,
+                "ver": token_version
             }
         )
         
-        return {"access_token": access_token}, None
+        result = {"access_token": access_token}
+        if new_refresh_token:
+            result["refresh_token"] = new_refresh_token
         
-    def logout(self, refresh_token_str):
-        """Revoke refresh token on logout"""
+        return result, None
+        
+    def logout(self, refresh_token_str, access_claims=None):
+        """Revoke refresh token (and access token, given its claims) on logout"""
         if refresh_token_str:
             # USE UTILITY FUNCTION TO REVOKE TOKEN
             revoke_refresh_token(refresh_token_str)
+        
+        # DENY THE ACCESS TOKEN FOR THE REST OF ITS LIFETIME
+        if access_claims and access_claims.get('jti') and current_app.config.get('JWT_DENYLIST_ENABLED', True):
+            get_access_token_denylist().revoke(
+                access_claims['jti'],
+                datetime.fromtimestamp(access_claims['exp'], timezone.utc)
+            )
         return True
         
+    def logout_all(self, user_id):
+        """Log a user out of every session (all access and refresh tokens)"""
+        if bump_user_token_version(user_id) is None:
+            return False, "User not found"
+        forget_user(user_id)
+        return True, "Logged out of all sessions"
+        
+    @replica_reads
+    def get_user(self, user_id):
+        """Read-only view of a user (cached snapshot); None if not found"""
+        return get_user_snapshot(user_id)
+        
+    @replica_reads
+    def _load_introspection_state(self, refresh_tokens, user_ids):
+        """
+        Refresh token states and users for a batch of tokens (may be answered by a read replica)
+        
+        Args:
+            refresh_tokens: Refresh token strings
+            user_ids: IDs of the users of the access tokens
+        
+        Returns:
+            tuple: ({token: RefreshTokenState}, {user_id: row})
+        """
+        # ONE ROUND TRIP FOR EVERY REFRESH TOKEN
+        refresh_states = get_token_store().get_refresh_tokens(refresh_tokens)
+        
+        # ONE QUERY FOR EVERY USER - CURRENT token_version DECIDES "LOGGED OUT EVERYWHERE"
+        user_ids = set(user_ids)
+        user_ids.update(state.user_id for state in refresh_states.values())
+        users = {}
+        if user_ids:
+            rows = db.session.execute(
+                select(User.id, User.email, User.role, User.is_verified, User.token_version).where(User.id.in_(user_ids))
+            )
+            users = {row.id: row for row in rows}
+        return refresh_states, users
+        
+    def introspect_tokens(self, tokens):
+        """
+        Check several access and refresh tokens at once (RFC 7662 style)
+        
+        Access tokens (JWTs) are told apart from refresh tokens by their shape.
+        Refresh tokens are looked up in one token store round trip and every
+        user involved in one query, whatever the number of tokens.
+        
+        Args:
+            tokens: List of token strings
+        
+        Returns:
+            list: One dict per token, in order - {"active": False} or the active token's details
+        """
+        results = [None] * len(tokens)
+        access_claims = {}
+        refresh_indexes = []
+        for i, token in enumerate(tokens):
+            if token.count('.') != 2:
+                refresh_indexes.append(i)
+                continue
+            try:
+                claims = decode_token(token)
+            except (JWTExtendedException, PyJWTError):
+                continue
+            if claims.get('type') == 'access':
+                access_claims[i] = claims
+        
+        refresh_states, users = self._load_introspection_state(
+            [tokens[i] for i in refresh_indexes],
+            {int(claims['sub']) for claims in access_claims.values()}
+        )
+        
+        # THE DENYLIST SYNCS FROM THE PRIMARY - A LAGGING REPLICA COULD MAKE IT MISS REVOCATIONS FOR GOOD
+        denylist = get_access_token_denylist() if current_app.config.get('JWT_DENYLIST_ENABLED', True) else None
+        now = datetime.now(timezone.utc)
+        
+        for i, claims in access_claims.items():
+            user = users.get(int(claims['sub']))
+            if not user or claims.get('ver', 0) != user.token_version:
+                continue
+            if denylist is not None and denylist.is_revoked(claims['jti']):
+                continue
+            results[i] = {
+                "active": True,
+                "token_type": "access_token",
+                "sub": claims['sub'],
+                "username": user.email,
+                "role": user.role,
+                "is_verified": user.is_verified,
+                "exp": claims.get('exp'),
+                "iat": claims.get('iat'),
+                "jti": claims['jti']
+            }
+        
+        for i in refresh_indexes:
+            state = refresh_states.get(tokens[i])
+            if not state or state.is_revoked or state.expires_at <= now:
+                continue
+            user = users.get(state.user_id)
+            if not user or state.token_version != user.token_version:
+                continue
+            results[i] = {
+                "active": True,
+                "token_type": "refresh_token",
+                "sub": str(user.id),
+                "username": user.email,
+                "role": user.role,
+                "is_verified": user.is_verified,
+                "exp": int(state.expires_at.timestamp())
+            }
+        
+        # RFC 7662: NOTHING IS REVEALED ABOUT INACTIVE TOKENS
+        return [result or {"active": False} for result in results]
+        
     def request_password_reset(self, email):
         """Generate and send password reset token"""
-        user = User.query.filter_by(email=email).first()
+        user = self._find_user_by_email(email) if self._email_might_exist(email) else None
     
         # NOT REVEALING IF EMAIL EXISTS FOR SECURITY
         if not user:
@@ -190,27 +398,32 @@ class AuthService:
         
     def reset_password(self, token, new_password):
         """Reset user password using token"""
-        # VALIDATE TOKEN USING UTILITY FUNCTION
-        user_id = validate_verification_token(token, 'password_reset')
+        # VALIDATE PASSWORD STRENGTH FIRST - A REJECTED PASSWORD MUST NOT BURN THE LINK
+        is_valid, message = validate_password_strength(new_password, get_password_policy())
+        if not is_valid:
+            return False, message
+            
+        # CONSUME TOKEN - COMMITTED TOGETHER WITH THE NEW PASSWORD BELOW (SQL TOKEN STORE)
+        user_id = validate_verification_token(token, 'password_reset', commit=False)
         
         if not user_id:
+            db.session.commit()  # KEEP THE PURGE OF AN EXPIRED TOKEN
             return False, "Invalid or expired reset link"
             
-        # VALIDATE PASSWORD STRENGTH USING UTILITY FUNCTION
-        is_valid, message = validate_password_strength(new_password)
-        if not is_valid:
-            return False, message
-            
         user = User.query.get(user_id)
         if not user:
+            db.session.rollback()
             return False, "User not found"
             
-        # UPDATE PASSWORD DIRECTLY WITH UTILITY FUNCTION
-        user.password_hash = hash_password(new_password)
+        # UPDATE PASSWORD - HASHED ON THE BOUNDED POOL
+        user.password_hash = get_hashing_executor().hash_password(new_password, *self._hasher_config())
         
-        # REVOKE ALL REFRESH TOKENS FOR THIS USER (FORCE LOGIN AGAIN)
-        RefreshToken.query.filter_by(user_id=user.id).update({'is_revoked': True})
+        # LOG OUT EVERYWHERE (FORCE LOGIN AGAIN) - ONE ROW, HOWEVER MANY SESSIONS
+        user.token_version = User.token_version + 1
         
         db.session.commit()
+        invalidate_user_refresh_tokens(user.id)
+        forget_user_token_version(user.id)
+        forget_user(user.id)
         
-        return True, "Password reset successfully! You can now log in with your new password."
\ No newline at end of file
+        return True, "Password reset successfully! You can now log in with your new password."
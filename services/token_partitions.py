@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import event, text
+from configuration.config import Config
+from models.user_model import db
+from models.refresh_token_model import RefreshToken, PARTITIONED
+
+TABLE = RefreshToken.__tablename__
+
+
+def _month_start(year, month):
+    # NORMALISE month OVERFLOW/UNDERFLOW (E.G. month=13 -> JANUARY NEXT YEAR)
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month_start):
+    """Name of the partition holding tokens that expire in the given month"""
+    return f"{TABLE}_p{month_start:%Y%m}"
+
+
+def partition_bounds(name):
+    """
+    Parse the [start, end) expires_at range from a partition name
+
+    Returns:
+        tuple: (start, end) datetimes, or None if the name is not ours
+    """
+    suffix = name[len(TABLE) + 2:]
+    if not name.startswith(f"{TABLE}_p") or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    start = _month_start(int(suffix[:4]), int(suffix[4:]))
+    return start, _month_start(start.year, start.month + 1)
+
+
+def _create_partitions(connection, months_ahead, months_back=0, now=None):
+    now = now or datetime.now(timezone.utc)
+    created = []
+    for offset in range(-months_back, months_ahead + 1):
+        start = _month_start(now.year, now.month + offset)
+        end = _month_start(start.year, start.month + 1)
+        name = partition_name(start)
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists:
+            continue
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+
+def list_partitions(connection):
+    """Names of the partitions currently attached to refresh_tokens"""
+    rows = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table ORDER BY child.relname"
+    ), {"table": TABLE})
+    return [row[0] for row in rows]
+
+
+def is_partitioned(connection):
+    """Check if refresh_tokens exists as a partitioned table in the database"""
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid "
+        "WHERE pg_class.relname = :table"
+    ), {"table": TABLE}).scalar())
+
+
+def manage_partitions(months_ahead=3, drop_expired=True, months_back=0, now=None):
+    """
+    Create upcoming monthly partitions and drop fully expired ones
+
+    Dropping a partition replaces deleting (and vacuuming) every row in it.
+    A partition is only dropped once its whole range is in the past, i.e.
+    every token it holds has expired.
+
+    Args:
+        months_ahead: Months after the current one that must have a partition
+            (must cover JWT_REFRESH_TOKEN_EXPIRES or inserts will fail)
+        drop_expired: Detach and drop partitions whose range has ended
+        months_back: Also create partitions for this many past months
+        now: Reference time (for tests)
+
+    Returns:
+        dict: Names of created and dropped partitions
+    """
+    now = now or datetime.now(timezone.utc)
+    connection = db.session.connection()
+    created = _create_partitions(connection, months_ahead, months_back, now)
+
+    dropped = []
+    if drop_expired:
+        for name in list_partitions(connection):
+            bounds = partition_bounds(name)
+            if bounds and bounds[1] <= now:
+                connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+                connection.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+    db.session.commit()
+    return {"created": created, "dropped": dropped}
+
+
+def partitions_ahead():
+    """REFRESH_TOKEN_PARTITIONS_AHEAD of the current app (of Config outside an app context)"""
+    if has_app_context():
+        return current_app.config.get('REFRESH_TOKEN_PARTITIONS_AHEAD', Config.REFRESH_TOKEN_PARTITIONS_AHEAD)
+    return Config.REFRESH_TOKEN_PARTITIONS_AHEAD
+
+
+if PARTITIONED:
+    @event.listens_for(RefreshToken.__table__, 'after_create')
+    def _create_initial_partitions(target, connection, **kw):
+        # db.create_all() ONLY CREATES THE PARENT - ADD PARTITIONS SO INSERTS WORK RIGHT AWAY
+        # (PREVIOUS MONTH INCLUDED FOR BACKDATED ROWS AROUND A MONTH BOUNDARY)
+        _create_partitions(connection, months_ahead=partitions_ahead(), months_back=1)
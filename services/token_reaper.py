@@ -0,0 +1,163 @@
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import delete, select, or_, and_
+from models.user_model import db
+from models.refresh_token_model import RefreshToken
+from models.verification_model import VerificationToken
+from models.revoked_access_token_model import RevokedAccessToken
+
+
+def _delete_batch(table, condition, batch_size):
+    """Delete up to batch_size matching rows, skipping rows locked by live requests"""
+    key = table.primary_key.columns.values()[0]  # id, OR jti FOR revoked_access_tokens
+
+    # A CTE IS EVALUATED ONCE - AN "IN (SELECT ... LIMIT)" SUBQUERY CAN BE RE-RUN
+    # BY THE PLANNER AND DELETE MORE THAN batch_size ROWS
+    batch = (
+        select(key)
+        .where(condition)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte('batch')
+    )
+    result = db.session.execute(delete(table).where(key == batch.c[key.name]))
+    db.session.commit()
+    return result.rowcount
+
+
+def _reap_table(table, condition, batch_size, max_rows_per_second, max_batches):
+    """Delete matching rows batch by batch, sleeping between batches to respect the rate cap"""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        started = time.perf_counter()
+        deleted = _delete_batch(table, condition, batch_size)
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+
+        # THROTTLE SO THE REAPER NEVER COMPETES WITH LOGIN TRAFFIC FOR I/O
+        if max_rows_per_second:
+            remaining = deleted / max_rows_per_second - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+    return total
+
+
+def reap_expired_tokens(batch_size=1000, max_rows_per_second=0, max_batches=None, revoked_grace_seconds=86400):
+    """
+    Delete expired/revoked refresh tokens, expired verification tokens
+    and denylist entries of expired access tokens
+
+    Args:
+        batch_size: Rows deleted per statement (and per transaction)
+        max_rows_per_second: Deletion rate cap, 0 for unlimited
+        max_batches: Stop after this many batches per table, None for no limit
+        revoked_grace_seconds: Keep revoked refresh tokens this long after revocation so
+            replayed rotated tokens are still recognised as reuse
+
+    Returns:
+        dict: Rows deleted per table, elapsed seconds and rows per second
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+
+    refresh_table = RefreshToken.__table__
+    refresh_deleted = _reap_table(
+        refresh_table,
+        or_(
+            refresh_table.c.expires_at < now,
+            and_(
+                refresh_table.c.is_revoked.is_(True),
+                refresh_table.c.revoked_at < now - timedelta(seconds=revoked_grace_seconds)
+            )
+        ),
+        batch_size,
+        max_rows_per_second,
+        max_batches
+    )
+
+    verification_table = VerificationToken.__table__
+    verification_deleted = _reap_table(
+        verification_table,
+        verification_table.c.expires_at < now,
+        batch_size,
+        max_rows_per_second,
+        max_batches
+    )
+
+    revoked_access_table = RevokedAccessToken.__table__
+    revoked_access_deleted = _reap_table(
+        revoked_access_table,
+        revoked_access_table.c.expires_at < now,
+        batch_size,
+        max_rows_per_second,
+        max_batches
+    )
+
+    elapsed = time.perf_counter() - started
+    total = refresh_deleted + verification_deleted + revoked_access_deleted
+    return {
+        "refresh_tokens": refresh_deleted,
+        "verification_tokens": verification_deleted,
+        "revoked_access_tokens": revoked_access_deleted,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed, 1) if elapsed else 0.0
+    }
+
+
+class TokenReaper:
+    """
+    Background thread that runs reap_expired_tokens on an interval
+
+    Safe to run in every worker process: SKIP LOCKED lets concurrent
+    reapers (and live requests) work on disjoint rows.
+    """
+
+    def __init__(self, app, interval=300):
+        self.app = app
+        self.interval = interval
+        self.last_result = None
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _options(self):
+        config = self.app.config
+        return {
+            "batch_size": config.get('REAPER_BATCH_SIZE', 1000),
+            "max_rows_per_second": config.get('REAPER_MAX_ROWS_PER_SECOND', 0),
+            "revoked_grace_seconds": config.get('REAPER_REVOKED_GRACE_SECONDS', 86400)
+        }
+
+    def run_once(self):
+        """Run one reaping pass inside an app context"""
+        with self.app.app_context():
+            try:
+                self.last_result = reap_expired_tokens(**self._options())
+                self.runs += 1
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Token reaper failed: {str(e)}")
+            finally:
+                db.session.remove()
+        return self.last_result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self):
+        """Start the background thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="token-reaper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"runs": self.runs, "interval": self.interval, "last_result": self.last_result}
@@ -0,0 +1,78 @@
+from sqlalchemy import text
+from models.user_model import db, User
+
+TABLE = User.__tablename__
+INDEX = 'uq_users_email_lower'
+# UNIQUE(email) OF DATABASES CREATED BEFORE THE lower(email) INDEX - REDUNDANT ONCE EMAILS ARE LOWERCASE
+LEGACY_CONSTRAINT = 'users_email_key'
+
+
+def find_case_duplicate_emails(connection):
+    """
+    Users whose emails only differ by case
+
+    Returns:
+        list: (lowercased email, [user IDs, oldest first]) per duplicated address
+    """
+    rows = connection.execute(text(
+        f"SELECT lower(email), array_agg(id ORDER BY id) FROM {TABLE} "
+        f"GROUP BY lower(email) HAVING count(*) > 1 ORDER BY 1"
+    ))
+    return [(email, list(ids)) for email, ids in rows]
+
+
+def migrate_emails(batch_size=1000, dry_run=False):
+    """
+    Move an existing database to case-insensitive emails
+
+    Nothing is changed while case-duplicates exist - they have to be merged
+    or deleted by hand first. Otherwise the unique lower(email) index is
+    built without blocking writes (CREATE INDEX CONCURRENTLY), after which
+    no new case-duplicate can appear, and stored emails are lowercased in
+    batches of short transactions. An INVALID index left behind by an
+    interrupted build is dropped and built again. Finally the old
+    UNIQUE(email) constraint is dropped, since with lowercase emails the
+    lower(email) index enforces the same thing.
+
+    Args:
+        batch_size: Rows lowercased per transaction
+        dry_run: Only report duplicates and rows to lowercase
+
+    Returns:
+        dict: duplicates, index_created, normalized (rows lowercased, or to lowercase in a dry run)
+    """
+    duplicates = find_case_duplicate_emails(db.session.connection())
+    result = {"duplicates": duplicates, "index_created": False, "normalized": 0}
+    if dry_run or duplicates:
+        result["normalized"] = db.session.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE email <> lower(email)")
+        ).scalar()
+        db.session.rollback()
+        return result
+    db.session.commit()
+
+    # CONCURRENTLY CANNOT RUN INSIDE A TRANSACTION BLOCK
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        # NONE IF MISSING, FALSE IF A FAILED CONCURRENT BUILD LEFT IT INVALID (IT STILL SLOWS WRITES)
+        valid = connection.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": INDEX}
+        ).scalar()
+        if valid is False:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY {INDEX}"))
+        if not valid:
+            connection.execute(text(f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX} ON {TABLE} (lower(email))"))
+            result["index_created"] = True
+
+    while True:
+        updated = db.session.execute(text(
+            f"WITH batch AS (SELECT id FROM {TABLE} WHERE email <> lower(email) LIMIT :batch_size) "
+            f"UPDATE {TABLE} SET email = lower({TABLE}.email) FROM batch WHERE {TABLE}.id = batch.id"
+        ), {"batch_size": batch_size}).rowcount
+        db.session.commit()
+        result["normalized"] += updated
+        if updated < batch_size:
+            break
+
+    db.session.execute(text(f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {LEGACY_CONSTRAINT}"))
+    db.session.commit()
+    return result
@@ -3,8 +3,10 @@ from app import create_app
 from models.user_model import db, User
 from models.verification_model import VerificationToken
 from models.refresh_token_model import RefreshToken
+from models.revoked_access_token_model import RevokedAccessToken
 from configuration.test_config import TestConfig
 from utils.user_utils import hash_password
+from utils.user_cache import init_user_cache
 from datetime import datetime, timezone, timedelta
 
 @pytest.fixture(scope='session')
@@ -29,9 +31,14 @@ def db_session(app):
         # Clear all tables but don't drop them
         RefreshToken.query.delete()
         VerificationToken.query.delete()
+        RevokedAccessToken.query.delete()
         User.query.delete()
         db.session.commit()
         
+        # DROP CACHED STATE THAT REFERS TO DELETED ROWS
+        app.extensions['refresh_token_cache'].clear()
+        init_user_cache(app)
+        
         yield db.session
         
         # Clean up after test
@@ -3,6 +3,9 @@ from unittest.mock import Mock, patch, MagicMock
 from services.auth_service import AuthService
 from models.user_model import User
 from models.refresh_token_model import RefreshToken
+from utils.user_utils import check_password, hash_password
+from utils.password_hashers import BcryptHasher
+from utils.auth_utils import validate_refresh_token
 
 class TestAuthServiceRegistration:
     """Test AuthService registration functionality"""
@@ -174,6 +177,42 @@ class TestAuthServiceAuthentication:
             assert result is None
             assert "Invalid email or password" in error
     
+    def test_authenticate_rehashes_stale_cost(self, app, db_session, sample_user, monkeypatch):
+        """Test that login upgrades hashes created with a lower cost factor"""
+        with app.app_context():
+            user = db_session.get(User, sample_user.id)
+            user.password_hash = hash_password("Password123!", params={'rounds': 4})
+            db_session.commit()
+            monkeypatch.setitem(app.config, 'BCRYPT_ROUNDS', 5)
+            
+            result, error = AuthService().authenticate_user(
+                email=sample_user.email,
+                password="Password123!",
+                request_info=None
+            )
+            
+            assert error is None
+            db_session.expire_all()
+            user = db_session.get(User, sample_user.id)
+            assert BcryptHasher.get_rounds(user.password_hash) == 5
+            assert check_password("Password123!", user.password_hash) is True
+    
+    def test_authenticate_keeps_stronger_hash(self, app, db_session, sample_user):
+        """Test that login never downgrades a hash made with a higher cost factor"""
+        with app.app_context():
+            original_hash = db_session.get(User, sample_user.id).password_hash
+            
+            # FIXTURE HASH USES THE DEFAULT COST, TEST CONFIG USES 4
+            result, error = AuthService().authenticate_user(
+                email=sample_user.email,
+                password="Password123!",
+                request_info=None
+            )
+            
+            assert error is None
+            db_session.expire_all()
+            assert db_session.get(User, sample_user.id).password_hash == original_hash
+    
     def test_authenticate_unverified_user(self, app, db_session, unverified_user):
         """Test authentication with unverified user"""
         with app.app_context():
@@ -202,6 +241,24 @@ class TestAuthServiceTokenRefresh:
             assert error is None
             assert "access_token" in result
     
+    def test_refresh_with_rotation(self, app, db_session, refresh_token):
+        """Test that rotation mode returns a new refresh token"""
+        with app.app_context():
+            auth_service = AuthService()
+            
+            app.config['JWT_REFRESH_TOKEN_ROTATION'] = True
+            try:
+                result, error = auth_service.refresh_access_token(refresh_token.token)
+                replay, replay_error = auth_service.refresh_access_token(refresh_token.token)
+            finally:
+                app.config['JWT_REFRESH_TOKEN_ROTATION'] = False
+            
+            assert error is None
+            assert "access_token" in result
+            assert result["refresh_token"] != refresh_token.token
+            assert replay is None
+            assert "Invalid or expired" in replay_error
+    
     def test_refresh_invalid_token(self, app, db_session):
         """Test refresh with invalid token"""
         with app.app_context():
@@ -240,20 +297,20 @@ class TestAuthServicePasswordReset:
             assert success is True
             assert error is None
     
-    def test_reset_password_success(self, app, db_session, reset_token, sample_user):
+    def test_reset_password_success(self, app, db_session, reset_token, sample_user, refresh_token):
         """Test successful password reset"""
         with app.app_context():
             auth_service = AuthService()
+            assert validate_refresh_token(refresh_token.token) == (True, sample_user.id)
             
             new_password = "NewPassword123!"
             success, message = auth_service.reset_password(reset_token.token, new_password)
             
             assert success is True
             
-            # ALL REFRESH TOKENS SHOULD BE REVOKED
-            tokens = RefreshToken.query.filter_by(user_id=sample_user.id).all()
-            for token in tokens:
-                assert token.is_revoked is True
+            # ALL REFRESH TOKENS SHOULD STOP WORKING (TOKEN VERSION BUMPED)
+            assert db_session.get(User, sample_user.id).token_version == 1
+            assert validate_refresh_token(refresh_token.token) == (False, None)
     
     def test_reset_password_invalid_token(self, app, db_session):
         """Test password reset with invalid token"""
@@ -274,6 +331,20 @@ class TestAuthServicePasswordReset:
             
             assert success is False
             assert message is not None
+    
+    def test_reset_password_weak_password_keeps_link(self, app, db_session, reset_token):
+        """Test that a rejected password does not burn the reset link"""
+        with app.app_context():
+            auth_service = AuthService()
+            
+            auth_service.reset_password(reset_token.token, "weak")
+            success, message = auth_service.reset_password(reset_token.token, "NewPassword123!")
+            
+            assert success is True
+            
+            # LINK IS ONE-TIME USE
+            success, message = auth_service.reset_password(reset_token.token, "OtherPassword123!")
+            assert success is False
 
 class TestAuthServiceLogout:
     """Test AuthService logout"""
@@ -298,4 +369,30 @@ class TestAuthServiceLogout:
             
             result = auth_service.logout(None)
             
-            assert result is True
\ No newline at end of file
+            assert result is True
+    
+    def test_logout_all(self, app, db_session, sample_user):
+        """Test that logging out everywhere invalidates every session with one update"""
+        with app.app_context():
+            auth_service = AuthService()
+            sessions = [
+                auth_service.authenticate_user(sample_user.email, "Password123!")[0]["refresh_token"]
+                for _ in range(3)
+            ]
+            assert all(validate_refresh_token(token)[0] for token in sessions)
+            
+            success, message = auth_service.logout_all(sample_user.id)
+            
+            assert success is True
+            assert not any(validate_refresh_token(token)[0] for token in sessions)
+            
+            # A NEW LOGIN CARRIES THE NEW VERSION
+            result, error = auth_service.authenticate_user(sample_user.email, "Password123!")
+            assert validate_refresh_token(result["refresh_token"]) == (True, sample_user.id)
+    
+    def test_logout_all_unknown_user(self, app, db_session):
+        """Test logging out everywhere for a missing user"""
+        with app.app_context():
+            success, message = AuthService().logout_all(999999)
+            
+            assert success is False
\ No newline at end of file
@@ -1,12 +1,17 @@
 import pytest
 from datetime import datetime, timezone, timedelta
 from utils.auth_utils import (
+    init_verification_tokens,
     generate_verification_token,
     validate_verification_token,
     create_refresh_token,
     validate_refresh_token,
-    revoke_refresh_token
+    revoke_refresh_token,
+    rotate_refresh_token,
+    get_refresh_token_cache,
+    invalidate_user_refresh_tokens
 )
+from models.user_model import User
 from models.verification_model import VerificationToken
 from models.refresh_token_model import RefreshToken
 
@@ -121,6 +126,22 @@ class TestVerificationTokenUtils:
             
             assert user_id is None
     
+    def test_validate_wrong_type_keeps_token(self, app, verification_token):
+        """Test that presenting a token for the wrong purpose does not consume it"""
+        with app.app_context():
+            assert validate_verification_token(verification_token.token, 'password_reset') is None
+            assert validate_verification_token(verification_token.token, 'email') == verification_token.user_id
+            assert validate_verification_token(verification_token.token, 'email') is None
+    
+    def test_validate_without_commit(self, app, db_session, verification_token):
+        """Test that an uncommitted consumption can be rolled back"""
+        with app.app_context():
+            user_id = validate_verification_token(verification_token.token, 'email', commit=False)
+            db_session.rollback()
+            
+            assert user_id == verification_token.user_id
+            assert validate_verification_token(verification_token.token, 'email') == user_id
+    
     def test_validate_verification_token_nonexistent(self, app):
         """Test validating non-existent token"""
         with app.app_context():
@@ -147,8 +168,8 @@ class TestRefreshTokenUtils:
             assert isinstance(token, str)
             assert len(token) > 0
             
-            # VERIFY TOKEN WAS SAVED IN DATABASE
-            token_record = RefreshToken.query.filter_by(token=token).first()
+            # VERIFY TOKEN WAS SAVED IN DATABASE (LOOKED UP BY ITS ID PREFIX)
+            token_record = RefreshToken.query.filter_by(id=int(token.split('.')[0])).first()
             assert token_record is not None
             assert token_record.user_id == sample_user.id
             assert token_record.ip_address == "192.168.1.1"
@@ -164,11 +185,39 @@ class TestRefreshTokenUtils:
                 expires_seconds=3600
             )
             
-            token_record = RefreshToken.query.filter_by(token=token).first()
+            token_record = RefreshToken.query.filter_by(id=int(token.split('.')[0])).first()
             assert token_record is not None
             assert token_record.ip_address is None
             assert token_record.user_agent is None
     
+    def test_refresh_token_secret_not_stored(self, app, db_session, sample_user):
+        """Test that only a digest of the token secret is stored"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            token_id, secret = token.split('.')
+            
+            token_record = RefreshToken.query.filter_by(id=int(token_id)).first()
+            assert token_record.token is None
+            assert len(token_record.token_hash) == 64
+            assert secret not in token_record.token_hash
+    
+    def test_validate_created_refresh_token(self, app, db_session, sample_user):
+        """Test validating a token in '<id>.<secret>' format"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            
+            assert validate_refresh_token(token) == (True, sample_user.id)
+    
+    def test_validate_refresh_token_wrong_secret(self, app, db_session, sample_user):
+        """Test that a valid id with a wrong secret is rejected"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            token_id = token.split('.')[0]
+            
+            assert validate_refresh_token(f"{token_id}.forged-secret") == (False, None)
+            assert validate_refresh_token("not-a-number.secret") == (False, None)
+            assert revoke_refresh_token(f"{token_id}.forged-secret") is False
+    
     def test_validate_refresh_token_valid(self, app, refresh_token):
         """Test validating a valid refresh token"""
         with app.app_context():
@@ -220,6 +269,15 @@ class TestRefreshTokenUtils:
             assert is_valid is False
             assert user_id is None
     
+    @pytest.mark.parametrize('token_str', ["².abc", "٣.abc", "99999999999.abc", "0.abc", "-1.abc"])
+    def test_refresh_with_malformed_selector(self, app, client, db_session, token_str):
+        """Test that a selector that is not an int4 row ID is an invalid token, not a server error"""
+        response = client.post('/auth/refresh', json={"refresh_token": token_str})
+        
+        assert response.status_code == 401
+        with app.app_context():
+            assert validate_refresh_token(token_str) == (False, None)
+    
     def test_revoke_refresh_token(self, app, db_session, refresh_token):
         """Test revoking a refresh token"""
         with app.app_context():
@@ -247,4 +305,204 @@ class TestRefreshTokenUtils:
             # TRY TO REVOKE AGAIN
             result = revoke_refresh_token(refresh_token.token)
             
-            assert result is True  # SHOULD STILL RETURN TRUE
\ No newline at end of file
+            assert result is True  # SHOULD STILL RETURN TRUE
+
+class TestRefreshTokenCache:
+    """Test caching of validated refresh tokens"""
+    
+    def test_validation_is_cached(self, app, db_session, refresh_token):
+        """Test that repeat validations skip the database"""
+        with app.app_context():
+            cache = get_refresh_token_cache()
+            
+            validate_refresh_token(refresh_token.token)
+            
+            # DELETE THE ROW - A CACHE HIT MUST NOT NOTICE
+            RefreshToken.query.filter_by(token=refresh_token.token).delete()
+            db_session.commit()
+            
+            is_valid, user_id = validate_refresh_token(refresh_token.token)
+            
+            assert is_valid is True
+            assert user_id == refresh_token.user_id
+            assert cache.stats()["hits"] >= 1
+    
+    def test_revoke_invalidates_cache(self, app, db_session, refresh_token):
+        """Test that revoking drops the cached entry"""
+        with app.app_context():
+            assert validate_refresh_token(refresh_token.token)[0] is True
+            
+            revoke_refresh_token(refresh_token.token)
+            
+            assert validate_refresh_token(refresh_token.token) == (False, None)
+    
+    def test_user_invalidation(self, app, db_session, refresh_token):
+        """Test dropping every cached token of a user"""
+        with app.app_context():
+            validate_refresh_token(refresh_token.token)
+            
+            RefreshToken.query.filter_by(user_id=refresh_token.user_id).update({'is_revoked': True})
+            db_session.commit()
+            invalidate_user_refresh_tokens(refresh_token.user_id)
+            
+            assert validate_refresh_token(refresh_token.token) == (False, None)
+
+
+class TestRefreshTokenRotation:
+    """Test single-use refresh tokens with family tracking"""
+    
+    def test_rotate_issues_successor(self, app, db_session, sample_user):
+        """Test that rotation revokes the old token and keeps the family"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            
+            new_token, user_id = rotate_refresh_token(token, expires_seconds=3600, ip_address="10.0.0.1")
+            
+            assert user_id == sample_user.id
+            assert new_token != token
+            assert validate_refresh_token(token) == (False, None)
+            assert validate_refresh_token(new_token) == (True, sample_user.id)
+            
+            old_record = RefreshToken.query.filter_by(id=int(token.split('.')[0])).first()
+            new_record = RefreshToken.query.filter_by(id=int(new_token.split('.')[0])).first()
+            assert new_record.family_id == old_record.family_id
+            assert new_record.ip_address == "10.0.0.1"
+    
+    def test_reuse_revokes_family(self, app, db_session, sample_user):
+        """Test that replaying a rotated token revokes its successors"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            new_token, _ = rotate_refresh_token(token, expires_seconds=3600)
+            
+            # REPLAY THE OLD TOKEN
+            assert rotate_refresh_token(token, expires_seconds=3600) == (None, None)
+            
+            db_session.expire_all()
+            assert validate_refresh_token(new_token) == (False, None)
+    
+    def test_rotate_forged_token(self, app, db_session, sample_user):
+        """Test that a wrong secret neither rotates nor revokes"""
+        with app.app_context():
+            token = create_refresh_token(user_id=sample_user.id, expires_seconds=3600)
+            token_id = token.split('.')[0]
+            
+            assert rotate_refresh_token(f"{token_id}.forged", expires_seconds=3600) == (None, None)
+            assert validate_refresh_token(token) == (True, sample_user.id)
+    
+    @pytest.mark.parametrize('token_str', ["².abc", "٣.abc", "99999999999.abc"])
+    def test_rotate_malformed_selector(self, app, client, db_session, token_str, monkeypatch):
+        """Test that rotating a token with a malformed selector is an invalid token, not a server error"""
+        monkeypatch.setitem(app.config, 'JWT_REFRESH_TOKEN_ROTATION', True)
+        
+        response = client.post('/auth/refresh', json={"refresh_token": token_str})
+        
+        assert response.status_code == 401
+        with app.app_context():
+            assert rotate_refresh_token(token_str, expires_seconds=3600) == (None, None)
+    
+    def test_rotate_legacy_token(self, app, db_session, refresh_token):
+        """Test that legacy raw tokens are exchanged for new-format tokens"""
+        with app.app_context():
+            new_token, user_id = rotate_refresh_token(refresh_token.token, expires_seconds=3600)
+            
+            assert user_id == refresh_token.user_id
+            assert '.' in new_token
+            assert validate_refresh_token(refresh_token.token) == (False, None)
+
+
+@pytest.fixture
+def stateless_tokens(app):
+    """Switch verification tokens to signed, stateless mode for one test"""
+    app.config['VERIFICATION_TOKENS_STATELESS'] = True
+    yield
+    app.config['VERIFICATION_TOKENS_STATELESS'] = False
+
+class TestStatelessVerificationTokens:
+    """Test signed verification tokens (VERIFICATION_TOKENS_STATELESS)"""
+    
+    def test_generate_writes_no_rows(self, app, db_session, unverified_user, stateless_tokens):
+        """Test that stateless tokens are not stored"""
+        with app.app_context():
+            token = generate_verification_token(unverified_user.id, 'email')
+            
+            assert '.' in token
+            assert VerificationToken.query.count() == 0
+            assert validate_verification_token(token, 'email') == unverified_user.id
+    
+    def test_email_token_is_single_use(self, app, db_session, unverified_user, stateless_tokens):
+        """Test that an email token stops working once the user is verified"""
+        with app.app_context():
+            token = generate_verification_token(unverified_user.id, 'email')
+            
+            db_session.get(User, unverified_user.id).is_verified = True
+            db_session.commit()
+            
+            assert validate_verification_token(token, 'email') is None
+    
+    def test_reset_token_dies_with_password_change(self, app, db_session, sample_user, stateless_tokens):
+        """Test that a reset token stops working once the password hash changes"""
+        with app.app_context():
+            token = generate_verification_token(sample_user.id, 'password_reset', expiration_hours=1)
+            assert validate_verification_token(token, 'password_reset') == sample_user.id
+            
+            db_session.get(User, sample_user.id).password_hash = 'changed'
+            db_session.commit()
+            
+            assert validate_verification_token(token, 'password_reset') is None
+    
+    def test_wrong_purpose_rejected(self, app, db_session, sample_user, stateless_tokens):
+        """Test that a token signed for one purpose is rejected for another"""
+        with app.app_context():
+            token = generate_verification_token(sample_user.id, 'email')
+            
+            assert validate_verification_token(token, 'password_reset') is None
+    
+    def test_expired_and_tampered_rejected(self, app, db_session, unverified_user, stateless_tokens):
+        """Test that expired or modified tokens are rejected"""
+        with app.app_context():
+            expired = generate_verification_token(unverified_user.id, 'email', expiration_hours=-1)
+            valid = generate_verification_token(unverified_user.id, 'email')
+            
+            assert validate_verification_token(expired, 'email') is None
+            assert validate_verification_token(valid[:-2] + 'xx', 'email') is None
+    
+    def test_stored_tokens_still_accepted(self, app, verification_token, stateless_tokens):
+        """Test that tokens issued before switching modes keep working"""
+        with app.app_context():
+            assert validate_verification_token(verification_token.token, 'email') == verification_token.user_id
+    
+    def test_email_change_invalidates_token(self, app, db_session, sample_user, stateless_tokens):
+        """Test that a link stops working once the user's email address changes"""
+        with app.app_context():
+            token = generate_verification_token(sample_user.id, 'password_reset', expiration_hours=1)
+            
+            db_session.get(User, sample_user.id).email = 'changed@example.com'
+            db_session.commit()
+            
+            assert validate_verification_token(token, 'password_reset') is None
+    
+    def test_signed_tokens_rejected_when_mode_off(self, app, db_session, unverified_user, stateless_tokens):
+        """Test that signed tokens are only accepted in stateless mode or its transition window"""
+        with app.app_context():
+            token = generate_verification_token(unverified_user.id, 'email')
+            app.config['VERIFICATION_TOKENS_STATELESS'] = False
+            
+            assert validate_verification_token(token, 'email') is None
+            
+            until = datetime.now(timezone.utc) + timedelta(days=1)
+            app.config['VERIFICATION_TOKENS_STATELESS_UNTIL'] = until.isoformat()
+            try:
+                assert validate_verification_token(token, 'email') == unverified_user.id
+            finally:
+                app.config['VERIFICATION_TOKENS_STATELESS_UNTIL'] = None
+    
+    def test_default_secret_key_fails_at_startup(self, app):
+        """Test that signed tokens cannot be enabled with the default SECRET_KEY"""
+        app.config['VERIFICATION_TOKENS_STATELESS'] = True
+        app.config['SECRET_KEY'] = 'development-key'
+        try:
+            with pytest.raises(RuntimeError):
+                init_verification_tokens(app)
+        finally:
+            app.config['VERIFICATION_TOKENS_STATELESS'] = False
+            app.config['SECRET_KEY'] = 'test-secret-key-do-not-use-in-production'
@@ -0,0 +1,58 @@
+import pytest
+import time
+from utils.cache import TTLCache
+
+class TestTTLCache:
+    """Test the LRU + TTL cache"""
+
+    def test_get_and_set(self):
+        """Test storing and reading an entry"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire(self):
+        """Test that entries are dropped after their TTL"""
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set("key", "value")
+
+        time.sleep(0.1)
+
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" IS NOW LEAST RECENTLY USED
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_size_disables_cache(self):
+        """Test that maxsize=0 never retains entries"""
+        cache = TTLCache(maxsize=0, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") is None
+
+    def test_pop_and_discard_where(self):
+        """Test single and bulk invalidation"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", (1, "x"))
+        cache.set("b", (1, "y"))
+        cache.set("c", (2, "z"))
+
+        assert cache.pop("a") == (1, "x")
+        assert cache.discard_where(lambda value: value[0] == 1) == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == (2, "z")
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from configuration.test_config import TestConfig
+from models.user_model import db
+from utils.db_pool import InstrumentedQueuePool, WaitHistogram, engine_options, pool_stats
+
+@pytest.fixture
+def small_engine():
+    """Engine with one pooled connection and no overflow"""
+    config = {'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 0.1}}
+    engine = create_engine(TestConfig.SQLALCHEMY_DATABASE_URI, **engine_options(config, TestConfig.SQLALCHEMY_DATABASE_URI))
+    yield engine
+    engine.dispose()
+
+class TestDBPool:
+    """Test pool configuration and metrics"""
+
+    def test_app_engine_options(self, app):
+        """Test that the app's engine is built from the DB_POOL_* settings"""
+        with app.app_context():
+            pool = db.engine.pool
+        assert isinstance(pool, InstrumentedQueuePool)
+        assert pool.size() == TestConfig.DB_POOL_SIZE
+        assert pool._max_overflow == TestConfig.DB_MAX_OVERFLOW
+        assert pool._timeout == TestConfig.DB_POOL_TIMEOUT
+
+    def test_checkout_metrics(self, small_engine):
+        """Test that checked-out connections, waits and timeouts are counted"""
+        with small_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            stats = pool_stats(small_engine)
+            assert stats["checked_out"] == 1 and stats["overflow"] == 0
+
+            # THE ONLY CONNECTION IS IN USE
+            with pytest.raises(PoolTimeoutError):
+                small_engine.connect()
+
+        stats = pool_stats(small_engine)
+        assert stats["checked_out"] == 0
+        assert stats["timeouts"] == 1
+        assert stats["wait"]["count"] == 1
+
+    def test_metrics_survive_pool_recreation(self, small_engine):
+        """Test that dispose() keeps the recorded waits"""
+        with small_engine.connect():
+            pass
+        small_engine.dispose()
+
+        assert pool_stats(small_engine)["wait"]["count"] == 1
+
+    def test_wait_histogram_buckets(self):
+        """Test that waits land in the first bucket bounding them"""
+        histogram = WaitHistogram(bounds_ms=(1, 10))
+        for seconds in (0.0005, 0.001, 0.005, 0.5):
+            histogram.observe(seconds)
+
+        stats = histogram.stats()
+        assert stats["buckets"] == {"le_1ms": 2, "le_10ms": 1, "inf": 1}
+        assert stats["max_ms"] == 500
+
+    def test_pgbouncer_transaction_mode(self):
+        """Test that psycopg 3 prepared statements are turned off behind PgBouncer"""
+        config = {'DB_PGBOUNCER_TRANSACTION_MODE': True, 'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'connect_timeout': 5}}}
+
+        options = engine_options(config, "postgresql+psycopg://u:p@pgbouncer/auth")
+        assert options['connect_args'] == {'connect_timeout': 5, 'prepare_threshold': None}
+
+        # psycopg2 HAS NO SERVER-SIDE PREPARED STATEMENTS TO TURN OFF
+        options = engine_options(config, "postgresql://u:p@pgbouncer/auth")
+        assert options['connect_args'] == {'connect_timeout': 5}
+
+    def test_metrics_route(self, client):
+        """Test that pool statistics are exposed"""
+        stats = client.get('/metrics').get_json()["db_pool"]
+        assert {"checked_out", "overflow", "wait"} <= set(stats)
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import event
+from models.user_model import db, User
+from services.auth_service import AuthService
+from utils.email_filter import RegisteredEmailFilter
+
+@pytest.fixture
+def email_filter(app, db_session, sample_user):
+    """A built registered email filter installed on the app"""
+    with app.app_context():
+        email_filter = RegisteredEmailFilter(rebuild_interval=3600, sync_interval=3600)
+        email_filter.rebuild()
+    app.extensions['email_filter'] = email_filter
+    yield email_filter
+    app.extensions['email_filter'] = None
+
+@pytest.fixture
+def user_queries(app):
+    """Statements that read the users table"""
+    statements = []
+    listener = lambda *args: 'FROM users' in args[2] and statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', listener)
+    yield statements
+    with app.app_context():
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+class TestRegisteredEmailFilter:
+    """Test the Bloom filter of registered emails"""
+
+    def test_rebuild(self, app, email_filter, sample_user):
+        """Test that registered emails are found whatever their case and unknown ones are not"""
+        with app.app_context():
+            assert email_filter.might_exist(sample_user.email) is True
+            assert email_filter.might_exist("TEST@Example.com") is True
+            assert email_filter.might_exist("nobody@example.com") is False
+
+            stats = email_filter.stats()
+            assert stats["ready"] is True
+            assert stats["entries"] == 1
+            assert stats["size_bytes"] > 0
+            assert stats["db_lookups_skipped"] == 1
+
+    def test_not_ready_allows_everything(self, app, db_session):
+        """Test that every email may exist until the first build is done"""
+        email_filter = RegisteredEmailFilter(rebuild_interval=3600)
+        email_filter._rebuild_lock.acquire()  # A BUILD IS "RUNNING"
+
+        with app.app_context():
+            assert email_filter.might_exist("nobody@example.com") is True
+
+    def test_sync_picks_up_other_processes(self, app, email_filter):
+        """Test that users created elsewhere reach the filter on sync"""
+        with app.app_context():
+            db.session.add(User(name="Elsewhere", email="elsewhere@example.com", password_hash="x"))
+            db.session.commit()
+            assert email_filter.might_exist("elsewhere@example.com") is False  # NOT SYNCED YET
+
+            email_filter.sync()
+            assert email_filter.might_exist("elsewhere@example.com") is True
+
+    def test_registration_adds_email(self, app, email_filter):
+        """Test that registering makes the email visible at once in this process"""
+        with app.app_context():
+            user, error = AuthService().register_user("New", "New@Example.com", "Password123!")
+
+            assert error is None
+            assert email_filter.might_exist("new@example.com") is True
+
+    def test_stale_filter_registration(self, app, email_filter):
+        """Test that the unique index still rejects a taken email the filter does not know yet"""
+        with app.app_context():
+            db.session.add(User(name="Elsewhere", email="taken@example.com", password_hash="x"))
+            db.session.commit()
+
+            user, error = AuthService().register_user("Again", "taken@example.com", "Password123!")
+
+            assert user is None
+            assert error == "Email already registered"
+
+    def test_unknown_email_skips_database(self, app, email_filter, user_queries, monkeypatch):
+        """Test that login and password reset do not query for unknown emails, and login still hashes"""
+        checks = []
+        with app.app_context():
+            executor = app.extensions['hashing_executor']
+            original = executor.check_password
+            monkeypatch.setattr(executor, 'check_password', lambda *args: checks.append(args) or original(*args))
+
+            result, error = AuthService().authenticate_user("nobody@example.com", "Password123!")
+            assert error == "Invalid email or password"
+            assert AuthService().request_password_reset("nobody@example.com") == (True, None)
+
+        assert user_queries == []
+        assert len(checks) == 1  # DUMMY HASH - SAME WORK AS A WRONG PASSWORD
+
+    def test_known_email_still_logs_in(self, app, email_filter, sample_user):
+        """Test that a registered user logs in with the filter enabled"""
+        with app.app_context():
+            result, error = AuthService().authenticate_user("Test@Example.com", "Password123!")
+
+            assert error is None
+            assert result["user"]["email"] == sample_user.email
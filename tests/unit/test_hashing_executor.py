@@ -0,0 +1,110 @@
+import pytest
+import time
+import threading
+from utils.hashing_executor import (
+    HashingExecutor,
+    HashingQueueFull,
+    HashingTimeout,
+    get_hashing_executor
+)
+from utils.user_utils import hash_password
+
+class TestHashingExecutor:
+    """Test the bounded password hashing pool"""
+
+    def test_disabled_executor_runs_inline(self):
+        """Test that a disabled executor hashes on the calling thread"""
+        executor = HashingExecutor(enabled=False)
+
+        hashed = executor.hash_password("Password123!")
+
+        assert executor.check_password("Password123!", hashed) is True
+        assert executor.stats()["submitted"] == 0
+
+    def test_pool_hash_and_check(self):
+        """Test hashing and checking a password on worker processes"""
+        executor = HashingExecutor(max_workers=1, max_queue=1, timeout=30)
+        try:
+            hashed = executor.hash_password("Password123!")
+
+            assert executor.check_password("Password123!", hashed) is True
+            assert executor.check_password("WrongPassword123!", hashed) is False
+
+            stats = executor.stats()
+            assert stats["submitted"] == 3
+            assert stats["completed"] == 3
+            assert stats["in_flight"] == 0
+        finally:
+            executor.shutdown()
+
+    def test_pool_accepts_hashes_from_inline_path(self):
+        """Test that pool workers verify hashes created inline"""
+        executor = HashingExecutor(max_workers=1, max_queue=0, timeout=30)
+        try:
+            assert executor.check_password("Password123!", hash_password("Password123!")) is True
+        finally:
+            executor.shutdown()
+
+    def test_workers_are_not_forked(self):
+        """Test that workers start clean instead of forking the (threaded) server process"""
+        executor = HashingExecutor(max_workers=1, max_queue=0, timeout=30)
+        try:
+            assert executor._get_pool()._mp_context.get_start_method() in ('forkserver', 'spawn')
+            assert executor.check_password("Password123!", hash_password("Password123!")) is True
+        finally:
+            executor.shutdown()
+
+    def test_queue_full_rejects_immediately(self):
+        """Test that jobs beyond the queue bound are rejected"""
+        executor = HashingExecutor(max_workers=1, max_queue=0, timeout=30)
+        try:
+            # OCCUPY THE ONLY SLOT
+            worker = threading.Thread(target=executor.submit, args=(time.sleep, 1))
+            worker.start()
+            time.sleep(0.2)
+
+            with pytest.raises(HashingQueueFull):
+                executor.submit(time.sleep, 0)
+
+            worker.join()
+            assert executor.stats()["rejected"] == 1
+        finally:
+            executor.shutdown()
+
+    def test_timeout(self):
+        """Test that slow jobs raise after the per-call timeout and keep their slot until they end"""
+        executor = HashingExecutor(max_workers=1, max_queue=0, timeout=0.5)
+        try:
+            executor.submit(time.sleep, 0)  # START THE WORKER
+            with pytest.raises(HashingTimeout):
+                executor.submit(time.sleep, 1.5)
+
+            stats = executor.stats()
+            assert stats["timeouts"] == 1
+            assert stats["in_flight"] == 1 and stats["abandoned"] == 1
+
+            # THE ABANDONED JOB STILL OCCUPIES THE WORKER
+            with pytest.raises(HashingQueueFull):
+                executor.submit(time.sleep, 0)
+
+            time.sleep(1.5)
+            stats = executor.stats()
+            assert stats["in_flight"] == 0 and stats["abandoned"] == 0
+            executor.submit(time.sleep, 0)
+        finally:
+            executor.shutdown()
+
+    def test_app_executor_from_config(self, app):
+        """Test that the app executor is built from config"""
+        with app.app_context():
+            executor = get_hashing_executor()
+
+            assert executor is app.extensions['hashing_executor']
+            assert executor.enabled is False  # DISABLED IN TEST CONFIG
+
+    def test_metrics_route(self, client):
+        """Test that hashing metrics are exposed"""
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert "queue_depth" in response.get_json()["hashing"]
@@ -0,0 +1,119 @@
+import pytest
+from datetime import timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from models.user_model import db
+from utils.auth_utils import create_refresh_token, revoke_refresh_token, bump_user_token_version
+
+API_KEY = 'test-introspection-key'
+
+@pytest.fixture
+def introspect(app, client):
+    """POST /auth/introspect with a valid API key"""
+    app.config['INTROSPECTION_API_KEYS'] = [API_KEY]
+    try:
+        yield lambda body, key=API_KEY: client.post('/auth/introspect', json=body, headers={'X-API-Key': key})
+    finally:
+        app.config['INTROSPECTION_API_KEYS'] = []
+
+def _access_token(app, user, **kwargs):
+    with app.app_context():
+        return create_access_token(identity=str(user.id), additional_claims={"ver": user.token_version}, **kwargs)
+
+def _refresh_token(app, user):
+    with app.app_context():
+        return create_refresh_token(user.id, token_version=user.token_version)
+
+class TestIntrospection:
+    """Test batch token introspection"""
+
+    def test_requires_api_key(self, introspect, db_session):
+        """Test that requests without a configured API key are rejected"""
+        assert introspect({"tokens": ["x"]}, key='wrong').status_code == 401
+        assert introspect({"tokens": ["x"]}, key='').status_code == 401
+
+    def test_invalid_requests(self, app, introspect, db_session):
+        """Test that malformed or oversized batches are rejected"""
+        assert introspect({}).status_code == 400
+        assert introspect({"tokens": [1]}).status_code == 400
+
+        app.config['INTROSPECTION_MAX_TOKENS'] = 2
+        try:
+            assert introspect({"tokens": ["a", "b", "c"]}).status_code == 400
+        finally:
+            app.config['INTROSPECTION_MAX_TOKENS'] = 100
+
+    def test_mixed_batch(self, app, introspect, db_session, sample_user, admin_user, refresh_token):
+        """Test active and inactive access and refresh tokens in one request, in order"""
+        access = _access_token(app, sample_user)
+        admin_refresh = _refresh_token(app, admin_user)
+        revoked = _refresh_token(app, sample_user)
+        expired = _access_token(app, sample_user, expires_delta=timedelta(seconds=-10))
+        with app.app_context():
+            revoke_refresh_token(revoked)
+
+        response = introspect({"tokens": [
+            access,
+            {"token": admin_refresh, "token_type_hint": "refresh_token"},
+            refresh_token.token,  # LEGACY RAW TOKEN
+            revoked,
+            expired,
+            "garbage"
+        ]})
+
+        assert response.status_code == 200
+        results = response.get_json()["results"]
+        assert results[0]["active"] is True
+        assert results[0]["token_type"] == "access_token"
+        assert results[0]["sub"] == str(sample_user.id)
+        assert results[0]["username"] == sample_user.email
+        assert results[1]["token_type"] == "refresh_token"
+        assert results[1]["role"] == "admin"
+        assert results[2]["active"] is True
+        assert results[3:] == [{"active": False}] * 3
+
+    def test_malformed_selectors_in_batch(self, app, introspect, db_session, sample_user):
+        """Test that refresh tokens with malformed selectors are inactive without failing the batch"""
+        valid = _refresh_token(app, sample_user)
+
+        response = introspect({"tokens": [
+            {"token": "².x", "token_type_hint": "refresh_token"},
+            valid,
+            "٣.x",
+            "99999999999.x"
+        ]})
+
+        assert response.status_code == 200
+        results = response.get_json()["results"]
+        assert results[1]["active"] is True
+        assert [results[0], results[2], results[3]] == [{"active": False}] * 3
+
+    def test_logged_out_everywhere(self, app, introspect, db_session, sample_user):
+        """Test that tokens issued before a token version bump are inactive"""
+        tokens = [_access_token(app, sample_user), _refresh_token(app, sample_user)]
+        with app.app_context():
+            bump_user_token_version(sample_user.id)
+
+        results = introspect({"tokens": tokens}).get_json()["results"]
+
+        assert results == [{"active": False}] * 2
+
+    def test_constant_queries(self, app, introspect, db_session, sample_user, admin_user):
+        """Test one refresh token query and one user query, however many tokens"""
+        def count_queries(tokens):
+            statements = []
+            # PERIODIC DENYLIST SYNCS DO NOT DEPEND ON THE BATCH
+            listener = lambda *args: 'revoked_access_tokens' not in args[2] and statements.append(args[2])
+            with app.app_context():
+                event.listen(db.engine, 'before_cursor_execute', listener)
+                try:
+                    assert introspect({"tokens": tokens}).status_code == 200
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', listener)
+            return len(statements)
+
+        users = [sample_user, admin_user]
+        small = [_access_token(app, sample_user), _refresh_token(app, sample_user)]
+        large = [_access_token(app, user) for user in users * 5] + [_refresh_token(app, user) for user in users * 5]
+
+        assert count_queries(large) == count_queries(small) == 2
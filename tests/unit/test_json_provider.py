@@ -0,0 +1,61 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from flask import jsonify
+from utils import json_provider
+from utils.json_provider import FastJSONProvider
+
+PAYLOAD = {
+    "user": {"id": 1, "name": "Zoë", "created_at": datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)},
+    "count": 2,
+    "ids": (1, 2)
+}
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def encoder(request, app, monkeypatch):
+    """Run a test with each encoder"""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    return request.param
+
+class TestFastJSONProvider:
+    """Test the app's JSON provider"""
+
+    def test_app_uses_provider(self, app):
+        """Test that jsonify goes through the fast provider"""
+        assert isinstance(app.json, FastJSONProvider)
+
+    def test_datetimes_as_iso_8601(self, app, encoder):
+        """Test that datetimes are encoded natively, the same way by both encoders"""
+        data = json.loads(app.json.dumps(PAYLOAD))
+
+        assert data["user"]["created_at"] == "2024-05-01T12:30:15.250000+00:00"
+        assert data["user"]["name"] == "Zoë"
+        assert data["ids"] == [1, 2]
+
+    def test_response_round_trip(self, app, encoder):
+        """Test that responses are encoded once with a trailing newline and read back"""
+        with app.test_request_context():
+            response = jsonify(PAYLOAD)
+
+        assert response.mimetype == "application/json"
+        assert response.get_data().endswith(b"\n")
+        assert app.json.loads(response.get_data())["count"] == 2
+
+    def test_unsupported_type(self, app, encoder):
+        """Test that unknown objects are still rejected"""
+        with pytest.raises(TypeError):
+            app.json.dumps({"value": object()})
+
+    def test_login_payload(self, client, db_session, sample_user):
+        """Test that the login body carries the refresh token and ISO timestamps"""
+        response = client.post('/auth/login', json={"email": sample_user.email, "password": "Password123!"})
+        data = response.get_json()
+
+        assert response.status_code == 200
+        assert data["refresh_token"]
+        assert data["user"]["email"] == sample_user.email
+        assert datetime.fromisoformat(data["user"]["created_at"]) == sample_user.created_at
+        assert "access_token" in response.headers.get("Set-Cookie", "")
@@ -0,0 +1,100 @@
+import pytest
+import time
+import jwt
+from datetime import timedelta
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import CSRFError
+from utils.jwt_decode_cache import get_jwt_decode_cache, init_jwt_decode_cache
+
+@pytest.fixture
+def decode_cache(app):
+    """The app's decode cache, emptied"""
+    with app.app_context():
+        cache = get_jwt_decode_cache()
+        cache.clear()
+        yield cache
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count signature verifications"""
+    calls = []
+    original = jwt.decode
+    def counting_decode(*args, **kwargs):
+        if (kwargs.get('options') or {}).get('verify_signature', True):
+            calls.append(args[0])
+        return original(*args, **kwargs)
+    monkeypatch.setattr('flask_jwt_extended.tokens.jwt.decode', counting_decode)
+    return calls
+
+class TestJWTDecodeCache:
+    """Test caching verified access token claims"""
+
+    def test_repeat_decode_skips_verification(self, app, decode_cache, decode_calls):
+        """Test that a token is only verified once"""
+        token = create_access_token(identity="7")
+
+        first = decode_token(token)
+        second = decode_token(token)
+
+        assert first == second and first["sub"] == "7"
+        assert len(decode_calls) == 1
+        assert decode_cache.stats()["hits"] == 1
+
+    def test_claims_are_copies(self, app, decode_cache):
+        """Test that modifying returned claims does not change the cache"""
+        token = create_access_token(identity="7")
+        decode_token(token)["sub"] = "tampered"
+
+        assert decode_token(token)["sub"] == "7"
+
+    def test_entries_end_at_exp(self, app, decode_cache):
+        """Test that a cached token is verified again (and rejected) once expired"""
+        token = create_access_token(identity="7", expires_delta=timedelta(seconds=1))
+        decode_token(token)
+
+        time.sleep(1.1)
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            decode_token(token)
+
+    def test_invalid_tokens_not_cached(self, app, decode_cache):
+        """Test that only successful decodes are cached"""
+        token = create_access_token(identity="7")
+        forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+        for _ in range(2):
+            with pytest.raises(jwt.InvalidTokenError):
+                decode_token(forged)
+        assert len(decode_cache) == 0
+
+    def test_csrf_checked_on_cache_hits(self, app, decode_cache):
+        """Test that the double submit value is compared on every request"""
+        token = create_access_token(identity="7", additional_claims={"csrf": "expected"})
+        decode_token(token)
+
+        assert decode_token(token, csrf_value="expected")["sub"] == "7"
+        with pytest.raises(CSRFError):
+            decode_token(token, csrf_value="wrong")
+
+    def test_protected_route_uses_cache(self, app, client, db_session, auth_headers, decode_cache, decode_calls):
+        """Test that repeat requests with the same token verify it once and still check revocation"""
+        for _ in range(3):
+            assert client.get('/auth/me', headers=auth_headers).status_code == 200
+        assert len(decode_calls) == 1
+
+        client.post('/auth/logout', json={}, headers=auth_headers)
+        assert client.get('/auth/me', headers=auth_headers).status_code == 401
+
+        assert "jwt_decode_cache" in client.get('/metrics').get_json()
+
+    def test_unsupported_version_disables_cache(self, app, monkeypatch):
+        """Test that the cache stays off on a Flask-JWT-Extended release it was not checked against"""
+        monkeypatch.setattr('flask_jwt_extended.__version__', '99.0.0')
+        try:
+            assert init_jwt_decode_cache(app) is None
+            with app.app_context():
+                token = create_access_token(identity="7")
+                assert decode_token(token)["sub"] == "7"
+        finally:
+            monkeypatch.undo()
+            init_jwt_decode_cache(app)
@@ -0,0 +1,112 @@
+import os
+import time
+import pytest
+import jwt
+
+pytest.importorskip('cryptography')
+
+from flask_jwt_extended import create_access_token, decode_token
+from app import create_app
+from configuration.test_config import TestConfig
+from utils.jwt_keys import JWTKeySet, generate_key
+
+def _age(path, seconds):
+    """Backdate a key file"""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+@pytest.fixture
+def keys_dir(tmp_path):
+    """Keyset directory with one published RS256 key"""
+    _age(generate_key(str(tmp_path), 'RS256', kid='old'), 3600)
+    return tmp_path
+
+@pytest.fixture
+def rsa_app(keys_dir):
+    """App signing access tokens with the keyset"""
+    class KeySetConfig(TestConfig):
+        JWT_ALGORITHM = 'RS256'
+        JWT_KEYS_DIR = str(keys_dir)
+    return create_app(KeySetConfig)
+
+class TestJWTKeySet:
+    """Test loading and rotating the signing keyset"""
+
+    def test_new_key_signs_after_publish_delay(self, keys_dir):
+        """Test that a new key is published at once but only signs once published long enough"""
+        new_key = generate_key(str(keys_dir), 'RS256', kid='new')
+        keyset = JWTKeySet(str(keys_dir), 'RS256', publish_delay=300)
+
+        assert keyset.signing_key()[0] == 'old'
+        assert {key['kid'] for key in keyset.jwks()['keys']} == {'old', 'new'}
+
+        _age(new_key, 301)
+        assert keyset.reload().signing_key()[0] == 'new'
+
+    def test_public_only_and_mixed_keys(self, keys_dir):
+        """Test that Ed25519 and public-only keys are published but never sign as RS256"""
+        generate_key(str(keys_dir), 'EdDSA', kid='ed')
+        keyset = JWTKeySet(str(keys_dir), 'RS256', publish_delay=0)
+
+        jwks = {key['kid']: key for key in keyset.jwks()['keys']}
+        assert jwks['ed']['alg'] == 'EdDSA' and jwks['ed']['kty'] == 'OKP'
+        assert jwks['old']['alg'] == 'RS256' and 'n' in jwks['old']
+        assert 'd' not in jwks['old']  # NO PRIVATE PARTS
+        assert keyset.signing_key()[0] == 'old'
+
+    def test_no_signing_key(self, tmp_path):
+        """Test that a keyset without a usable private key is rejected"""
+        generate_key(str(tmp_path), 'EdDSA', kid='ed')
+
+        with pytest.raises(RuntimeError):
+            JWTKeySet(str(tmp_path), 'RS256')
+
+class TestAsymmetricTokens:
+    """Test RS256 tokens and the JWKS endpoint"""
+
+    def test_tokens_carry_kid_and_verify_with_jwks(self, rsa_app):
+        """Test that a token can be verified locally from the published JWKS"""
+        with rsa_app.app_context():
+            token = create_access_token(identity="42")
+            assert decode_token(token)['sub'] == "42"
+
+        assert jwt.get_unverified_header(token)['kid'] == 'old'
+
+        jwks = rsa_app.test_client().get('/.well-known/jwks.json').get_json()
+        key = jwt.PyJWKSet.from_dict(jwks)['old']
+        assert jwt.decode(token, key.key, algorithms=['RS256'])['sub'] == "42"
+
+    def test_publish_delay_covers_reload_and_cache(self, rsa_app):
+        """Test that a new key waits for every worker to reload and for cached JWKS to expire"""
+        keyset = rsa_app.extensions['jwt_keys']
+        assert keyset.publish_delay == rsa_app.config['JWKS_MAX_AGE'] + rsa_app.config['JWT_KEYS_RELOAD_INTERVAL']
+
+    def test_jwks_cache_headers(self, rsa_app):
+        """Test that the JWKS is cacheable and supports conditional requests"""
+        client = rsa_app.test_client()
+        response = client.get('/.well-known/jwks.json')
+
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'public, max-age=300'
+
+        etag = response.headers['ETag'].strip('"')
+        assert client.get('/.well-known/jwks.json', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_unknown_kid_and_hs256_rejected(self, rsa_app):
+        """Test that tokens with unknown keys or a shared-secret algorithm are rejected"""
+        forged = jwt.encode({"sub": "1"}, TestConfig.JWT_SECRET_KEY, algorithm='HS256', headers={"kid": "old"})
+        unknown = jwt.encode({"sub": "1"}, TestConfig.JWT_SECRET_KEY, algorithm='HS256', headers={"kid": "nope"})
+
+        with rsa_app.app_context():
+            for token in (forged, unknown):
+                with pytest.raises(jwt.InvalidTokenError):
+                    decode_token(token)
+
+    def test_generate_key_command(self, rsa_app, keys_dir):
+        """Test the generate-jwt-key CLI command"""
+        with rsa_app.app_context():
+            result = rsa_app.test_cli_runner().invoke(args=['generate-jwt-key', '--kid', 'cli', '--algorithm', 'EdDSA'])
+
+        assert result.exit_code == 0
+        assert (keys_dir / 'cli.pem').exists()
+        assert oct((keys_dir / 'cli.pem').stat().st_mode & 0o777) == '0o600'
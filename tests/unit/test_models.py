@@ -170,6 +170,27 @@ class TestVerificationTokenModel:
         with pytest.raises(IntegrityError):
             db_session.commit()
 
+    def test_one_token_per_user_and_type(self, db_session, sample_user):
+        """Test that a user has at most one token of each type"""
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
+        
+        db_session.add(VerificationToken(
+            user_id=sample_user.id,
+            token="first-email-token",
+            token_type="email",
+            expires_at=expires_at
+        ))
+        db_session.commit()
+        
+        db_session.add(VerificationToken(
+            user_id=sample_user.id,
+            token="second-email-token",
+            token_type="email",
+            expires_at=expires_at
+        ))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+
 class TestRefreshTokenModel:
     """Test RefreshToken model"""
     
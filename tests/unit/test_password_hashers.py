@@ -0,0 +1,113 @@
+import pytest
+from utils.password_hashers import (
+    get_hasher,
+    identify_hasher,
+    get_hasher_config,
+    init_password_hasher
+)
+from utils.user_utils import hash_password, check_password, needs_rehash
+from services.auth_service import AuthService
+from models.user_model import User
+
+# CHEAP PARAMETERS SO THE SUITE STAYS FAST
+FAST_PARAMS = {
+    'bcrypt': {'rounds': 4},
+    'scrypt': {'ln': 4, 'r': 8, 'p': 1},
+    'argon2id': {'time_cost': 1, 'memory_cost': 1024, 'parallelism': 1}
+}
+
+def _algorithms():
+    algorithms = ['bcrypt', 'scrypt']
+    try:
+        import argon2  # noqa: F401
+        algorithms.append('argon2id')
+    except ImportError:
+        pass
+    return algorithms
+
+class TestPasswordHashers:
+    """Test the password hasher registry"""
+
+    @pytest.mark.parametrize('algorithm', _algorithms())
+    def test_round_trip(self, algorithm):
+        """Test hashing and verifying with each algorithm"""
+        hashed = hash_password("TestPassword123!", algorithm, FAST_PARAMS[algorithm])
+
+        assert identify_hasher(hashed).algorithm == algorithm
+        assert check_password("TestPassword123!", hashed) is True
+        assert check_password("WrongPassword123!", hashed) is False
+
+    @pytest.mark.parametrize('algorithm', _algorithms())
+    def test_needs_rehash_on_parameter_change(self, algorithm):
+        """Test that changed parameters are detected"""
+        params = FAST_PARAMS[algorithm]
+        hashed = hash_password("TestPassword123!", algorithm, params)
+
+        assert needs_rehash(hashed, algorithm, params) is False
+
+        stronger = {key: value * 2 for key, value in params.items()}
+        assert needs_rehash(hashed, algorithm, stronger) is True
+
+    def test_needs_rehash_on_algorithm_change(self):
+        """Test that hashes of a non-preferred algorithm need migrating"""
+        hashed = hash_password("TestPassword123!", 'bcrypt', FAST_PARAMS['bcrypt'])
+
+        assert needs_rehash(hashed, 'scrypt', FAST_PARAMS['scrypt']) is True
+
+    def test_unknown_hash_format(self):
+        """Test that unrecognised hashes never verify"""
+        assert identify_hasher("plaintext-password") is None
+        assert check_password("plaintext-password", "plaintext-password") is False
+
+    @pytest.mark.parametrize('settings', ['ln=64,r=8,p=1', 'ln=0,r=8,p=1', 'ln=18,r=64,p=1', 'ln=4,r=8,p=0', 'ln=4,r=8,p=1073741823'])
+    def test_scrypt_hash_with_bad_parameters(self, settings):
+        """Test that stored scrypt parameters that are extreme or invalid fail verification instead of raising"""
+        salt, digest = hash_password("TestPassword123!", 'scrypt', FAST_PARAMS['scrypt']).split('$')[3:]
+        tampered = f"$scrypt${settings}${salt}${digest}"
+
+        assert check_password("TestPassword123!", tampered) is False
+        assert needs_rehash(tampered, 'scrypt', FAST_PARAMS['scrypt']) is True
+
+    def test_unknown_algorithm(self):
+        """Test requesting an unregistered algorithm"""
+        with pytest.raises(ValueError):
+            get_hasher('md5')
+
+    @pytest.mark.parametrize('setting, value, error', [
+        ('PASSWORD_HASHER', 'md5', ValueError),
+        ('PASSWORD_HASHER', 'argon2id', RuntimeError),
+        ('SCRYPT_LN', 25, ValueError),
+    ])
+    def test_bad_hasher_config_fails_at_startup(self, app, monkeypatch, setting, value, error):
+        """Test that an unusable hashing config is rejected when the app is created"""
+        monkeypatch.setattr('utils.password_hashers.Argon2PasswordHasher', None)  # argon2-cffi NOT INSTALLED
+        if setting == 'SCRYPT_LN':
+            monkeypatch.setitem(app.config, 'PASSWORD_HASHER', 'scrypt')
+        monkeypatch.setitem(app.config, setting, value)
+
+        with pytest.raises(error):
+            init_password_hasher(app)
+
+    def test_hasher_config(self, app):
+        """Test reading algorithm parameters from config"""
+        algorithm, params = get_hasher_config({'PASSWORD_HASHER': 'scrypt', 'SCRYPT_LN': 10})
+
+        assert algorithm == 'scrypt'
+        assert params == {'ln': 10, 'r': 8, 'p': 1}
+
+    def test_login_migrates_to_preferred_algorithm(self, app, db_session, sample_user):
+        """Test that users move to the preferred algorithm as they log in"""
+        with app.app_context():
+            app.config['PASSWORD_HASHER'] = 'scrypt'
+            try:
+                result, error = AuthService().authenticate_user(
+                    email=sample_user.email,
+                    password="Password123!"
+                )
+            finally:
+                app.config['PASSWORD_HASHER'] = 'bcrypt'
+
+            assert error is None
+            user = User.query.get(sample_user.id)
+            assert user.password_hash.startswith('$scrypt$')
+            assert check_password("Password123!", user.password_hash) is True
@@ -0,0 +1,130 @@
+import pytest
+from unittest.mock import patch
+from utils.bloom_filter import BloomFilter
+from utils.password_policy import PasswordPolicy
+from services.auth_service import AuthService
+
+class TestBloomFilter:
+    """Test the Bloom filter used for breached passwords"""
+
+    def test_added_items_are_members(self):
+        """Test that there are no false negatives"""
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        words = [f"password{i}" for i in range(1000)]
+        for word in words:
+            bloom.add(word)
+
+        assert all(word in bloom for word in words)
+
+    def test_false_positive_rate(self):
+        """Test that false positives stay near the configured rate"""
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"password{i}")
+
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        assert false_positives < 300  # 1% TARGET WITH GENEROUS MARGIN
+
+    def test_save_and_memory_map(self, tmp_path):
+        """Test reading a saved filter through mmap"""
+        bloom = BloomFilter.for_capacity(100)
+        bloom.add("hunter2")
+        path = tmp_path / "breached.bloom"
+        bloom.save(path)
+
+        mapped = BloomFilter.open(path)
+        try:
+            assert "hunter2" in mapped
+            assert "correct horse battery staple" not in mapped
+            assert mapped.count == 1
+            assert mapped.num_bits == bloom.num_bits
+        finally:
+            mapped.close()
+
+    def test_open_rejects_other_files(self, tmp_path):
+        """Test opening a file that is not a Bloom filter"""
+        path = tmp_path / "not-a-filter"
+        path.write_bytes(b"x" * 64)
+
+        with pytest.raises(ValueError):
+            BloomFilter.open(path)
+
+class TestPasswordPolicy:
+    """Test the configurable password policy"""
+
+    def test_min_length_is_configurable(self):
+        """Test a custom minimum length"""
+        policy = PasswordPolicy(min_length=16)
+
+        is_valid, message = policy.validate("Password123!")
+
+        assert is_valid is False
+        assert "16 characters" in message
+
+    def test_rules_can_be_disabled(self):
+        """Test a policy without the special character rule"""
+        policy = PasswordPolicy(require_special=False)
+
+        assert policy.validate("Password123") == (True, None)
+
+    def test_custom_special_chars(self):
+        """Test a custom special character set"""
+        policy = PasswordPolicy(special_chars="~")
+
+        assert policy.validate("Password123~") == (True, None)
+        assert policy.validate("Password123!")[0] is False
+
+    def test_breached_password_rejected(self):
+        """Test that passwords in the breach filter are rejected"""
+        breached = BloomFilter.for_capacity(10)
+        breached.add("Password123!")
+        policy = PasswordPolicy(breached_filter=breached)
+
+        is_valid, message = policy.validate("Password123!")
+
+        assert is_valid is False
+        assert "breach" in message
+        assert policy.validate("Different123!") == (True, None)
+
+    def test_missing_breach_filter_fails_at_startup(self, tmp_path):
+        """Test that a configured but missing breach filter is an error, not a disabled check"""
+        with pytest.raises(FileNotFoundError):
+            PasswordPolicy.from_config({'BREACHED_PASSWORD_FILTER_PATH': str(tmp_path / 'missing.bloom')})
+
+    def test_register_rejects_breached_password(self, app, db_session):
+        """Test that registration consults the app's breach filter"""
+        with app.app_context():
+            breached = BloomFilter.for_capacity(10)
+            breached.add("Password123!")
+            auth_service = AuthService()
+
+            with patch.dict(app.extensions, {'password_policy': PasswordPolicy(breached_filter=breached)}):
+                user, error = auth_service.register_user(
+                    name="Test User",
+                    email="breached@test.com",
+                    password="Password123!"
+                )
+
+            assert user is None
+            assert "breach" in error
+
+class TestBuildBreachedFilterCommand:
+    """Test the build-breached-filter CLI command"""
+
+    def test_build_filter(self, runner, tmp_path):
+        """Test building a filter from a word list"""
+        wordlist = tmp_path / "breached.txt"
+        wordlist.write_text("123456\npassword\nPassword123!\n\n")
+        output = tmp_path / "breached.bloom"
+
+        result = runner.invoke(args=['build-breached-filter', str(wordlist), str(output)])
+
+        assert result.exit_code == 0
+        assert "3 passwords" in result.output
+
+        bloom = BloomFilter.open(output)
+        try:
+            assert "Password123!" in bloom
+            assert "password" in bloom
+        finally:
+            bloom.close()
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from utils.token_denylist import AccessTokenDenylist
+from utils.token_store import get_token_store
+
+def _expiry():
+    return datetime.now(timezone.utc) + timedelta(minutes=5)
+
+class TestAccessTokenDenylist:
+    """Test the Bloom-filtered access token denylist"""
+
+    def test_unrevoked_tokens_skip_the_store(self, app, db_session):
+        """Test that filter negatives are answered without a store lookup"""
+        with app.app_context():
+            denylist = AccessTokenDenylist(lifetime=300, capacity=1000, sync_interval=60)
+
+            for i in range(100):
+                assert denylist.is_revoked(f"jti-{i}") is False
+
+            stats = denylist.stats()
+            assert stats["checks"] == 100
+            assert stats["filter_positives"] <= 1
+
+    def test_revoke(self, app, db_session):
+        """Test that a revoked jti is denied"""
+        with app.app_context():
+            denylist = AccessTokenDenylist(lifetime=300, capacity=1000, sync_interval=60)
+            denylist.revoke("revoked-jti", _expiry())
+
+            assert denylist.is_revoked("revoked-jti") is True
+            assert denylist.stats()["false_positives"] == 0
+
+    def test_sync_picks_up_other_processes(self, app, db_session):
+        """Test that revocations written by another process reach the filter on sync"""
+        with app.app_context():
+            denylist = AccessTokenDenylist(lifetime=300, capacity=1000, sync_interval=60)
+            assert denylist.is_revoked("elsewhere") is False  # FIRST CHECK SYNCS
+
+            get_token_store().revoke_access_token("elsewhere", _expiry())
+            assert denylist.is_revoked("elsewhere") is False  # NOT SYNCED YET
+
+            assert denylist.sync() == 1
+            assert denylist.is_revoked("elsewhere") is True
+
+    def test_generations_rotate(self, app, db_session, monkeypatch):
+        """Test that entries leave the filter two lifetimes after revocation"""
+        with app.app_context():
+            denylist = AccessTokenDenylist(lifetime=300, capacity=1000, sync_interval=10 ** 6)
+            denylist.sync()
+            denylist._add("old-jti")
+            started = denylist._generation_started
+
+            monkeypatch.setattr('utils.token_denylist.time.monotonic', lambda: started + 301)
+            denylist.is_revoked("other")
+            assert "old-jti" in denylist._previous
+
+            monkeypatch.setattr('utils.token_denylist.time.monotonic', lambda: started + 602)
+            denylist.is_revoked("other")
+            assert "old-jti" not in denylist._current
+            assert "old-jti" not in denylist._previous
+
+class TestLogoutRevokesAccessToken:
+    """Test that logout stops the access token from working"""
+
+    def test_logout_denies_access_token(self, client, db_session, sample_user, auth_headers):
+        """Test that a logged out access token is rejected by protected routes"""
+        assert client.get('/auth/me', headers=auth_headers).status_code == 200
+
+        response = client.post('/auth/logout', json={}, headers=auth_headers)
+        assert response.status_code == 200
+
+        assert client.get('/auth/me', headers=auth_headers).status_code == 401
+
+    def test_logout_all_denies_access_tokens(self, client, db_session, sample_user, auth_headers):
+        """Test that logging out everywhere rejects access tokens issued before"""
+        response = client.post('/auth/logout-all', headers=auth_headers)
+        assert response.status_code == 200
+
+        assert client.get('/auth/me', headers=auth_headers).status_code == 401
+
+    def test_logout_without_access_token(self, client, db_session):
+        """Test that logout still succeeds with no or an invalid access token"""
+        assert client.post('/auth/logout', json={}).status_code == 200
+        assert client.post('/auth/logout', json={}, headers={'Authorization': 'Bearer nonsense'}).status_code == 200
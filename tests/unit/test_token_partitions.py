@@ -0,0 +1,57 @@
+import pytest
+from datetime import datetime, timezone
+from models.refresh_token_model import PARTITIONED
+from models.user_model import db
+from services.token_partitions import partition_name, partition_bounds, manage_partitions, list_partitions, partitions_ahead
+
+class TestTokenPartitionNaming:
+    """Test monthly partition naming"""
+
+    def test_partition_name(self):
+        """Test that partitions are named after their month"""
+        assert partition_name(datetime(2026, 3, 1, tzinfo=timezone.utc)) == "refresh_tokens_p202603"
+
+    def test_partition_bounds(self):
+        """Test parsing the range back from a name (including year rollover)"""
+        start, end = partition_bounds("refresh_tokens_p202612")
+
+        assert start == datetime(2026, 12, 1, tzinfo=timezone.utc)
+        assert end == datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+    def test_partition_bounds_foreign_name(self):
+        """Test that unrelated tables are ignored"""
+        assert partition_bounds("refresh_tokens_pkey") is None
+        assert partition_bounds("users") is None
+
+class TestManageTokenPartitions:
+    """Test partition maintenance"""
+
+    def test_partitions_ahead_from_config(self, app, monkeypatch):
+        """Test that table creation and the command use REFRESH_TOKEN_PARTITIONS_AHEAD"""
+        monkeypatch.setitem(app.config, 'REFRESH_TOKEN_PARTITIONS_AHEAD', 7)
+        with app.app_context():
+            assert partitions_ahead() == 7
+
+    @pytest.mark.skipif(PARTITIONED, reason="schema is partitioned")
+    def test_command_requires_partitioned_schema(self, app, runner, db_session):
+        """Test that the command refuses to run on a plain table"""
+        result = runner.invoke(args=['manage-token-partitions'])
+
+        assert result.exit_code != 0
+        assert "not partitioned" in result.output
+
+    @pytest.mark.skipif(not PARTITIONED, reason="set REFRESH_TOKENS_PARTITIONED=true")
+    def test_create_and_drop(self, app, db_session):
+        """Test creating future partitions and dropping expired ones"""
+        with app.app_context():
+            now = datetime.now(timezone.utc)
+            result = manage_partitions(months_ahead=5, drop_expired=False, now=now)
+            assert partition_name(datetime(now.year, now.month, 1, tzinfo=timezone.utc)) in list_partitions(db.session.connection())
+
+            # A YEAR LATER EVERYTHING CREATED SO FAR HAS EXPIRED
+            later = now.replace(year=now.year + 1)
+            result = manage_partitions(months_ahead=0, drop_expired=True, now=later)
+            assert partition_name(datetime(now.year, now.month, 1, tzinfo=timezone.utc)) in result["dropped"]
+            
+            # RESTORE PARTITIONS FOR THE REST OF THE SUITE
+            manage_partitions(months_ahead=3, drop_expired=False, months_back=1, now=now)
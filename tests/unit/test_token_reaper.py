@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event
+from datetime import datetime, timezone, timedelta
+from models.user_model import db
+from utils.token_store import SQLTokenStore
+from services.token_reaper import reap_expired_tokens, TokenReaper
+from models.refresh_token_model import RefreshToken
+from models.verification_model import VerificationToken
+from models.revoked_access_token_model import RevokedAccessToken
+
+@pytest.fixture
+def reapable_tokens(db_session, sample_user):
+    """Create a mix of live, expired and revoked tokens"""
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        RefreshToken(token="live", user_id=sample_user.id, expires_at=now + timedelta(days=1)),
+        RefreshToken(token="expired-1", user_id=sample_user.id, expires_at=now - timedelta(days=1)),
+        RefreshToken(token="expired-2", user_id=sample_user.id, expires_at=now - timedelta(days=2)),
+        RefreshToken(token="expired-3", user_id=sample_user.id, expires_at=now - timedelta(days=3)),
+        RefreshToken(token="revoked-old", user_id=sample_user.id, is_revoked=True,
+                     created_at=now - timedelta(days=3), revoked_at=now - timedelta(days=2),
+                     expires_at=now + timedelta(days=1)),
+        # ISSUED LONG AGO BUT ROTATED JUST NOW - STILL NEEDED FOR REUSE DETECTION
+        RefreshToken(token="revoked-recent", user_id=sample_user.id, is_revoked=True,
+                     created_at=now - timedelta(hours=25), revoked_at=now - timedelta(seconds=1),
+                     expires_at=now + timedelta(days=1)),
+        VerificationToken(token="email-live", token_type="email", user_id=sample_user.id,
+                          expires_at=now + timedelta(hours=1)),
+        VerificationToken(token="reset-expired", token_type="password_reset", user_id=sample_user.id,
+                          expires_at=now - timedelta(hours=1)),
+        RevokedAccessToken(jti="access-live", expires_at=now + timedelta(minutes=5)),
+        RevokedAccessToken(jti="access-expired", expires_at=now - timedelta(minutes=5))
+    ])
+    db_session.commit()
+
+class TestTokenReaper:
+    """Test the batched expired token reaper"""
+
+    def test_reap_in_batches(self, app, db_session, reapable_tokens):
+        """Test that expired and old revoked rows are deleted across batches"""
+        with app.app_context():
+            result = reap_expired_tokens(batch_size=2, revoked_grace_seconds=86400)
+
+            assert result["refresh_tokens"] == 4
+            assert result["verification_tokens"] == 1
+            remaining = {token.token for token in RefreshToken.query.all()}
+            assert remaining == {"live", "revoked-recent"}
+            assert VerificationToken.query.count() == 1
+            assert result["revoked_access_tokens"] == 1
+            assert RevokedAccessToken.query.count() == 1
+
+    def test_max_batches(self, app, db_session, reapable_tokens):
+        """Test that a run can be capped to a number of batches"""
+        with app.app_context():
+            result = reap_expired_tokens(batch_size=1, max_batches=2)
+
+            assert result["refresh_tokens"] == 2
+
+    def test_grace_runs_from_revocation(self, app, db_session, sample_user):
+        """Test that a token issued long ago but rotated just now survives for reuse detection"""
+        now = datetime.now(timezone.utc)
+        with app.app_context():
+            store = SQLTokenStore()
+            token = store.create_refresh_token(sample_user.id, now + timedelta(days=1))
+            RefreshToken.query.update({'created_at': now - timedelta(hours=25)})
+            db.session.commit()
+            new_token, _, _ = store.rotate_refresh_token(token, now + timedelta(days=1))
+            store.revoke_refresh_family(store.get_refresh_token(new_token).family_id)
+
+            assert RefreshToken.query.filter(RefreshToken.revoked_at.is_(None)).count() == 0
+            assert reap_expired_tokens(revoked_grace_seconds=86400)["refresh_tokens"] == 0
+            assert store.get_refresh_token(token).is_revoked is True
+
+            # ONCE THE GRACE PERIOD HAS PASSED SINCE REVOCATION THE ROWS GO
+            assert reap_expired_tokens(revoked_grace_seconds=-1)["refresh_tokens"] == 2
+
+    def test_each_delete_bounded_by_batch_size(self, app, db_session, sample_user):
+        """Test that no single DELETE removes more than batch_size rows"""
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            RefreshToken(token=f"expired-{i}", user_id=sample_user.id, expires_at=now - timedelta(days=1))
+            for i in range(7)
+        ])
+        db_session.commit()
+
+        deleted = []
+        def record_delete(conn, cursor, statement, parameters, context, executemany):
+            if 'DELETE FROM' in statement:
+                deleted.append(cursor.rowcount)
+
+        with app.app_context():
+            event.listen(db.engine, 'after_cursor_execute', record_delete)
+            try:
+                result = reap_expired_tokens(batch_size=3)
+            finally:
+                event.remove(db.engine, 'after_cursor_execute', record_delete)
+
+        assert result["refresh_tokens"] == 7
+        assert max(deleted) <= 3
+
+    def test_background_reaper_run_once(self, app, db_session, reapable_tokens):
+        """Test one pass of the background reaper"""
+        reaper = TokenReaper(app, interval=60)
+
+        result = reaper.run_once()
+
+        assert result["refresh_tokens"] == 4
+        assert reaper.stats()["runs"] == 1
+
+    def test_reap_tokens_command(self, app, runner, db_session, reapable_tokens):
+        """Test the reap-tokens CLI command"""
+        result = runner.invoke(args=['reap-tokens', '--batch-size', '10'])
+
+        assert result.exit_code == 0
+        assert "Deleted 4 refresh tokens, 1 verification tokens and 1 revoked access tokens" in result.output
@@ -0,0 +1,247 @@
+import pytest
+import time
+from datetime import datetime, timezone, timedelta
+from utils.token_store import TokenStore, SQLTokenStore, MemoryTokenStore, RedisTokenStore, TOKEN_STORES, init_token_store
+from utils.auth_utils import create_refresh_token, validate_refresh_token, rotate_refresh_token
+
+
+class FakeRedis:
+    """In-process stand-in for the subset of redis-py used by RedisTokenStore"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, name):
+        if name in self.expires and self.expires[name] <= time.monotonic():
+            self.data.pop(name, None)
+            self.expires.pop(name, None)
+        return name in self.data
+
+    def set(self, name, value, ex=None, nx=False, get=False):
+        exists = self._alive(name)
+        previous = self.data.get(name) if exists else None
+        if nx and exists:
+            return None
+        self.data[name] = str(value).encode('utf-8')
+        self.expires.pop(name, None)
+        if ex:
+            self.expires[name] = time.monotonic() + ex
+        return previous if get else True
+
+    def get(self, name):
+        return self.data.get(name) if self._alive(name) else None
+
+    def mget(self, names):
+        return [self.get(name) for name in names]
+
+    def getdel(self, name):
+        value = self.get(name)
+        self.delete(name)
+        return value
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+            self.expires.pop(name, None)
+
+    def sadd(self, name, *values):
+        if not self._alive(name):
+            self.data[name] = set()
+        self.data[name].update(value.encode('utf-8') for value in values)
+
+    def smembers(self, name):
+        return set(self.data[name]) if self._alive(name) else set()
+
+    def expire(self, name, seconds):
+        if self._alive(name):
+            self.expires[name] = time.monotonic() + seconds
+
+    def zadd(self, name, mapping):
+        self.data.setdefault(name, {}).update(mapping)
+
+    def zrangebyscore(self, name, low, high):
+        low, high = float(low), float(high)
+        members = self.data.get(name, {})
+        return [member.encode('utf-8') for member, score in sorted(members.items(), key=lambda item: item[1])
+                if low <= score <= high]
+
+    def zremrangebyscore(self, name, low, high):
+        low, high = float(low), float(high)
+        members = self.data.get(name, {})
+        for member in [member for member, score in members.items() if low <= score <= high]:
+            del members[member]
+
+
+@pytest.fixture(params=['sql', 'memory', 'redis'])
+def store(request, app, db_session):
+    """Every token store implementation"""
+    if request.param == 'sql':
+        return SQLTokenStore()
+    if request.param == 'memory':
+        return MemoryTokenStore()
+    return RedisTokenStore(FakeRedis(), prefix='test:')
+
+
+def _in(**kwargs):
+    return datetime.now(timezone.utc) + timedelta(**kwargs)
+
+
+class TestTokenStores:
+    """Behaviour shared by all token stores"""
+
+    def test_verification_token_single_use(self, app, store, sample_user):
+        """Test that a verification token is consumed once"""
+        with app.app_context():
+            token = store.put_verification_token(sample_user.id, 'email', _in(hours=1))
+
+            assert '.' not in token
+            assert store.consume_verification_token(token, 'email') == sample_user.id
+            assert store.consume_verification_token(token, 'email') is None
+
+    def test_verification_token_wrong_type_kept(self, app, store, sample_user):
+        """Test that a wrong-type lookup leaves the token usable"""
+        with app.app_context():
+            token = store.put_verification_token(sample_user.id, 'email', _in(hours=1))
+
+            assert store.consume_verification_token(token, 'password_reset') is None
+            assert store.consume_verification_token(token, 'email') == sample_user.id
+
+    def test_verification_token_replaced(self, app, store, sample_user):
+        """Test that a new token replaces the previous one of the same type"""
+        with app.app_context():
+            old = store.put_verification_token(sample_user.id, 'email', _in(hours=1))
+            new = store.put_verification_token(sample_user.id, 'email', _in(hours=1))
+
+            assert store.consume_verification_token(old, 'email') is None
+            assert store.consume_verification_token(new, 'email') == sample_user.id
+
+    def test_expired_verification_token(self, app, store, sample_user):
+        """Test that an expired token is rejected"""
+        with app.app_context():
+            token = store.put_verification_token(sample_user.id, 'email', _in(hours=-1))
+
+            assert store.consume_verification_token(token, 'email') is None
+
+    def test_refresh_token_lifecycle(self, app, store, sample_user):
+        """Test creating, reading and revoking a refresh token"""
+        with app.app_context():
+            token = store.create_refresh_token(sample_user.id, _in(days=1))
+            state = store.get_refresh_token(token)
+
+            assert state.user_id == sample_user.id
+            assert state.is_revoked is False
+            assert state.family_id
+
+            assert store.revoke_refresh_token(token) is True
+            assert store.get_refresh_token(token).is_revoked is True
+            assert store.revoke_refresh_token("missing") is False
+            assert store.get_refresh_token("missing") is None
+
+    def test_rotation_is_single_use(self, app, store, sample_user):
+        """Test that a token rotates once and its successor joins the family"""
+        with app.app_context():
+            token = store.create_refresh_token(sample_user.id, _in(days=1), token_version=3)
+            new_token, user_id, token_version = store.rotate_refresh_token(token, _in(days=1))
+
+            assert user_id == sample_user.id
+            assert token_version == 3
+            assert store.rotate_refresh_token(token, _in(days=1)) == (None, None, None)
+            assert store.get_refresh_token(new_token).family_id == store.get_refresh_token(token).family_id
+            assert store.get_refresh_token(new_token).token_version == 3
+
+    def test_batch_lookup(self, app, store, sample_user):
+        """Test looking up several refresh tokens at once"""
+        with app.app_context():
+            live = store.create_refresh_token(sample_user.id, _in(days=1))
+            revoked = store.create_refresh_token(sample_user.id, _in(days=1))
+            store.revoke_refresh_token(revoked)
+
+            states = store.get_refresh_tokens([live, revoked, "missing", "1.wrong-secret", live])
+
+            assert set(states) == {live, revoked}
+            assert states[live].is_revoked is False
+            assert states[revoked].is_revoked is True
+            assert store.get_refresh_tokens([]) == {}
+
+    def test_revoke_family(self, app, store, sample_user):
+        """Test revoking a whole rotation family"""
+        with app.app_context():
+            first = store.create_refresh_token(sample_user.id, _in(days=1))
+            second, _, _ = store.rotate_refresh_token(first, _in(days=1))
+            other = store.create_refresh_token(sample_user.id, _in(days=1))
+
+            store.revoke_refresh_family(store.get_refresh_token(first).family_id)
+            assert store.get_refresh_token(second).is_revoked is True
+            assert store.get_refresh_token(other).is_revoked is False
+
+    def test_access_token_revocation(self, app, store):
+        """Test denying access tokens and listing recent revocations"""
+        with app.app_context():
+            before = datetime.now(timezone.utc) - timedelta(seconds=1)
+            store.revoke_access_token("jti-1", _in(minutes=5))
+            store.revoke_access_token("jti-1", _in(minutes=5))  # IDEMPOTENT
+            store.revoke_access_token("jti-expired", _in(minutes=-5))
+
+            assert store.is_access_token_revoked("jti-1") is True
+            assert store.is_access_token_revoked("jti-2") is False
+            assert store.is_access_token_revoked("jti-expired") is False
+            assert store.revoked_access_tokens(before) == ["jti-1"]
+            assert store.revoked_access_tokens(_in(minutes=1)) == []
+
+
+class TestTokenStoreSelection:
+    """Test choosing and using a store through config"""
+
+    def test_registry(self):
+        """Test that every backend is registered by name"""
+        assert set(TOKEN_STORES) == {'sql', 'memory', 'redis'}
+
+    def test_unknown_store(self, app):
+        """Test that an unknown backend is rejected"""
+        app.config['TOKEN_STORE'] = 'nope'
+        try:
+            with pytest.raises(ValueError):
+                init_token_store(app)
+        finally:
+            app.config['TOKEN_STORE'] = 'sql'
+            init_token_store(app)
+
+    def test_auth_utils_use_configured_store(self, app, db_session, sample_user):
+        """Test that refresh tokens go through the memory store when selected"""
+        app.config['TOKEN_STORE'] = 'memory'
+        try:
+            store = init_token_store(app)
+            with app.app_context():
+                token = create_refresh_token(sample_user.id)
+                new_token, user_id = rotate_refresh_token(token)
+
+                assert len(store) == 2
+                assert validate_refresh_token(new_token) == (True, sample_user.id)
+
+                # REPLAYING THE ROTATED TOKEN REVOKES ITS SUCCESSOR
+                assert rotate_refresh_token(token) == (None, None)
+                assert validate_refresh_token(new_token) == (False, None)
+        finally:
+            app.config['TOKEN_STORE'] = 'sql'
+            init_token_store(app)
+
+    def test_memory_store_evicts_expired(self):
+        """Test that expired entries are dropped on later writes"""
+        store = MemoryTokenStore()
+        store.create_refresh_token(1, _in(seconds=-1))
+        store.put_verification_token(1, 'email', _in(seconds=-1))
+        store.create_refresh_token(1, _in(days=1))
+
+        assert len(store) == 1
+
+    def test_incomplete_store_cannot_be_created(self):
+        """Test that a backend missing part of the interface fails when created, not on first use"""
+        class PartialStore(TokenStore):
+            def get_refresh_token(self, token_str):
+                return None
+
+        with pytest.raises(TypeError):
+            TokenStore()
+        with pytest.raises(TypeError):
+            PartialStore()
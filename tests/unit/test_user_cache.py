@@ -0,0 +1,153 @@
+import pytest
+from sqlalchemy import event
+from models.user_model import db, User
+from services.auth_service import AuthService
+from utils.user_cache import (
+    UserCache, LocalUserCache, RedisUserCache, USER_CACHES, UserSnapshot,
+    init_user_cache, get_user_snapshot, forget_user, load_user_credentials
+)
+
+
+class FakeRedis:
+    """In-process stand-in for the get/set/delete subset of redis-py"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value.encode('utf-8')
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Count statements sent to the database"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', listener)
+    yield statements
+    with app.app_context():
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+class TestUserCache:
+    """Test the read-through user snapshot cache"""
+
+    def test_read_through(self, app, db_session, sample_user, count_queries):
+        """Test that repeat lookups are served without a query"""
+        with app.app_context():
+            first = get_user_snapshot(sample_user.id)
+            second = get_user_snapshot(sample_user.id)
+
+            assert first is second
+            assert len(count_queries) == 1
+            assert first.to_dict() == db_session.get(User, sample_user.id).to_dict()
+            assert get_user_snapshot(-1) is None
+
+    def test_snapshots_are_immutable(self, app, db_session, sample_user):
+        """Test that a cached snapshot cannot be changed by its readers"""
+        with app.app_context():
+            snapshot = get_user_snapshot(sample_user.id)
+
+            with pytest.raises(AttributeError):
+                snapshot.role = 'admin'
+
+    def test_verify_email_invalidates(self, app, db_session, unverified_user, verification_token):
+        """Test that verifying an email drops the stale snapshot"""
+        with app.app_context():
+            assert get_user_snapshot(unverified_user.id).is_verified is False
+
+            AuthService().verify_email(verification_token.token)
+
+            assert get_user_snapshot(unverified_user.id).is_verified is True
+
+    def test_me_uses_cache(self, app, client, db_session, sample_user, auth_headers, count_queries):
+        """Test that /auth/me reads the user once"""
+        for _ in range(3):
+            response = client.get('/auth/me', headers=auth_headers)
+            assert response.status_code == 200
+            assert response.get_json()["user"]["email"] == sample_user.email
+
+        assert len([s for s in count_queries if 'users.name' in s]) == 1
+
+    def test_disabled(self, app, db_session, sample_user):
+        """Test that USER_CACHE_ENABLED=false reads the database every time"""
+        app.config['USER_CACHE_ENABLED'] = False
+        try:
+            assert init_user_cache(app) is None
+            with app.app_context():
+                assert get_user_snapshot(sample_user.id).email == sample_user.email
+                forget_user(sample_user.id)  # NO-OP
+        finally:
+            app.config['USER_CACHE_ENABLED'] = True
+            init_user_cache(app)
+
+    def test_unknown_backend(self, app):
+        """Test that an unknown backend is rejected"""
+        app.config['USER_CACHE'] = 'nope'
+        try:
+            with pytest.raises(ValueError):
+                init_user_cache(app)
+        finally:
+            app.config['USER_CACHE'] = 'local'
+            init_user_cache(app)
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing part of the interface fails when created"""
+        class PartialCache(UserCache):
+            def get(self, user_id):
+                return None
+
+        with pytest.raises(TypeError):
+            UserCache()
+        with pytest.raises(TypeError):
+            PartialCache()
+
+
+class TestUserCredentials:
+    """Test the ORM-free read model of the login path"""
+
+    def test_load_user_credentials(self, app, db_session, sample_user):
+        """Test reading credentials by email without creating ORM instances"""
+        with app.app_context():
+            credentials = load_user_credentials("TEST@example.com")
+
+            assert credentials.password_hash == sample_user.password_hash
+            assert credentials.token_version == 0
+            assert credentials.user.to_dict() == get_user_snapshot(sample_user.id).to_dict()
+            assert not hasattr(credentials, '__dict__')
+            assert len(db.session.identity_map) == 0
+            assert load_user_credentials("nobody@example.com") is None
+
+    def test_login_keeps_identity_map_empty(self, app, db_session, sample_user):
+        """Test that a successful login never loads a User instance"""
+        with app.app_context():
+            result, error = AuthService().authenticate_user(sample_user.email, "Password123!")
+
+            assert error is None
+            assert not any(isinstance(obj, User) for obj in db.session.identity_map.values())
+
+
+@pytest.mark.parametrize('cache', [LocalUserCache(), RedisUserCache(FakeRedis())], ids=list(USER_CACHES))
+class TestUserCacheBackends:
+    """Behaviour shared by all user cache backends"""
+
+    def test_set_get_forget(self, app, db_session, sample_user, cache):
+        """Test storing, reading and dropping a snapshot"""
+        with app.app_context():
+            snapshot = get_user_snapshot(sample_user.id)
+            cache.set(snapshot)
+
+            assert cache.get(sample_user.id) == snapshot
+            assert isinstance(cache.get(sample_user.id), UserSnapshot)
+
+            cache.forget(sample_user.id)
+            assert cache.get(sample_user.id) is None
+            assert cache.stats()["backend"] == cache.name
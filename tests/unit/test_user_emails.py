@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from models.user_model import db, User
+from models.verification_model import VerificationToken
+from services.auth_service import AuthService
+from services.user_emails import find_case_duplicate_emails, INDEX, LEGACY_CONSTRAINT
+from utils.user_utils import normalize_email
+
+def _user(email):
+    return User(name="Case User", email=email, is_verified=True, password_hash="x")
+
+@pytest.fixture
+def without_email_index(app, db_session):
+    """Drop the lower(email) index, as on a database created before it existed"""
+    with app.app_context():
+        db.session.execute(text(f"DROP INDEX {INDEX}"))
+        db.session.commit()
+    yield
+    with app.app_context():
+        db.session.rollback()
+        User.query.delete()
+        db.session.commit()
+        db.session.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX} ON users (lower(email))"))
+        db.session.commit()
+
+class TestCaseInsensitiveEmails:
+    """Test normalised, case-insensitive email handling"""
+
+    def test_normalize_email(self):
+        """Test the canonical form of an address"""
+        assert normalize_email("  Foo.Bar@Example.COM ") == "foo.bar@example.com"
+
+    def test_register_normalises_and_rejects_case_variants(self, app, db_session):
+        """Test that registration stores lowercase and sees case variants as taken"""
+        with app.app_context():
+            auth_service = AuthService()
+            user, error = auth_service.register_user("Foo", "Foo@Example.com", "Password123!")
+
+            assert error is None
+            assert user.email == "foo@example.com"
+
+            user, error = auth_service.register_user("Foo", "FOO@example.COM", "Password123!")
+            assert user is None
+            assert error == "Email already registered"
+
+    def test_login_and_reset_ignore_case(self, app, db_session, sample_user):
+        """Test that login and password reset find the user whatever the case"""
+        with app.app_context():
+            auth_service = AuthService()
+            result, error = auth_service.authenticate_user("TEST@Example.com", "Password123!")
+            assert error is None
+
+            auth_service.request_password_reset("Test@EXAMPLE.com")
+            assert VerificationToken.query.filter_by(user_id=sample_user.id, token_type='password_reset').count() == 1
+
+    def test_index_enforces_uniqueness(self, app, db_session, sample_user):
+        """Test that the database rejects a case variant written around the service"""
+        with app.app_context():
+            db.session.add(_user("Test@Example.com"))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+    def test_lookup_is_an_index_probe(self, app, db_session, sample_user):
+        """Test that the lookup can use the functional index"""
+        with app.app_context():
+            query = User.query.filter(User.email_matches("TEST@example.com"))
+            statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+            db.session.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = "\n".join(row[0] for row in db.session.execute(text(f"EXPLAIN {statement}")))
+            db.session.rollback()
+
+            assert INDEX in plan
+
+class TestMigrateEmails:
+    """Test moving an existing database to case-insensitive emails"""
+
+    def test_duplicates_block_migration(self, app, runner, without_email_index):
+        """Test that case-duplicates are reported and nothing is changed"""
+        with app.app_context():
+            first, second = _user("dup@example.com"), _user("Dup@Example.com")
+            db.session.add_all([first, second, _user("Other@Example.com")])
+            db.session.commit()
+
+            assert find_case_duplicate_emails(db.session.connection()) == [("dup@example.com", [first.id, second.id])]
+            db.session.rollback()
+
+            result = runner.invoke(args=['migrate-emails'])
+
+            assert result.exit_code != 0
+            assert f"Duplicate dup@example.com: users {first.id}, {second.id}" in result.output
+            assert db.session.execute(text("SELECT to_regclass(:name)"), {"name": INDEX}).scalar() is None
+            assert User.query.filter_by(email="Other@Example.com").count() == 1
+
+    def test_migration(self, app, runner, without_email_index):
+        """Test building the index and lowercasing stored emails in batches"""
+        with app.app_context():
+            db.session.add_all([_user(f"User{i}@Example.com") for i in range(5)])
+            db.session.commit()
+
+            dry_run = runner.invoke(args=['migrate-emails', '--dry-run'])
+            assert "5 emails would be lowercased" in dry_run.output
+
+            result = runner.invoke(args=['migrate-emails', '--batch-size', '2'])
+
+            assert result.exit_code == 0, result.output
+            assert "Created index uq_users_email_lower; lowercased 5 emails" in result.output
+            assert db.session.execute(text("SELECT count(*) FROM users WHERE email <> lower(email)")).scalar() == 0
+            db.session.rollback()
+
+    def test_migration_drops_legacy_constraint(self, app, runner, without_email_index):
+        """Test that the old UNIQUE(email) constraint is dropped once the lower(email) index covers it"""
+        with app.app_context():
+            db.session.execute(text(f"ALTER TABLE users ADD CONSTRAINT {LEGACY_CONSTRAINT} UNIQUE (email)"))
+            db.session.commit()
+
+            result = runner.invoke(args=['migrate-emails'])
+
+            assert result.exit_code == 0, result.output
+            assert db.session.execute(text("SELECT to_regclass(:name)"), {"name": LEGACY_CONSTRAINT}).scalar() is None
+            db.session.rollback()
+
+    def test_invalid_index_rebuilt(self, app, runner, db_session):
+        """Test that an index left INVALID by an interrupted concurrent build is rebuilt"""
+        with app.app_context():
+            # WHAT A FAILED CREATE INDEX CONCURRENTLY LEAVES BEHIND
+            db.session.execute(text("UPDATE pg_index SET indisvalid = false WHERE indexrelid = to_regclass(:name)"), {"name": INDEX})
+            db.session.commit()
+
+            result = runner.invoke(args=['migrate-emails'])
+
+            assert result.exit_code == 0, result.output
+            assert "Created index uq_users_email_lower" in result.output
+            assert db.session.execute(
+                text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": INDEX}
+            ).scalar() is True
+            db.session.rollback()
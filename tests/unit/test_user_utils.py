@@ -1,5 +1,12 @@
 import pytest
-from utils.user_utils import hash_password, check_password, validate_password_strength
+from utils.user_utils import (
+    hash_password,
+    check_password,
+    validate_password_strength,
+    needs_rehash,
+    calibrate_bcrypt_rounds
+)
+from utils.password_hashers import BcryptHasher
 
 class TestPasswordHashing:
     """Test password hashing utilities"""
@@ -52,6 +59,42 @@ class TestPasswordHashing:
         assert isinstance(hashed, str)
         assert check_password(password, hashed) is True
 
+class TestBcryptCost:
+    """Test bcrypt cost factor handling"""
+    
+    def test_hash_password_uses_rounds(self):
+        """Test that the cost factor is stored in the hash"""
+        hashed = hash_password("TestPassword123!", params={'rounds': 5})
+        
+        assert BcryptHasher.get_rounds(hashed) == 5
+        assert check_password("TestPassword123!", hashed) is True
+    
+    def test_get_rounds_invalid_hash(self):
+        """Test parsing a malformed hash"""
+        assert BcryptHasher.get_rounds("not-a-bcrypt-hash") is None
+        assert needs_rehash("$2b$not-a-cost$", 'bcrypt', {'rounds': 4}) is True
+    
+    def test_needs_rehash(self):
+        """Test detecting hashes with a stale cost factor"""
+        hashed = hash_password("TestPassword123!", params={'rounds': 4})
+        
+        assert needs_rehash(hashed, 'bcrypt', {'rounds': 4}) is False
+        assert needs_rehash(hashed, 'bcrypt', {'rounds': 5}) is True
+    
+    def test_needs_rehash_never_downgrades(self):
+        """Test that a hash stronger than the target cost is kept"""
+        hashed = hash_password("TestPassword123!", params={'rounds': 5})
+        
+        assert needs_rehash(hashed, 'bcrypt', {'rounds': 4}) is False
+    
+    def test_calibrate_respects_bounds(self):
+        """Test calibration never leaves the configured range"""
+        # IMPOSSIBLY LOW TARGET FALLS BACK TO THE MINIMUM
+        assert calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6) == 4
+        
+        # GENEROUS TARGET STOPS AT THE MAXIMUM
+        assert calibrate_bcrypt_rounds(target_ms=60000, min_rounds=4, max_rounds=6) == 6
+
 class TestPasswordValidation:
     """Test password strength validation"""
     
@@ -1,13 +1,193 @@
 from datetime import datetime, timezone, timedelta
-from models.verification_model import VerificationToken
-from models.refresh_token_model import RefreshToken
-from models.user_model import db
-import secrets
+from models.user_model import db, User
+from utils.cache import TTLCache
+from utils.token_store import get_token_store
+from flask import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from sqlalchemy import select, update
+import hashlib
+import hmac
+
+def init_refresh_token_cache(app):
+    """
+    Create the validated refresh token cache for an app from its config
+    
+    The cache is per process: revocations made by other workers are only
+    seen once the local entry expires, so keep REFRESH_TOKEN_CACHE_TTL short.
+    """
+    cache = TTLCache(
+        maxsize=app.config.get('REFRESH_TOKEN_CACHE_SIZE', 10000),
+        ttl=app.config.get('REFRESH_TOKEN_CACHE_TTL', 30)
+    )
+    app.extensions['refresh_token_cache'] = cache
+    return cache
+
+def get_refresh_token_cache():
+    """Return the refresh token cache of the current app"""
+    cache = current_app.extensions.get('refresh_token_cache')
+    if cache is None:
+        cache = init_refresh_token_cache(current_app)
+    return cache
+
+def _refresh_token_cache_key(token_str):
+    # KEY ON A DIGEST SO RAW TOKENS ARE NOT KEPT IN MEMORY
+    return hashlib.sha256(token_str.encode('utf-8')).digest()
+
+def invalidate_user_refresh_tokens(user_id):
+    """Drop every cached refresh token of a user (after mass revocation)"""
+    get_refresh_token_cache().discard_where(lambda entry: entry[0] == user_id)
+
+def init_token_version_cache(app):
+    """
+    Create the per-user token version cache for an app from its config
+    
+    Per process like the refresh token cache: a "log out everywhere" made
+    through another worker is seen here once TOKEN_VERSION_CACHE_TTL lapses.
+    """
+    cache = TTLCache(
+        maxsize=app.config.get('TOKEN_VERSION_CACHE_SIZE', 10000),
+        ttl=app.config.get('TOKEN_VERSION_CACHE_TTL', 5)
+    )
+    app.extensions['token_version_cache'] = cache
+    return cache
+
+def get_token_version_cache():
+    """Return the token version cache of the current app"""
+    cache = current_app.extensions.get('token_version_cache')
+    if cache is None:
+        cache = init_token_version_cache(current_app)
+    return cache
+
+def get_user_token_version(user_id):
+    """
+    Current token version of a user (cached)
+    
+    Returns:
+        int or None: The version, None if the user does not exist
+    """
+    cache = get_token_version_cache()
+    version = cache.get(user_id)
+    if version is None:
+        version = db.session.execute(select(User.token_version).where(User.id == user_id)).scalar()
+        if version is None:
+            return None
+        cache.set(user_id, version)
+    return version
+
+def forget_user_token_version(user_id):
+    """Drop the cached token version of a user (after changing it)"""
+    get_token_version_cache().pop(user_id)
+
+def bump_user_token_version(user_id):
+    """
+    Log a user out everywhere by incrementing their token version
+    
+    One single-row UPDATE however many sessions the user has: every access
+    and refresh token issued under the old version stops validating.
+    
+    Returns:
+        int or None: The new version, None if the user does not exist
+    """
+    version = db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    ).scalar()
+    db.session.commit()
+    
+    forget_user_token_version(user_id)
+    invalidate_user_refresh_tokens(user_id)
+    return version
+
+# SECRET_KEY WHEN THE ENVIRONMENT DOES NOT SET ONE (configuration/config.py)
+_DEFAULT_SECRET_KEY = 'development-key'
+
+def _stateless_window_end(config):
+    until = config.get('VERIFICATION_TOKENS_STATELESS_UNTIL')
+    if not until:
+        return None
+    end = datetime.fromisoformat(until)
+    return end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+
+def init_verification_tokens(app):
+    """
+    Check the verification token config of an app at startup
+    
+    Signed links are only as secret as SECRET_KEY, so accepting them with
+    the built-in development key is refused.
+    
+    Raises:
+        RuntimeError: If signed links are accepted and SECRET_KEY is unset
+        ValueError: If VERIFICATION_TOKENS_STATELESS_UNTIL is not an ISO date
+    """
+    window_end = _stateless_window_end(app.config)
+    if not (app.config.get('VERIFICATION_TOKENS_STATELESS') or window_end):
+        return
+    if app.config.get('SECRET_KEY', _DEFAULT_SECRET_KEY) == _DEFAULT_SECRET_KEY:
+        raise RuntimeError("SECRET_KEY must be set to accept signed verification tokens")
+
+def _accepts_stateless_tokens():
+    """True in stateless mode and, after leaving it, until VERIFICATION_TOKENS_STATELESS_UNTIL"""
+    if current_app.config.get('VERIFICATION_TOKENS_STATELESS'):
+        return True
+    window_end = _stateless_window_end(current_app.config)
+    return window_end is not None and datetime.now(timezone.utc) < window_end
+
+def _verification_serializer(token_type):
+    # THE SALT BINDS A SIGNATURE TO ITS PURPOSE - AN EMAIL LINK CANNOT RESET A PASSWORD
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=f"verification-{token_type}")
+
+def _user_state_fingerprint(user_id, token_type):
+    """
+    Digest of the user state a stateless token is only valid for
+    
+    Email links die once the user is verified, reset links once the
+    password hash changes, which gives signed tokens one-time semantics.
+    Both also die when the email address changes, so a link never applies
+    to an address it was not sent to.
+    
+    Returns:
+        str or None: The fingerprint, None if the user does not exist
+    """
+    state = User.is_verified if token_type == 'email' else User.password_hash
+    row = db.session.execute(select(User.email, state).where(User.id == user_id)).first()
+    if not row:
+        return None
+    email, value = row
+    return hashlib.sha256(f"{token_type}:{email}:{value}".encode('utf-8')).hexdigest()[:32]
+
+def _generate_stateless_token(user_id, token_type, expiration_hours):
+    fingerprint = _user_state_fingerprint(user_id, token_type)
+    return _verification_serializer(token_type).dumps({
+        "uid": user_id,
+        "fp": fingerprint,
+        "ttl": int(expiration_hours * 3600)
+    })
+
+def _validate_stateless_token(token, expected_type):
+    try:
+        payload, signed_at = _verification_serializer(expected_type).loads(token, return_timestamp=True)
+    except BadSignature:  # ALSO COVERS A TOKEN SIGNED FOR ANOTHER PURPOSE
+        return None
+    
+    age = (datetime.now(timezone.utc) - signed_at).total_seconds()
+    if age > payload.get('ttl', 0):
+        return None
+    
+    fingerprint = _user_state_fingerprint(payload.get('uid'), expected_type)
+    if not fingerprint or not hmac.compare_digest(fingerprint, payload.get('fp') or ''):
+        return None
+    
+    return payload['uid']
 
 def generate_verification_token(user_id, token_type, expiration_hours=24):
     """
     Generate a verification token for email verification or password reset
     
+    With VERIFICATION_TOKENS_STATELESS the token is a signed, time-limited
+    payload and nothing is written to the token store.
+    
     Args:
         user_id: The user's ID
         token_type: 'email' or 'password_reset'
@@ -16,63 +196,44 @@ def generate_verification_token(user_id, token_type, expiration_hours=24):
     Returns:
         str: The generated token
     """
-    # DELETE OLD TOKENS OF SAME TYPE FOR THIS USER
-    VerificationToken.query.filter_by(
-        user_id=user_id,
-        token_type=token_type
-    ).delete()
+    if current_app.config.get('VERIFICATION_TOKENS_STATELESS'):
+        return _generate_stateless_token(user_id, token_type, expiration_hours)
     
-    # GENERATE NEW TOKEN
-    token = secrets.token_urlsafe(32)
+    # REPLACES THE PREVIOUS TOKEN OF THE SAME TYPE FOR THIS USER
     expires_at = datetime.now(timezone.utc) + timedelta(hours=expiration_hours)
-    
-    # SAVE TO DATABASE
-    verification_token = VerificationToken(
-        user_id=user_id,
-        token=token,
-        token_type=token_type,
-        expires_at=expires_at
-    )
-    db.session.add(verification_token)
-    db.session.commit()
-    
-    return token
+    return get_token_store().put_verification_token(user_id, token_type, expires_at)
 
-def validate_verification_token(token, expected_type):
+def validate_verification_token(token, expected_type, commit=True):
     """
-    Validate a verification token
+    Validate and consume a verification token atomically
+    
+    When the same link is clicked twice concurrently only one request gets
+    the user ID back.
+    
+    Signed (stateless) tokens are recognised by their '.' separators and
+    checked without touching the token store. They are only accepted with
+    VERIFICATION_TOKENS_STATELESS on, or until VERIFICATION_TOKENS_STATELESS_UNTIL
+    after switching it off so links already sent keep working. Stored
+    tokens are always accepted.
     
     Args:
         token: The token to validate
         expected_type: 'email' or 'password_reset'
+        commit: Commit the deletion; pass False to fold follow-up writes
+            into the same transaction (the caller must then commit)
     
     Returns:
         int or None: User ID if valid, None if invalid
     """
-    token_record = VerificationToken.query.filter_by(token=token).first()
-    
-    # CHECK IF TOKEN EXISTS
-    if not token_record:
-        return None
-    
-    # CHECK IF EXPIRED - DELETE IF EXPIRED
-    if token_record.expires_at < datetime.now(timezone.utc):
-        db.session.delete(token_record)
-        db.session.commit()
-        return None
+    # STORED TOKENS NEVER CONTAIN '.', SIGNED TOKENS ALWAYS DO
+    if '.' in token:
+        if not _accepts_stateless_tokens():
+            return None
+        return _validate_stateless_token(token, expected_type)
     
-    # CHECK IF TOKEN TYPE MATCHES
-    if token_record.token_type != expected_type:
-        return None
-    
-    # TOKEN IS VALID - GET USER ID AND DELETE TOKEN (ONE-TIME USE)
-    user_id = token_record.user_id
-    db.session.delete(token_record)
-    db.session.commit()
-    
-    return user_id
+    return get_token_store().consume_verification_token(token, expected_type, commit=commit)
 
-def create_refresh_token(user_id, expires_seconds=2592000, ip_address=None, user_agent=None):
+def create_refresh_token(user_id, expires_seconds=2592000, ip_address=None, user_agent=None, token_version=0):
     """
     Create a refresh token for a user
     
@@ -81,27 +242,17 @@ def create_refresh_token(user_id, expires_seconds=2592000, ip_address=None, user
         expires_seconds: Seconds until token expires (default 30 days)
         ip_address: IP address of the request
         user_agent: User agent string
+        token_version: The user's current token version
     
     Returns:
         str: The generated refresh token
     """
-    # GENERATE TOKEN
-    token = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
     
-    # SAVE TO DATABASE
-    refresh_token = RefreshToken(
-        token=token,
-        user_id=user_id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        expires_at=expires_at,
-        is_revoked=False
+    # EACH LOGIN STARTS A NEW FAMILY
+    return get_token_store().create_refresh_token(
+        user_id, expires_at, ip_address, user_agent, token_version=token_version
     )
-    db.session.add(refresh_token)
-    db.session.commit()
-    
-    return token
 
 def validate_refresh_token(token_str):
     """
@@ -113,22 +264,76 @@ def validate_refresh_token(token_str):
     Returns:
         tuple: (is_valid: bool, user_id: int or None)
     """
-    token_record = RefreshToken.query.filter_by(token=token_str).first()
+    cache = get_refresh_token_cache()
+    cache_key = _refresh_token_cache_key(token_str)
+    entry = cache.get(cache_key)
     
-    # CHECK IF TOKEN EXISTS
-    if not token_record:
-        return False, None
+    if entry is None:
+        state = get_token_store().get_refresh_token(token_str)
+        
+        # CHECK IF TOKEN EXISTS
+        if not state:
+            return False, None
+        
+        # CACHE (user_id, expires_at, is_revoked, token_version) FOR THE NEXT REFRESH
+        entry = (state.user_id, state.expires_at, state.is_revoked, state.token_version)
+        cache.set(cache_key, entry)
+    
+    user_id, expires_at, is_revoked, token_version = entry
     
     # CHECK IF REVOKED
-    if token_record.is_revoked:
+    if is_revoked:
         return False, None
     
     # CHECK IF EXPIRED
-    if token_record.expires_at < datetime.now(timezone.utc):
+    if expires_at < datetime.now(timezone.utc):
+        return False, None
+    
+    # CHECK IF ISSUED BEFORE THE USER LOGGED OUT EVERYWHERE
+    if token_version != get_user_token_version(user_id):
         return False, None
     
     # TOKEN IS VALID
-    return True, token_record.user_id
+    return True, user_id
+
+def rotate_refresh_token(token_str, expires_seconds=2592000, ip_address=None, user_agent=None):
+    """
+    Revoke a refresh token and issue its successor in the same family
+    
+    Presenting an already revoked token is treated as reuse of a stolen
+    token and revokes the whole family.
+    
+    Args:
+        token_str: The refresh token presented by the client
+        expires_seconds: Lifetime of the successor token
+        ip_address: IP address of the request
+        user_agent: User agent string
+    
+    Returns:
+        tuple: (new_token: str or None, user_id: int or None)
+    """
+    get_refresh_token_cache().pop(_refresh_token_cache_key(token_str))
+    
+    store = get_token_store()
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
+    new_token, user_id, token_version = store.rotate_refresh_token(token_str, expires_at, ip_address, user_agent)
+    if new_token:
+        # ISSUED BEFORE THE USER LOGGED OUT EVERYWHERE - RARE, SO CHECKED AFTER THE FACT
+        if token_version != get_user_token_version(user_id):
+            store.revoke_refresh_token(new_token)
+            return None, None
+        return new_token, user_id
+    
+    # NOTHING ROTATED - IF THE TOKEN IS GENUINE BUT ALREADY REVOKED, IT WAS REPLAYED
+    state = store.get_refresh_token(token_str)
+    if state and state.is_revoked and state.family_id:
+        store.revoke_refresh_family(state.family_id)
+        invalidate_user_refresh_tokens(state.user_id)
+        current_app.logger.warning(
+            f"Refresh token reuse detected for user {state.user_id}, revoked family {state.family_id}"
+        )
+    
+    return None, None
 
 def revoke_refresh_token(token_str):
     """
@@ -140,13 +345,7 @@ def revoke_refresh_token(token_str):
     Returns:
         bool: True if token was revoked, False if token not found
     """
-    token_record = RefreshToken.query.filter_by(token=token_str).first()
-    
-    if not token_record:
-        return False
-    
-    # MARK AS REVOKED
-    token_record.is_revoked = True
-    db.session.commit()
+    # DROP CACHED VALIDATION RESULT FIRST
+    get_refresh_token_cache().pop(_refresh_token_cache_key(token_str))
     
-    return True
\ No newline at end of file
+    return get_token_store().revoke_refresh_token(token_str)
@@ -0,0 +1,120 @@
+import hashlib
+import math
+import mmap
+import struct
+
+# FILE LAYOUT: 32-BYTE HEADER FOLLOWED BY THE RAW BIT ARRAY
+_MAGIC = b'BLOOMF01'
+_HEADER = struct.Struct('<8sQII8x')  # MAGIC, NUM_BITS, NUM_HASHES, COUNT, PADDING
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings with an optional memory-mapped backing file
+
+    Membership tests cost num_hashes bit probes regardless of how many
+    items were added. A negative answer is always correct; a positive one
+    is wrong with roughly the configured false-positive rate.
+    """
+
+    def __init__(self, num_bits, num_hashes, buffer=None, count=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self._bits = buffer if buffer is not None else bytearray((num_bits + 7) // 8)
+        self._mmap = None
+
+    @classmethod
+    def for_capacity(cls, capacity, fp_rate=0.001):
+        """Size a filter for capacity items at the given false-positive rate"""
+        capacity = max(capacity, 1)
+        num_bits = max(int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        num_hashes = max(int(round(num_bits / capacity * math.log(2))), 1)
+        return cls(num_bits, num_hashes)
+
+    def _hash_pair(self, item):
+        # DOUBLE HASHING: ONE 128-BIT DIGEST GIVES ALL num_hashes PROBE POSITIONS
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return h1, h2 | 1
+
+    def _positions(self, item):
+        h1, h2 = self._hash_pair(item)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item):
+        """Add an item (in-memory filters only)"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def contains_either(self, item, other):
+        """
+        Check if this filter or other (same num_bits/num_hashes) contains item
+
+        The item is hashed once for both filters, and a miss usually stops
+        after the first probe or two.
+        """
+        h1, h2 = self._hash_pair(item)
+        bits, other_bits = self._bits, other._bits
+        in_self = in_other = True
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % self.num_bits
+            index, mask = position >> 3, 1 << (position & 7)
+            if in_self and not bits[index] & mask:
+                in_self = False
+            if in_other and not other_bits[index] & mask:
+                in_other = False
+            if not (in_self or in_other):
+                return False
+        return True
+
+    @property
+    def size_bytes(self):
+        """Size of the bit array in bytes"""
+        return len(self._bits)
+
+    def estimated_fp_rate(self):
+        """False-positive rate expected at the current item count"""
+        if not self.count:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path):
+        """Write the filter to a file that open() can memory-map"""
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self._bits)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map a filter written by save()
+
+        The bit array stays in the page cache and is shared between worker
+        processes instead of being copied into each one.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, num_bits, num_hashes, count = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a Bloom filter file")
+        bloom = cls(num_bits, num_hashes, buffer=memoryview(mapped)[_HEADER.size:], count=count)
+        bloom._mmap = mapped
+        return bloom
+
+    def close(self):
+        """Release the memory map of a filter returned by open()"""
+        if self._mmap is not None:
+            self._bits.release()
+            self._mmap.close()
+            self._mmap = None
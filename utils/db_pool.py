@@ -0,0 +1,115 @@
+import bisect
+import threading
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# UPPER BOUNDS (MS) OF THE CONNECTION WAIT HISTOGRAM BUCKETS - ONE MORE BUCKET HOLDS THE REST
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class WaitHistogram:
+    """Thread-safe histogram of connection checkout waits"""
+
+    def __init__(self, bounds_ms=WAIT_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self._counts = [0] * (len(bounds_ms) + 1)
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self._total += ms
+            self._max = max(self._max, ms)
+
+    def stats(self):
+        with self._lock:
+            count = sum(self._counts)
+            labels = [f"le_{bound}ms" for bound in self.bounds_ms] + ["inf"]
+            return {
+                "count": count,
+                "avg_ms": self._total / count if count else 0.0,
+                "max_ms": self._max,
+                "buckets": dict(zip(labels, self._counts))
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited
+
+    The wait covers queueing for a free connection and opening a new one
+    (pre-ping comes after). Checkouts that give up after pool_timeout are
+    counted as timeouts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        self.wait_histogram.observe(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # A POOL IS RECREATED ON dispose() AND AFTER A DISCONNECT - KEEP THE HISTORY
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        pool.timeouts = self.timeouts
+        return pool
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeouts": self.timeouts,
+            "wait": self.wait_histogram.stats()
+        }
+
+
+def engine_options(config, uri):
+    """
+    SQLAlchemy engine options for a database URI from config
+
+    Starts from SQLALCHEMY_ENGINE_OPTIONS, uses the instrumented pool and,
+    with DB_PGBOUNCER_TRANSACTION_MODE, turns off server-side prepared
+    statements (a later transaction can land on another server connection).
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    # psycopg2 NEVER PREPARES SERVER-SIDE; psycopg 3 DOES AFTER prepare_threshold EXECUTIONS
+    if config.get('DB_PGBOUNCER_TRANSACTION_MODE') and make_url(uri).get_driver_name() == 'psycopg':
+        options['connect_args'] = dict(options.get('connect_args') or {}, prepare_threshold=None)
+    return options
+
+
+def init_db_pool(app):
+    """Resolve the engine options of the primary database - call before db.init_app"""
+    options = engine_options(app.config, app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return options
+
+
+def pool_stats(engine):
+    """Checked-out connections, overflow and wait times of an engine's pool"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"pool": type(pool).__name__, "status": pool.status()}
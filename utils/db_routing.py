@@ -0,0 +1,199 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from utils.db_pool import engine_options, pool_stats
+
+# session.info KEYS
+_USE_REPLICA = 'use_replica'
+_WROTE = 'wrote_primary'
+_REPLICA = 'replica'
+
+
+def _is_read(clause):
+    """True for a plain SELECT (not FOR UPDATE) - anything else goes to the primary"""
+    return clause is not None and getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of use_replica() blocks to a read replica
+
+    A statement goes to a replica only when all of these hold:
+    - it runs inside use_replica() / a @replica_reads function
+    - it is a plain SELECT
+    - the session has no pending changes and has not written anything
+      since it was created (read-your-writes: a Flask-SQLAlchemy session
+      lives for one request)
+    Everything else, including every flush and Core UPDATE/INSERT/DELETE,
+    uses the primary as before. The replica is chosen once per session so
+    a request sees a single, monotonic view.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if not _is_read(clause):
+                self.info[_WROTE] = True
+            elif self.info.get(_USE_REPLICA) and not self.info.get(_WROTE) and not (self.new or self.deleted or self.dirty):
+                replica = self._replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica(self):
+        router = current_app.extensions.get('replica_router')
+        if router is None:
+            return None
+        engine = self.info.get(_REPLICA)
+        if engine is None or not router.is_healthy(engine):
+            engine = self.info[_REPLICA] = router.pick()
+        if engine is not None:
+            router.reads += 1
+        return engine
+
+
+class ReplicaRouter:
+    """
+    Round-robin pool of read replica engines with health-based ejection
+
+    A replica whose connection fails (refused, dropped, timed out) is left
+    out for eject_seconds and then tried again. With every replica
+    ejected, reads go to the primary.
+    """
+
+    def __init__(self, engines, eject_seconds=30):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._ejected_until = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+        # METRICS
+        self.reads = 0
+        self.ejections = 0
+        self.fallbacks = 0
+
+        for engine in self.engines:
+            event.listen(engine, 'handle_error', self._on_error)
+
+    @classmethod
+    def from_config(cls, config):
+        engines = [create_engine(uri, **engine_options(config, uri)) for uri in config.get('SQLALCHEMY_REPLICA_URIS') or []]
+        return cls(engines, config.get('REPLICA_EJECT_SECONDS', 30))
+
+    def _on_error(self, context):
+        # NO CONNECTION MEANS CONNECTING FAILED
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+    def is_healthy(self, engine):
+        return self._ejected_until.get(engine, 0) <= time.monotonic()
+
+    def pick(self):
+        """Next healthy replica in turn, None if all are ejected"""
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._turn) % len(self.engines)]
+            if self.is_healthy(engine):
+                return engine
+        return None
+
+    def eject(self, engine):
+        """Stop routing reads to a replica for eject_seconds"""
+        with self._lock:
+            if self.is_healthy(engine):
+                self.ejections += 1
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def dispose(self):
+        for engine in self.engines:
+            event.remove(engine, 'handle_error', self._on_error)
+            engine.dispose()
+
+    def stats(self):
+        return {
+            "replicas": [
+                {
+                    "url": engine.url.render_as_string(hide_password=True),
+                    "healthy": self.is_healthy(engine),
+                    "pool": pool_stats(engine)
+                }
+                for engine in self.engines
+            ],
+            "reads": self.reads,
+            "ejections": self.ejections,
+            "fallbacks": self.fallbacks
+        }
+
+
+def init_replica_router(app):
+    """
+    Create the read replica router for an app from SQLALCHEMY_REPLICA_URIS
+
+    Returns:
+        ReplicaRouter or None if no replicas are configured
+    """
+    router = ReplicaRouter.from_config(app.config) if app.config.get('SQLALCHEMY_REPLICA_URIS') else None
+    app.extensions['replica_router'] = router
+    return router
+
+
+def get_replica_router():
+    """Return the replica router of the current app (None without replicas)"""
+    if 'replica_router' not in current_app.extensions:
+        return init_replica_router(current_app)
+    return current_app.extensions['replica_router']
+
+
+def _session():
+    return current_app.extensions['sqlalchemy'].session()
+
+
+@contextmanager
+def use_replica():
+    """
+    Let the plain SELECTs of a block go to a read replica
+
+    Only for reads that can tolerate replication lag. A replica that fails
+    is ejected and the error is raised; use @replica_reads to retry on the
+    primary instead.
+    """
+    if get_replica_router() is None:
+        yield
+        return
+    session = _session()
+    previous = session.info.get(_USE_REPLICA, False)
+    session.info[_USE_REPLICA] = True
+    try:
+        yield
+    finally:
+        session.info[_USE_REPLICA] = previous
+
+
+def replica_reads(func):
+    """
+    Run a read-only function against a read replica
+
+    If the replica fails on the way, the function is run again on the
+    primary, so callers never see a replica outage.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            with use_replica():
+                return func(*args, **kwargs)
+        except OperationalError:
+            router = get_replica_router()
+            session = _session()
+            replica = session.info.get(_REPLICA)
+            if router is None or replica is None or router.is_healthy(replica):
+                raise
+            # NOTHING WAS WRITTEN (OR THE REPLICA WOULD NOT HAVE BEEN USED) - SAFE TO START OVER
+            session.rollback()
+            router.fallbacks += 1
+            return func(*args, **kwargs)
+    return wrapper
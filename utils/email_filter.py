@@ -0,0 +1,198 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, func
+from models.user_model import db, User
+from utils.bloom_filter import BloomFilter
+from utils.db_routing import use_replica
+from utils.user_utils import normalize_email
+
+# RE-READ THIS MANY IDS BEFORE THE HIGHEST ONE SEEN - IDS CAN COMMIT OUT OF ORDER
+_SYNC_ID_OVERLAP = 100
+
+
+class RegisteredEmailFilter:
+    """
+    In-process Bloom filter of registered (lowercased) emails
+
+    Lets login, registration and password reset skip the users table for
+    addresses that are definitely not registered - most of what credential
+    stuffing bots submit. A positive answer still goes to the database.
+
+    The filter is rebuilt from the users table every rebuild_interval
+    seconds in a background thread (until the first build is done every
+    address counts as possibly registered). In between, users created by
+    any process are pulled every sync_interval seconds by primary key, and
+    registrations in this process are added at once, so a new account can
+    be missed by other workers for at most about sync_interval seconds.
+    """
+
+    def __init__(self, fp_rate=0.01, headroom=2.0, min_capacity=10000, rebuild_interval=3600, sync_interval=5):
+        self.fp_rate = fp_rate
+        self.headroom = headroom
+        self.min_capacity = min_capacity
+        self.rebuild_interval = rebuild_interval
+        self.sync_interval = sync_interval
+        self._bloom = None
+        self._max_id = 0
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._next_rebuild = 0.0
+        self._next_sync = 0.0
+
+        # METRICS (PLAIN COUNTERS - APPROXIMATE UNDER THREADS, KEEPS THE FAST PATH LOCK-FREE)
+        self.checks = 0
+        self.negatives = 0
+        self.rebuilds = 0
+        self.last_rebuild_seconds = None
+
+    @property
+    def ready(self):
+        """True once the first build has finished"""
+        return self._bloom is not None
+
+    def rebuild(self):
+        """
+        Build a new filter from the users table and swap it in
+
+        Returns:
+            int: Number of emails loaded
+        """
+        started = time.perf_counter()
+        # THE FULL SCAN MAY RUN ON A READ REPLICA - THE sync() BELOW CATCHES UP FROM THE PRIMARY
+        with use_replica():
+            count, max_id = db.session.execute(select(func.count(), func.max(User.id))).one()
+            bloom = BloomFilter.for_capacity(max(int(count * self.headroom), self.min_capacity), self.fp_rate)
+
+            # STREAMED WITH A SERVER-SIDE CURSOR - THE TABLE IS NEVER HELD IN MEMORY
+            emails = db.session.execute(
+                select(func.lower(User.email)).where(User.id <= (max_id or 0)).execution_options(yield_per=10000)
+            ).scalars()
+            for email in emails:
+                bloom.add(email)
+            db.session.rollback()
+
+        with self._lock:
+            self._bloom = bloom
+            self._max_id = max_id or 0
+        self.sync()
+
+        self._next_rebuild = time.monotonic() + self.rebuild_interval
+        self.rebuilds += 1
+        self.last_rebuild_seconds = time.perf_counter() - started
+        return bloom.count
+
+    def sync(self):
+        """
+        Add users created (by any process) since the last sync or rebuild
+
+        Returns:
+            int: Number of emails read
+        """
+        rows = db.session.execute(
+            select(User.id, func.lower(User.email)).where(User.id > self._max_id - _SYNC_ID_OVERLAP)
+        ).all()
+        for user_id, email in rows:
+            self.add(email)
+            self._max_id = max(self._max_id, user_id)
+        self._next_sync = time.monotonic() + self.sync_interval
+        return len(rows)
+
+    def add(self, email):
+        """Add a newly registered email"""
+        email = normalize_email(email)
+        # BloomFilter.add IS A READ-MODIFY-WRITE ON SHARED BYTES
+        with self._lock:
+            if self._bloom is not None and email not in self._bloom:
+                self._bloom.add(email)
+
+    def _rebuild_in_background(self, app):
+        try:
+            with app.app_context():
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    app.logger.error(f"Registered email filter rebuild failed: {e}")
+                    self._next_rebuild = time.monotonic() + self.sync_interval
+                finally:
+                    db.session.remove()
+        finally:
+            self._rebuild_lock.release()
+
+    def _refresh_if_due(self):
+        now = time.monotonic()
+        # ONE THREAD REBUILDS WHILE REQUESTS KEEP USING THE CURRENT FILTER
+        if now >= self._next_rebuild and self._rebuild_lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._rebuild_in_background,
+                args=(current_app._get_current_object(),),
+                name='email-filter-rebuild',
+                daemon=True
+            ).start()
+        # ONE REQUEST SYNCS, THE OTHERS KEEP USING THE CURRENT FILTER
+        if self.ready and now >= self._next_sync and self._sync_lock.acquire(blocking=False):
+            try:
+                self.sync()
+            finally:
+                self._sync_lock.release()
+
+    def might_exist(self, email):
+        """
+        Check if an email may be registered
+
+        Returns:
+            bool: False only if the email is definitely not registered
+        """
+        self._refresh_if_due()
+        bloom = self._bloom
+        if bloom is None:
+            return True
+
+        self.checks += 1
+        if normalize_email(email) in bloom:
+            return True
+        self.negatives += 1
+        return False
+
+    def stats(self):
+        """Return filter size and check counters"""
+        bloom = self._bloom
+        return {
+            "ready": bloom is not None,
+            "entries": bloom.count if bloom else 0,
+            "size_bytes": bloom.size_bytes if bloom else 0,
+            "fp_rate": self.fp_rate,
+            "estimated_fp_rate": bloom.estimated_fp_rate() if bloom else 0.0,
+            "checks": self.checks,
+            "db_lookups_skipped": self.negatives,
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": self.last_rebuild_seconds
+        }
+
+
+def init_email_filter(app):
+    """
+    Create the registered email filter for an app from its config
+
+    Returns:
+        RegisteredEmailFilter or None if EMAIL_FILTER_ENABLED is off
+    """
+    if not app.config.get('EMAIL_FILTER_ENABLED', False):
+        app.extensions['email_filter'] = None
+        return None
+    email_filter = RegisteredEmailFilter(
+        fp_rate=app.config.get('EMAIL_FILTER_FP_RATE', 0.01),
+        headroom=app.config.get('EMAIL_FILTER_HEADROOM', 2.0),
+        rebuild_interval=app.config.get('EMAIL_FILTER_REBUILD_INTERVAL', 3600),
+        sync_interval=app.config.get('EMAIL_FILTER_SYNC_INTERVAL', 5)
+    )
+    app.extensions['email_filter'] = email_filter
+    return email_filter
+
+
+def get_email_filter():
+    """Return the registered email filter of the current app (None if disabled)"""
+    if 'email_filter' not in current_app.extensions:
+        return init_email_filter(current_app)
+    return current_app.extensions['email_filter']
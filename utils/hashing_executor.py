@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from utils.user_utils import hash_password, check_password
+
+
+# WORKERS START FROM A CLEAN PROCESS - FORKING A THREADED SERVER CAN COPY LOCKS HELD BY OTHER
+# THREADS (LOGGING, CONNECTION POOLS) AND DEADLOCK THE CHILD. SPAWN WHERE FORKSERVER IS MISSING
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HashingUnavailable(Exception):
+    """Raised when a password hashing job cannot be completed in time"""
+
+
+class HashingQueueFull(HashingUnavailable):
+    """Raised when the hashing queue is already at capacity"""
+
+
+class HashingTimeout(HashingUnavailable):
+    """Raised when a hashing job does not finish within the per-call timeout"""
+
+
+def _timed_call(func, args, submitted_at):
+    """Run func in the worker and report how long the job waited in the queue"""
+    started_at = time.time()
+    return func(*args), started_at - submitted_at
+
+
+class HashingExecutor:
+    """
+    Bounded process pool for CPU-bound password hashing
+
+    Jobs beyond max_workers + max_queue are rejected immediately instead of
+    piling up behind the pool, so a login storm cannot starve cheap routes
+    of request threads.
+    """
+
+    def __init__(self, max_workers=None, max_queue=64, timeout=5.0, enabled=True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.enabled = enabled
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._pool = None
+        self._lock = threading.Lock()
+
+        # METRICS
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._abandoned = 0  # TIMED OUT BUT STILL RUNNING
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _get_pool(self):
+        """Create the process pool on first use (after the app has forked)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(_START_METHOD)
+                )
+            return self._pool
+
+    def submit(self, func, *args):
+        """
+        Run func(*args) on the hashing pool and wait for the result
+
+        Raises:
+            HashingQueueFull: If the queue is at capacity
+            HashingTimeout: If the job does not finish within the timeout
+        """
+        # RUN INLINE WHEN THE POOL IS DISABLED (TESTS, SINGLE-CORE DEPLOYMENTS)
+        if not self.enabled:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingQueueFull("Password hashing queue is full")
+
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+
+        abandoned = False
+
+        def release(_future):
+            # THE SLOT IS FREED WHEN THE JOB ENDS, NOT WHEN THE CALLER STOPS WAITING FOR IT
+            with self._lock:
+                self._in_flight -= 1
+                if abandoned:
+                    self._abandoned -= 1
+            self._slots.release()
+
+        try:
+            future = self._get_pool().submit(_timed_call, func, args, time.time())
+        except BaseException:
+            release(None)
+            raise
+        future.add_done_callback(release)
+
+        try:
+            result, wait = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A JOB THAT ALREADY STARTED CANNOT BE CANCELLED, ONLY ABANDONED - IT KEEPS ITS SLOT UNTIL IT ENDS
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+                if not future.done():
+                    abandoned = True
+                    self._abandoned += 1
+            raise HashingTimeout("Password hashing timed out")
+        except BrokenProcessPool:
+            # DROP THE BROKEN POOL SO THE NEXT CALL STARTS A FRESH ONE
+            with self._lock:
+                self._pool = None
+            raise
+
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return result
+
+    def hash_password(self, password, *args):
+        """Hash a password on the pool"""
+        return self.submit(hash_password, password, *args)
+
+    def check_password(self, password, password_hash):
+        """Verify a password against its hash on the pool"""
+        return self.submit(check_password, password, password_hash)
+
+    def stats(self):
+        """Return a snapshot of queue depth and wait time metrics"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(self._in_flight - self.max_workers, 0),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "abandoned": self._abandoned,
+                "wait_avg_ms": (self._wait_total / self._completed * 1000) if self._completed else 0.0,
+                "wait_max_ms": self._wait_max * 1000
+            }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def init_hashing_executor(app):
+    """Create the hashing executor for an app from its config"""
+    executor = HashingExecutor(
+        max_workers=app.config.get('HASHING_POOL_WORKERS'),
+        max_queue=app.config.get('HASHING_POOL_MAX_QUEUE', 64),
+        timeout=app.config.get('HASHING_POOL_TIMEOUT', 5.0),
+        enabled=app.config.get('HASHING_POOL_ENABLED', True)
+    )
+    app.extensions['hashing_executor'] = executor
+    return executor
+
+
+def get_hashing_executor():
+    """Return the hashing executor of the current app"""
+    executor = current_app.extensions.get('hashing_executor')
+    if executor is None:
+        executor = init_hashing_executor(current_app)
+    return executor
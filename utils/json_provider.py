@@ -0,0 +1,66 @@
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # OPTIONAL DEPENDENCY (orjson)
+    orjson = None
+
+
+def _default(o):
+    """Serialize values JSON has no type for (the stdlib path; orjson does these natively)"""
+    # ISO 8601 LIKE orjson - FLASK'S DEFAULT WOULD WRITE AN HTTP DATE
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed
+
+    jsonify() and request.get_json() go through it. Responses are encoded
+    once, straight to bytes, and datetimes are written as ISO 8601 by both
+    encoders, so models can hand them over as they are instead of
+    formatting every field. Without orjson the stdlib encoder is used with
+    the same output (apart from whitespace and non-ASCII escaping).
+    """
+    default = staticmethod(_default)
+
+    @property
+    def fast(self):
+        """True if orjson is in use"""
+        return orjson is not None
+
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # CUSTOM ARGUMENTS (cls, indent...) ONLY MEAN SOMETHING TO THE STDLIB ENCODER
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the fast JSON provider on an app"""
+    app.json = FastJSONProvider(app)
+    return app.json
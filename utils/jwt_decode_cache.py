@@ -0,0 +1,88 @@
+import hashlib
+import hmac
+import time
+import flask_jwt_extended
+from flask import current_app
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.exceptions import CSRFError, JWTDecodeError
+from utils.cache import TTLCache
+
+# CachingJWTManager OVERRIDES A PRIVATE METHOD - ONLY TRUST THE RELEASES IT WAS CHECKED AGAINST
+# (KEEP IN STEP WITH THE Flask-JWT-Extended PIN IN requirements.txt)
+SUPPORTED_JWT_EXTENDED_VERSIONS = ('4.7.1',)
+
+
+def init_jwt_decode_cache(app):
+    """
+    Create the verified JWT claims cache for an app from its config
+
+    The cache is also left off when the installed Flask-JWT-Extended is not
+    one of SUPPORTED_JWT_EXTENDED_VERSIONS, since the private decode method
+    it wraps may have changed.
+
+    Returns:
+        TTLCache or None if JWT_DECODE_CACHE_SIZE is 0 or the version is unsupported
+    """
+    maxsize = app.config.get('JWT_DECODE_CACHE_SIZE', 10000)
+    if maxsize and flask_jwt_extended.__version__ not in SUPPORTED_JWT_EXTENDED_VERSIONS:
+        app.logger.warning(
+            f"JWT decode cache disabled: Flask-JWT-Extended {flask_jwt_extended.__version__} is not supported"
+        )
+        maxsize = 0
+    if not maxsize:
+        app.extensions['jwt_decode_cache'] = None
+        return None
+    cache = TTLCache(maxsize=maxsize, ttl=app.config.get('JWT_DECODE_CACHE_TTL', 300))
+    app.extensions['jwt_decode_cache'] = cache
+    return cache
+
+
+def get_jwt_decode_cache():
+    """Return the verified JWT claims cache of the current app (None if disabled)"""
+    return current_app.extensions.get('jwt_decode_cache')
+
+
+def _jwt_decode_cache_key(encoded_token):
+    # KEY ON A DIGEST SO RAW TOKENS ARE NOT KEPT IN MEMORY
+    return hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that remembers the claims of tokens it has already verified
+
+    A session presents the same access token on every request until it
+    expires, so after the first full decode (signature, exp/nbf/iss/aud)
+    the claims are served from an in-process cache keyed by a digest of
+    the raw token. Entries live until the token's exp (capped by
+    JWT_DECODE_CACHE_TTL, which also bounds how long a removed signing key
+    keeps verifying cached tokens). Only successful decodes are cached.
+
+    Revocation is unaffected: the blocklist loader still runs on every
+    request after decoding.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = get_jwt_decode_cache()
+        if cache is None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = _jwt_decode_cache_key(encoded_token)
+        claims = cache.get(key)
+        if claims is None:
+            # VERIFY WITHOUT THE CSRF VALUE SO THE CACHED CLAIMS DO NOT DEPEND ON THE REQUEST
+            claims = super()._decode_jwt_from_config(encoded_token)
+            exp = claims.get('exp')
+            ttl = cache.ttl if exp is None else min(cache.ttl, exp - time.time())
+            if ttl > 0:
+                cache.set(key, claims, ttl=ttl)
+
+        # SAME DOUBLE SUBMIT CHECK AS flask_jwt_extended.tokens._decode_jwt
+        if csrf_value:
+            if "csrf" not in claims:
+                raise JWTDecodeError("Missing claim: csrf")
+            if not hmac.compare_digest(claims["csrf"], csrf_value):
+                raise CSRFError("CSRF double submit tokens do not match")
+
+        # CALLERS MAY MODIFY THE CLAIMS THEY GET (get_jwt() IS A PLAIN DICT)
+        return dict(claims)
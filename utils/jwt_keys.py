@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from flask import current_app, g
+from jwt.exceptions import InvalidTokenError
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa, ed25519
+    from jwt.algorithms import RSAAlgorithm, OKPAlgorithm
+except ImportError:  # OPTIONAL DEPENDENCY (cryptography)
+    serialization = None
+
+# JWT_ALGORITHM VALUES THAT SIGN WITH A KEY FROM JWT_KEYS_DIR
+ASYMMETRIC_ALGORITHMS = ('RS256', 'RS384', 'RS512', 'PS256', 'PS384', 'PS512', 'EdDSA')
+
+
+def _key_algorithm(key, rsa_algorithm):
+    """JWT algorithm for a key object (RSA keys use the configured RS*/PS* variant)"""
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return rsa_algorithm if rsa_algorithm != 'EdDSA' else 'RS256'
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return 'EdDSA'
+    raise ValueError(f"Unsupported JWT key type: {type(key).__name__}")
+
+
+def generate_key(directory, algorithm='RS256', kid=None):
+    """
+    Write a new private key to a keyset directory
+
+    It is published in the JWKS right away and becomes the signing key once
+    it has been public for JWKS_MAX_AGE (see JWTKeySet).
+
+    Args:
+        directory: The keyset directory (created if missing)
+        algorithm: 'EdDSA' for Ed25519, any RS*/PS* algorithm for RSA
+        kid: Key ID, defaults to the current UTC time
+
+    Returns:
+        str: Path of the new PEM file
+    """
+    if serialization is None:
+        raise RuntimeError("cryptography is required for asymmetric JWT signing")
+
+    kid = kid or time.strftime('%Y%m%d%H%M%S', time.gmtime())
+    if algorithm == 'EdDSA':
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{kid}.pem")
+    # PRIVATE KEY - OWNER READ/WRITE ONLY, NEVER OVERWRITE AN EXISTING KID
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return path
+
+
+class JWTKeySet:
+    """
+    Signing and verification keys loaded from a directory
+
+    Every '<kid>.pem' file is a key: private keys can sign, public-only keys
+    (retired keys whose private part was removed) only verify. All of them
+    are published in the JWKS. The signing key is the newest private key of
+    the configured algorithm that has been published for at least
+    publish_delay seconds, so verifiers caching the JWKS learn a new key
+    before tokens signed with it appear. The directory is rescanned every
+    reload_interval seconds; rotation is dropping a new key file in.
+    """
+
+    def __init__(self, directory, algorithm='RS256', publish_delay=300, reload_interval=60):
+        if serialization is None:
+            raise RuntimeError("cryptography is required for asymmetric JWT signing")
+        self.directory = directory
+        self.algorithm = algorithm
+        self.publish_delay = publish_delay
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._next_reload = 0.0
+        self.reload()
+
+    def _load_file(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if b'PRIVATE KEY' in data:
+            private_key = serialization.load_pem_private_key(data, password=None)
+            return private_key, private_key.public_key()
+        return None, serialization.load_pem_public_key(data)
+
+    def reload(self):
+        """Rescan the directory and pick the signing key"""
+        keys = {}
+        now = time.time()
+        signing = None
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.pem'):
+                continue
+            path = os.path.join(self.directory, name)
+            kid = name[:-len('.pem')]
+            private_key, public_key = self._load_file(path)
+            algorithm = _key_algorithm(public_key, self.algorithm)
+            keys[kid] = (algorithm, public_key)
+
+            if private_key is None or algorithm != self.algorithm:
+                continue
+            created = os.path.getmtime(path)
+            published = now - created >= self.publish_delay
+            candidate = (published, created, kid, private_key)
+            # PREFER PUBLISHED KEYS, THEN THE NEWEST (AN UNPUBLISHED KEY ONLY SIGNS IF NOTHING ELSE CAN)
+            if signing is None or candidate[:3] > signing[:3]:
+                signing = candidate
+
+        if signing is None:
+            raise RuntimeError(f"No {self.algorithm} private key in {self.directory}")
+
+        jwks = {"keys": []}
+        for kid, (algorithm, public_key) in keys.items():
+            to_jwk = OKPAlgorithm.to_jwk if algorithm == 'EdDSA' else RSAAlgorithm.to_jwk
+            jwk = to_jwk(public_key, as_dict=True)
+            jwk.pop('key_ops', None)  # RFC 7517: DO NOT COMBINE WITH "use"
+            jwk.update(kid=kid, alg=algorithm, use='sig')
+            jwks["keys"].append(jwk)
+
+        # SWAP EVERYTHING AT ONCE SO READERS NEVER SEE A HALF-LOADED KEYSET
+        self._state = (signing[2], signing[3], keys, jwks)
+        self._next_reload = time.monotonic() + self.reload_interval
+        return self
+
+    def maybe_reload(self):
+        """Rescan the directory if reload_interval has passed"""
+        if time.monotonic() >= self._next_reload and self._lock.acquire(blocking=False):
+            try:
+                self.reload()
+            finally:
+                self._lock.release()
+
+    def signing_key(self):
+        """Return (kid, private_key) of the current signing key"""
+        kid, private_key, _, _ = self._state
+        return kid, private_key
+
+    def verification_key(self, kid):
+        """Return the public key for a kid, or None if unknown"""
+        entry = self._state[2].get(kid)
+        return entry[1] if entry else None
+
+    def jwks(self):
+        """Public keys as a JSON Web Key Set"""
+        return self._state[3]
+
+
+def init_jwt_keys(app, jwt):
+    """
+    Load JWT_KEYS_DIR and sign/verify tokens with it (asymmetric JWT_ALGORITHM only)
+
+    Returns:
+        JWTKeySet or None if JWT_ALGORITHM is a shared-secret algorithm
+    """
+    algorithm = app.config.get('JWT_ALGORITHM', 'HS256')
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return None
+
+    directory = app.config.get('JWT_KEYS_DIR')
+    if not directory:
+        raise RuntimeError(f"JWT_KEYS_DIR is required for JWT_ALGORITHM={algorithm}")
+
+    reload_interval = app.config.get('JWT_KEYS_RELOAD_INTERVAL', 60)
+    # A WORKER MAY ONLY SERVE A NEW KEY reload_interval AFTER IT APPEARS, AND VERIFIERS THEN CACHE THAT JWKS
+    keyset = JWTKeySet(
+        directory,
+        algorithm=algorithm,
+        publish_delay=app.config.get('JWKS_MAX_AGE', 300) + reload_interval,
+        reload_interval=reload_interval
+    )
+    app.extensions['jwt_keys'] = keyset
+    # ANY ASYMMETRIC ALGORITHM MAY VERIFY (THE KEY TYPE PINS IT), SO ROTATING BETWEEN RSA AND
+    # Ed25519 NEEDS NO RESTART - SHARED-SECRET ALGORITHMS ARE NEVER ACCEPTED (ALGORITHM CONFUSION)
+    app.config['JWT_DECODE_ALGORITHMS'] = list(ASYMMETRIC_ALGORITHMS)
+
+    @jwt.additional_headers_loader
+    def add_kid_header(identity):
+        keyset.maybe_reload()
+        # PIN THE KEY FOR encode_key_loader - A RELOAD IN BETWEEN MUST NOT MISMATCH kid AND KEY
+        g._jwt_signing_key = keyset.signing_key()
+        return {"kid": g._jwt_signing_key[0]}
+
+    @jwt.encode_key_loader
+    def signing_key(identity):
+        kid, private_key = g.pop('_jwt_signing_key', None) or keyset.signing_key()
+        return private_key
+
+    @jwt.decode_key_loader
+    def verification_key(jwt_header, jwt_payload):
+        kid = jwt_header.get('kid')
+        key = keyset.verification_key(kid)
+        if key is None:
+            # MAYBE ANOTHER NODE ALREADY SIGNS WITH A KEY WE HAVE NOT LOADED YET
+            keyset.maybe_reload()
+            key = keyset.verification_key(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+    return keyset
+
+
+def get_jwt_keys():
+    """Return the JWT keyset of the current app (None with a shared secret)"""
+    return current_app.extensions.get('jwt_keys')
@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import hmac
+import os
+import bcrypt
+
+try:
+    from argon2 import PasswordHasher as Argon2PasswordHasher, Type as Argon2Type
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # OPTIONAL DEPENDENCY (argon2-cffi)
+    Argon2PasswordHasher = None
+
+
+def _b64encode(data):
+    """Unpadded base64 (same alphabet as passlib/argon2 hashes)"""
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _b64decode(data):
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+class BcryptHasher:
+    """bcrypt - CPU-hard, fixed 4 KiB memory"""
+    algorithm = 'bcrypt'
+    prefixes = ('$2b$', '$2a$', '$2y$')
+
+    def hash(self, password, rounds=12):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+    def verify(self, password, password_hash):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    @staticmethod
+    def get_rounds(password_hash):
+        """Return the cost factor stored in a bcrypt hash ($2b$<rounds>$...), None if malformed"""
+        try:
+            return int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+
+    def check(self, rounds=12):
+        """Raise ValueError if hashes cannot be made with these parameters"""
+        bcrypt.gensalt(rounds=rounds)
+
+    def needs_rehash(self, password_hash, rounds=12):
+        # ONLY EVER UPGRADE - WORKERS CALIBRATED TO DIFFERENT COSTS MUST NOT REHASH BACK AND FORTH
+        stored = self.get_rounds(password_hash)
+        return stored is None or stored < rounds
+
+
+class ScryptHasher:
+    """scrypt from the standard library - memory-hard, 128 * r * 2^ln bytes per hash"""
+    algorithm = 'scrypt'
+    prefixes = ('$scrypt$',)
+    # STORED PARAMETERS ARE NOT TRUSTED - A TAMPERED HASH MUST NOT MAKE A LOGIN ALLOCATE GIGABYTES
+    max_ln = 20
+    max_memory = 2 ** 30  # BYTES (128 * r * 2^ln)
+
+    def _derive(self, password, salt, ln, r, p):
+        n = 2 ** ln
+        return hashlib.scrypt(
+            password.encode('utf-8'),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * r * n * p,  # DEFAULT 32 MiB LIMIT IS TOO LOW FOR ln >= 15
+            dklen=32
+        )
+
+    def _parse(self, password_hash):
+        # FORMAT: $scrypt$ln=<ln>,r=<r>,p=<p>$<salt>$<digest>
+        _, _, settings, salt, digest = password_hash.split('$')
+        params = dict(item.split('=') for item in settings.split(','))
+        ln, r, p = int(params['ln']), int(params['r']), int(params['p'])
+        self.check(ln, r, p)
+        return ln, r, p, _b64decode(salt), _b64decode(digest)
+
+    def check(self, ln=15, r=8, p=1):
+        """Raise ValueError if hashes cannot be made (or would not verify) with these parameters"""
+        if not (0 < ln <= self.max_ln and r > 0 and p > 0 and 128 * r * 2 ** ln <= self.max_memory):
+            raise ValueError(f"scrypt parameters out of range: ln={ln}, r={r}, p={p}")
+
+    def hash(self, password, ln=15, r=8, p=1):
+        salt = os.urandom(16)
+        digest = self._derive(password, salt, ln, r, p)
+        return f"$scrypt$ln={ln},r={r},p={p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password, password_hash):
+        try:
+            ln, r, p, salt, digest = self._parse(password_hash)
+            # hashlib REJECTS SOME COMBINATIONS (E.G. r * p TOO LARGE) WITH ValueError
+            derived = self._derive(password, salt, ln, r, p)
+        except (ValueError, KeyError):
+            return False
+        return hmac.compare_digest(derived, digest)
+
+    def needs_rehash(self, password_hash, ln=15, r=8, p=1):
+        try:
+            return self._parse(password_hash)[:3] != (ln, r, p)
+        except (ValueError, KeyError):
+            return True
+
+
+class Argon2Hasher:
+    """Argon2id via argon2-cffi - memory-hard with independent time/memory/lanes knobs"""
+    algorithm = 'argon2id'
+    prefixes = ('$argon2id$',)
+
+    def _hasher(self, time_cost=3, memory_cost=65536, parallelism=1):
+        if Argon2PasswordHasher is None:
+            raise RuntimeError("argon2-cffi is required for the argon2id password hasher")
+        return Argon2PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=Argon2Type.ID
+        )
+
+    def check(self, time_cost=3, memory_cost=65536, parallelism=1):
+        """Raise RuntimeError without argon2-cffi"""
+        self._hasher(time_cost, memory_cost, parallelism)
+
+    def hash(self, password, time_cost=3, memory_cost=65536, parallelism=1):
+        return self._hasher(time_cost, memory_cost, parallelism).hash(password)
+
+    def verify(self, password, password_hash):
+        hasher = self._hasher()
+        try:
+            return hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash, time_cost=3, memory_cost=65536, parallelism=1):
+        return self._hasher(time_cost, memory_cost, parallelism).check_needs_rehash(password_hash)
+
+
+# REGISTRY OF HASHERS BY ALGORITHM NAME
+HASHERS = {}
+
+def register_hasher(hasher):
+    """Register a hasher so its hashes can be created and recognised"""
+    HASHERS[hasher.algorithm] = hasher
+    return hasher
+
+register_hasher(BcryptHasher())
+register_hasher(ScryptHasher())
+register_hasher(Argon2Hasher())
+
+def get_hasher(algorithm):
+    """Return the hasher registered under an algorithm name"""
+    try:
+        return HASHERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+
+def init_password_hasher(app):
+    """
+    Check the configured PASSWORD_HASHER and its parameters at startup
+
+    A bad setting would otherwise only surface as a 500 on the first
+    registration or login.
+
+    Raises:
+        ValueError: If the algorithm is unknown or its parameters are invalid
+        RuntimeError: If the algorithm's optional dependency is not installed
+    """
+    algorithm, params = get_hasher_config(app.config)
+    get_hasher(algorithm).check(**params)
+
+def identify_hasher(password_hash):
+    """
+    Find the hasher that produced a stored hash from its prefix
+
+    Returns:
+        The matching hasher, or None if the hash format is unknown
+    """
+    for hasher in HASHERS.values():
+        if password_hash.startswith(hasher.prefixes):
+            return hasher
+    return None
+
+def get_hasher_config(config):
+    """
+    Read the preferred algorithm and its parameters from app config
+
+    Returns:
+        tuple: (algorithm: str, params: dict)
+    """
+    algorithm = config.get('PASSWORD_HASHER', 'bcrypt')
+    if algorithm == 'bcrypt':
+        params = {'rounds': config.get('BCRYPT_ROUNDS') or 12}
+    elif algorithm == 'scrypt':
+        params = {
+            'ln': config.get('SCRYPT_LN', 15),
+            'r': config.get('SCRYPT_R', 8),
+            'p': config.get('SCRYPT_P', 1)
+        }
+    elif algorithm == 'argon2id':
+        params = {
+            'time_cost': config.get('ARGON2_TIME_COST', 3),
+            'memory_cost': config.get('ARGON2_MEMORY_COST', 65536),
+            'parallelism': config.get('ARGON2_PARALLELISM', 1)
+        }
+    else:
+        params = {}
+    return algorithm, params
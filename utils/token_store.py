@@ -0,0 +1,719 @@
+import hashlib
+import heapq
+import hmac
+import json
+import math
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict, namedtuple
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import insert, select, update, delete, or_, bindparam, String, DateTime, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models.user_model import db
+from models.verification_model import VerificationToken
+from models.refresh_token_model import RefreshToken
+from models.revoked_access_token_model import RevokedAccessToken
+
+try:
+    import redis
+except ImportError:  # OPTIONAL DEPENDENCY (redis)
+    redis = None
+
+
+# WHAT VALIDATION NEEDS TO KNOW ABOUT A REFRESH TOKEN, WHATEVER THE BACKEND
+RefreshTokenState = namedtuple(
+    'RefreshTokenState',
+    ['user_id', 'expires_at', 'is_revoked', 'family_id', 'token_version'],
+    defaults=[0]
+)
+
+
+def _hash_refresh_secret(secret):
+    # SECRETS ARE 256 RANDOM BITS, SO A FAST DIGEST IS ENOUGH
+    return hashlib.sha256(secret.encode('utf-8')).hexdigest()
+
+
+# refresh_tokens.id IS AN int4 - LARGER SELECTORS WOULD FAIL IN THE DATABASE
+_MAX_REFRESH_TOKEN_ID = 2 ** 31 - 1
+
+
+def _parse_refresh_token_id(token_id):
+    """
+    Row ID of the selector part of an '<id>.<secret>' token
+
+    The selector comes from the client: only ASCII digits in the int4
+    range are accepted (str.isdigit alone also passes '²' or '٣', which
+    int() then rejects).
+
+    Returns:
+        int or None: The ID, None if the selector is malformed
+    """
+    if not (token_id.isascii() and token_id.isdigit()) or len(token_id) > 10:
+        return None
+    token_id = int(token_id)
+    return token_id if 0 < token_id <= _MAX_REFRESH_TOKEN_ID else None
+
+
+class TokenStore(ABC):
+    """
+    Storage of refresh, verification and revoked access token state
+
+    Implementations generate the tokens they hand out. Verification tokens
+    must never contain '.' (that marks signed, stateless tokens).
+    The commit arguments only matter to stores that share the SQLAlchemy
+    session; the others apply every change immediately.
+    """
+    name = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    @abstractmethod
+    def put_verification_token(self, user_id, token_type, expires_at):
+        """Store a new token, replacing the user's previous one of the same type; returns the token"""
+
+    @abstractmethod
+    def consume_verification_token(self, token, token_type, commit=True):
+        """Delete a live token of the given type; returns its user ID or None"""
+
+    @abstractmethod
+    def create_refresh_token(self, user_id, expires_at, ip_address=None, user_agent=None, family_id=None, token_version=0):
+        """Store a new refresh token (a new family unless given); returns the token"""
+
+    @abstractmethod
+    def get_refresh_token(self, token_str):
+        """Look up a refresh token; returns a RefreshTokenState or None"""
+
+    def get_refresh_tokens(self, token_strs):
+        """Look up several refresh tokens in one round trip; returns {token_str: RefreshTokenState} of those found"""
+        states = {}
+        for token_str in token_strs:
+            state = self.get_refresh_token(token_str)
+            if state:
+                states[token_str] = state
+        return states
+
+    @abstractmethod
+    def rotate_refresh_token(self, token_str, expires_at, ip_address=None, user_agent=None):
+        """
+        Atomically revoke a live refresh token and issue its successor in the same family
+
+        The successor inherits the family and token version.
+
+        Returns:
+            tuple: (new_token, user_id, token_version), or (None, None, None) if nothing was rotated
+        """
+
+    @abstractmethod
+    def revoke_refresh_token(self, token_str):
+        """Mark a refresh token revoked; returns False if it does not exist"""
+
+    @abstractmethod
+    def revoke_refresh_family(self, family_id):
+        """Mark every token of a rotation family revoked"""
+
+    @abstractmethod
+    def revoke_access_token(self, jti, expires_at):
+        """Deny an access token (by JWT ID) until it expires"""
+
+    @abstractmethod
+    def is_access_token_revoked(self, jti):
+        """Check if an access token has been revoked"""
+
+    @abstractmethod
+    def revoked_access_tokens(self, since):
+        """JWT IDs of unexpired access tokens revoked at or after since"""
+
+
+class SQLTokenStore(TokenStore):
+    """Tokens in the verification_tokens/refresh_tokens/revoked_access_tokens tables of the primary database"""
+    name = 'sql'
+
+    def put_verification_token(self, user_id, token_type, expires_at):
+        token = secrets.token_urlsafe(32)
+
+        # SINGLE UPSERT - REPLACES THE PREVIOUS TOKEN OF THE SAME TYPE FOR THIS USER
+        stmt = pg_insert(VerificationToken).values(
+            user_id=user_id,
+            token=token,
+            token_type=token_type,
+            expires_at=expires_at,
+            created_at=datetime.now(timezone.utc)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'token_type'],
+            set_={
+                'token': stmt.excluded.token,
+                'expires_at': stmt.excluded.expires_at,
+                'created_at': stmt.excluded.created_at
+            }
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+
+        return token
+
+    def consume_verification_token(self, token, token_type, commit=True):
+        # DELETE ... RETURNING - WHEN A LINK IS CLICKED TWICE CONCURRENTLY ONLY ONE REQUEST
+        # GETS THE USER ID BACK. EXPIRED TOKENS ARE DELETED WHATEVER THEIR TYPE
+        table = VerificationToken.__table__
+        row = db.session.execute(
+            delete(table)
+            .where(
+                table.c.token == token,
+                or_(table.c.token_type == token_type, table.c.expires_at <= func.now())
+            )
+            .returning(table.c.user_id, (table.c.expires_at > func.now()).label('is_live'))
+        ).first()
+
+        if commit:
+            db.session.commit()
+
+        # NOT FOUND, WRONG TYPE (NOTHING DELETED) OR EXPIRED (DELETED)
+        if not row or not row.is_live:
+            return None
+
+        return row.user_id
+
+    def _find(self, token_str):
+        """
+        Look up the row for a presented refresh token
+
+        New tokens ('<id>.<secret>') are a primary key hit followed by a
+        constant-time digest comparison; legacy tokens without a '.' are still
+        looked up by the raw token column until they expire.
+        """
+        token_id, sep, secret = token_str.partition('.')
+        if not sep:
+            return RefreshToken.query.filter_by(token=token_str).first()
+
+        token_id = _parse_refresh_token_id(token_id)
+        if token_id is None or not secret:
+            return None
+
+        # FILTER ON id RATHER THAN session.get - THE PARTITIONED SCHEMA HAS A (id, expires_at) KEY
+        token_record = RefreshToken.query.filter_by(id=token_id).first()
+        if not token_record or not token_record.token_hash:
+            return None
+
+        if not hmac.compare_digest(token_record.token_hash, _hash_refresh_secret(secret)):
+            return None
+
+        return token_record
+
+    def create_refresh_token(self, user_id, expires_at, ip_address=None, user_agent=None, family_id=None, token_version=0):
+        # GENERATE SECRET - ONLY ITS DIGEST IS STORED
+        secret = secrets.token_urlsafe(32)
+
+        refresh_token = RefreshToken(
+            token_hash=_hash_refresh_secret(secret),
+            user_id=user_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            expires_at=expires_at,
+            is_revoked=False,
+            family_id=family_id or secrets.token_hex(16),
+            token_version=token_version
+        )
+        db.session.add(refresh_token)
+        db.session.commit()
+
+        return f"{refresh_token.id}.{secret}"
+
+    def get_refresh_token(self, token_str):
+        token_record = self._find(token_str)
+        if not token_record:
+            return None
+        return RefreshTokenState(
+            token_record.user_id,
+            token_record.expires_at,
+            token_record.is_revoked,
+            token_record.family_id,
+            token_record.token_version
+        )
+
+    def get_refresh_tokens(self, token_strs):
+        by_id, legacy = {}, {}
+        for token_str in token_strs:
+            token_id, sep, secret = token_str.partition('.')
+            if not sep:
+                legacy[token_str] = token_str
+                continue
+            token_id = _parse_refresh_token_id(token_id)
+            if token_id is not None and secret:
+                by_id.setdefault(token_id, []).append((token_str, secret))
+
+        conditions = []
+        if by_id:
+            conditions.append(RefreshToken.id.in_(by_id))
+        if legacy:
+            conditions.append(RefreshToken.token.in_(legacy))
+        if not conditions:
+            return {}
+
+        # ONE SELECT FOR THE WHOLE BATCH - DIGESTS ARE COMPARED HERE, AS IN _find
+        rows = db.session.execute(
+            select(
+                RefreshToken.id, RefreshToken.token, RefreshToken.token_hash, RefreshToken.user_id,
+                RefreshToken.expires_at, RefreshToken.is_revoked, RefreshToken.family_id, RefreshToken.token_version
+            ).where(or_(*conditions))
+        )
+        states = {}
+        for row in rows:
+            state = RefreshTokenState(row.user_id, row.expires_at, row.is_revoked, row.family_id, row.token_version)
+            if row.token is not None and row.token in legacy:
+                states[row.token] = state
+            for token_str, secret in by_id.get(row.id, ()):
+                if row.token_hash and hmac.compare_digest(row.token_hash, _hash_refresh_secret(secret)):
+                    states[token_str] = state
+        return states
+
+    def rotate_refresh_token(self, token_str, expires_at, ip_address=None, user_agent=None):
+        table = RefreshToken.__table__
+        token_id, sep, secret = token_str.partition('.')
+
+        if not sep:
+            # LEGACY TOKEN - REVOKE IT AND START A NEW FAMILY
+            row = db.session.execute(
+                update(table)
+                .where(
+                    table.c.token == token_str,
+                    table.c.is_revoked.is_(False),
+                    table.c.expires_at > func.now()
+                )
+                .values(is_revoked=True, revoked_at=func.now())
+                .returning(table.c.user_id, table.c.token_version)
+            ).first()
+            if not row:
+                db.session.commit()
+                return None, None, None
+            new_token = self.create_refresh_token(
+                row.user_id, expires_at, ip_address, user_agent, token_version=row.token_version
+            )
+            return new_token, row.user_id, row.token_version
+
+        token_id = _parse_refresh_token_id(token_id)
+        if token_id is None or not secret:
+            return None, None, None
+
+        new_secret = secrets.token_urlsafe(32)
+
+        # ONE STATEMENT: WITH old AS (UPDATE ... RETURNING) INSERT ... SELECT FROM old RETURNING
+        # DIGESTS ARE COMPARED IN SQL - TIMING ONLY REVEALS THE DIGEST, NOT THE SECRET
+        old = (
+            update(table)
+            .where(
+                table.c.id == token_id,
+                table.c.token_hash == _hash_refresh_secret(secret),
+                table.c.is_revoked.is_(False),
+                table.c.expires_at > func.now()
+            )
+            .values(is_revoked=True, revoked_at=func.now())
+            .returning(table.c.user_id, table.c.family_id, table.c.token_version)
+            .cte('old')
+        )
+        successor = (
+            insert(table)
+            .from_select(
+                ['token_hash', 'user_id', 'family_id', 'token_version', 'ip_address', 'user_agent', 'is_revoked',
+                 'created_at', 'expires_at'],
+                select(
+                    bindparam('token_hash', _hash_refresh_secret(new_secret), type_=String),
+                    old.c.user_id,
+                    old.c.family_id,
+                    old.c.token_version,
+                    bindparam('ip_address', ip_address, type_=String),
+                    bindparam('user_agent', user_agent, type_=String),
+                    bindparam('is_revoked', False),
+                    func.now(),
+                    bindparam('expires_at', expires_at, type_=DateTime(timezone=True))
+                ).select_from(old)
+            )
+            .returning(table.c.id, table.c.user_id, table.c.token_version)
+        )
+        row = db.session.execute(successor).first()
+        db.session.commit()
+
+        if not row:
+            return None, None, None
+        return f"{row.id}.{new_secret}", row.user_id, row.token_version
+
+    def revoke_refresh_token(self, token_str):
+        token_record = self._find(token_str)
+        if not token_record:
+            return False
+
+        token_record.is_revoked = True
+        token_record.revoked_at = datetime.now(timezone.utc)
+        db.session.commit()
+        return True
+
+    def revoke_refresh_family(self, family_id):
+        # ALREADY REVOKED MEMBERS KEEP THEIR revoked_at
+        RefreshToken.query.filter_by(family_id=family_id, is_revoked=False).update(
+            {'is_revoked': True, 'revoked_at': func.now()}, synchronize_session=False
+        )
+        db.session.commit()
+
+    def revoke_access_token(self, jti, expires_at):
+        db.session.execute(
+            pg_insert(RevokedAccessToken)
+            .values(jti=jti, expires_at=expires_at, revoked_at=datetime.now(timezone.utc))
+            .on_conflict_do_nothing(index_elements=['jti'])
+        )
+        db.session.commit()
+
+    def is_access_token_revoked(self, jti):
+        table = RevokedAccessToken.__table__
+        return db.session.execute(
+            select(table.c.jti).where(table.c.jti == jti, table.c.expires_at > func.now())
+        ).first() is not None
+
+    def revoked_access_tokens(self, since):
+        table = RevokedAccessToken.__table__
+        rows = db.session.execute(
+            select(table.c.jti).where(table.c.revoked_at >= since, table.c.expires_at > func.now())
+        )
+        return [row.jti for row in rows]
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Tokens in process memory - for single-node deployments and tests
+
+    Nothing survives a restart and nothing is shared between workers.
+    Expired entries are evicted from a min-heap of expiry times on writes.
+    """
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh = {}  # DIGEST -> [user_id, expires_at, is_revoked, family_id, token_version]
+        self._families = defaultdict(set)
+        self._verification = {}  # TOKEN -> (user_id, token_type, expires_at)
+        self._verification_by_user = {}  # (user_id, token_type) -> TOKEN
+        self._revoked_access = {}  # JTI -> (expires_at, revoked_at)
+        self._expiry = []  # HEAP OF (expires_at, kind, key)
+
+    def __len__(self):
+        return len(self._refresh) + len(self._verification) + len(self._revoked_access)
+
+    def _purge(self, now):
+        # CALLED WITH THE LOCK HELD
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, kind, key = heapq.heappop(self._expiry)
+            if kind == 'refresh':
+                entry = self._refresh.get(key)
+                if entry and entry[1] == expires_at:
+                    del self._refresh[key]
+                    self._discard_from(self._families, entry[3], key)
+            elif kind == 'access':
+                self._revoked_access.pop(key, None)
+            else:
+                entry = self._verification.get(key)
+                if entry and entry[2] == expires_at:
+                    del self._verification[key]
+                    if self._verification_by_user.get(entry[:2]) == key:
+                        del self._verification_by_user[entry[:2]]
+
+    @staticmethod
+    def _discard_from(index, index_key, key):
+        keys = index.get(index_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    def put_verification_token(self, user_id, token_type, expires_at):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._purge(datetime.now(timezone.utc))
+            previous = self._verification_by_user.get((user_id, token_type))
+            if previous is not None:
+                self._verification.pop(previous, None)
+            self._verification[token] = (user_id, token_type, expires_at)
+            self._verification_by_user[(user_id, token_type)] = token
+            heapq.heappush(self._expiry, (expires_at, 'verification', token))
+        return token
+
+    def consume_verification_token(self, token, token_type, commit=True):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._verification.get(token)
+            if not entry or (entry[1] != token_type and entry[2] > now):
+                return None
+            del self._verification[token]
+            if self._verification_by_user.get(entry[:2]) == token:
+                del self._verification_by_user[entry[:2]]
+        return entry[0] if entry[2] > now else None
+
+    def create_refresh_token(self, user_id, expires_at, ip_address=None, user_agent=None, family_id=None, token_version=0):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._purge(datetime.now(timezone.utc))
+            self._add_refresh(
+                _hash_refresh_secret(token), user_id, expires_at, family_id or secrets.token_hex(16), token_version
+            )
+        return token
+
+    def _add_refresh(self, digest, user_id, expires_at, family_id, token_version):
+        # CALLED WITH THE LOCK HELD
+        self._refresh[digest] = [user_id, expires_at, False, family_id, token_version]
+        self._families[family_id].add(digest)
+        heapq.heappush(self._expiry, (expires_at, 'refresh', digest))
+
+    def get_refresh_token(self, token_str):
+        with self._lock:
+            entry = self._refresh.get(_hash_refresh_secret(token_str))
+            return RefreshTokenState(*entry) if entry else None
+
+    def get_refresh_tokens(self, token_strs):
+        digests = {token_str: _hash_refresh_secret(token_str) for token_str in token_strs}
+        with self._lock:
+            entries = {token_str: self._refresh.get(digest) for token_str, digest in digests.items()}
+        return {token_str: RefreshTokenState(*entry) for token_str, entry in entries.items() if entry}
+
+    def rotate_refresh_token(self, token_str, expires_at, ip_address=None, user_agent=None):
+        new_token = secrets.token_urlsafe(32)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._purge(now)
+            entry = self._refresh.get(_hash_refresh_secret(token_str))
+            if not entry or entry[2] or entry[1] <= now:
+                return None, None, None
+            entry[2] = True
+            self._add_refresh(_hash_refresh_secret(new_token), entry[0], expires_at, entry[3], entry[4])
+        return new_token, entry[0], entry[4]
+
+    def revoke_refresh_token(self, token_str):
+        with self._lock:
+            entry = self._refresh.get(_hash_refresh_secret(token_str))
+            if not entry:
+                return False
+            entry[2] = True
+        return True
+
+    def _revoke_all(self, digests):
+        for digest in digests:
+            self._refresh[digest][2] = True
+
+    def revoke_refresh_family(self, family_id):
+        with self._lock:
+            self._revoke_all(self._families.get(family_id, ()))
+
+    def revoke_access_token(self, jti, expires_at):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._purge(now)
+            if jti not in self._revoked_access:
+                self._revoked_access[jti] = (expires_at, now)
+                heapq.heappush(self._expiry, (expires_at, 'access', jti))
+
+    def is_access_token_revoked(self, jti):
+        entry = self._revoked_access.get(jti)
+        return entry is not None and entry[0] > datetime.now(timezone.utc)
+
+    def revoked_access_tokens(self, since):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            return [
+                jti for jti, (expires_at, revoked_at) in self._revoked_access.items()
+                if revoked_at >= since and expires_at > now
+            ]
+
+
+class RedisTokenStore(TokenStore):
+    """
+    Tokens in Redis (or anything speaking its protocol) with native TTL expiry
+
+    Every key expires with its token, so no reaper is needed. Rotation and
+    consumption rely on single atomic commands (SET NX, GETDEL), which
+    needs Redis 6.2 or later.
+    """
+    name = 'redis'
+
+    def __init__(self, client, prefix='auth:', access_token_lifetime=3600):
+        self.client = client
+        self.prefix = prefix
+        self.access_token_lifetime = access_token_lifetime
+
+    @classmethod
+    def from_config(cls, config):
+        if redis is None:
+            raise RuntimeError("The redis package is required for TOKEN_STORE=redis")
+        return cls(
+            redis.Redis.from_url(config['TOKEN_STORE_REDIS_URL']),
+            config.get('TOKEN_STORE_PREFIX', 'auth:'),
+            config.get('JWT_ACCESS_TOKEN_EXPIRES', 3600)
+        )
+
+    def _key(self, *parts):
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    @staticmethod
+    def _ttl(expires_at):
+        """Whole seconds until expiry, None if already expired"""
+        seconds = math.ceil((expires_at - datetime.now(timezone.utc)).total_seconds())
+        return seconds if seconds > 0 else None
+
+    @staticmethod
+    def _text(value):
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def put_verification_token(self, user_id, token_type, expires_at):
+        token = secrets.token_urlsafe(32)
+        ttl = self._ttl(expires_at)
+        if ttl is None:
+            return token  # BORN EXPIRED - NOTHING TO STORE
+
+        self.client.set(self._key('verify', token_type, token), user_id, ex=ttl)
+        previous = self.client.set(self._key('verify-user', token_type, user_id), token, ex=ttl, get=True)
+        if previous:
+            self.client.delete(self._key('verify', token_type, self._text(previous)))
+        return token
+
+    def consume_verification_token(self, token, token_type, commit=True):
+        # THE TYPE IS PART OF THE KEY - A WRONG-TYPE LOOKUP MISSES AND LEAVES THE TOKEN ALONE
+        user_id = self.client.getdel(self._key('verify', token_type, token))
+        return int(user_id) if user_id is not None else None
+
+    def _store_refresh(self, digest, user_id, expires_at, family_id, token_version):
+        ttl = self._ttl(expires_at)
+        if ttl is None:
+            return
+        record = json.dumps({"uid": user_id, "fam": family_id, "ver": token_version, "exp": expires_at.timestamp()})
+        self.client.set(self._key('refresh', digest), record, ex=ttl)
+        family_key = self._key('refresh-family', family_id)
+        self.client.sadd(family_key, digest)
+        self.client.expire(family_key, ttl)  # THE NEWEST TOKEN EXPIRES LAST
+
+    def create_refresh_token(self, user_id, expires_at, ip_address=None, user_agent=None, family_id=None, token_version=0):
+        token = secrets.token_urlsafe(32)
+        self._store_refresh(
+            _hash_refresh_secret(token), user_id, expires_at, family_id or secrets.token_hex(16), token_version
+        )
+        return token
+
+    def _load(self, digest):
+        """Read a token record and its revocation marker in one round trip"""
+        record, revoked = self.client.mget([self._key('refresh', digest), self._key('refresh-revoked', digest)])
+        if record is None:
+            return None
+        return self._state(record, revoked)
+
+    def _state(self, record, revoked):
+        data = json.loads(self._text(record))
+        return RefreshTokenState(
+            data['uid'],
+            datetime.fromtimestamp(data['exp'], timezone.utc),
+            revoked is not None,
+            data['fam'],
+            data.get('ver', 0)
+        )
+
+    def get_refresh_token(self, token_str):
+        return self._load(_hash_refresh_secret(token_str))
+
+    def get_refresh_tokens(self, token_strs):
+        token_strs = list(dict.fromkeys(token_strs))
+        if not token_strs:
+            return {}
+        keys = []
+        for token_str in token_strs:
+            digest = _hash_refresh_secret(token_str)
+            keys += [self._key('refresh', digest), self._key('refresh-revoked', digest)]
+        # ONE MGET FOR EVERY RECORD AND REVOCATION MARKER
+        values = self.client.mget(keys)
+        states = {}
+        for i, token_str in enumerate(token_strs):
+            record, revoked = values[2 * i], values[2 * i + 1]
+            if record is not None:
+                states[token_str] = self._state(record, revoked)
+        return states
+
+    def _mark_revoked(self, digest, expires_at, only_if_live=False):
+        ttl = self._ttl(expires_at)
+        if ttl is None:
+            return False
+        return bool(self.client.set(self._key('refresh-revoked', digest), 1, ex=ttl, nx=only_if_live))
+
+    def rotate_refresh_token(self, token_str, expires_at, ip_address=None, user_agent=None):
+        digest = _hash_refresh_secret(token_str)
+        state = self._load(digest)
+        if not state or state.is_revoked:
+            return None, None, None
+
+        # SET NX IS THE COMPARE-AND-SWAP - ONLY ONE CONCURRENT ROTATION WINS
+        if not self._mark_revoked(digest, state.expires_at, only_if_live=True):
+            return None, None, None
+
+        new_token = secrets.token_urlsafe(32)
+        self._store_refresh(
+            _hash_refresh_secret(new_token), state.user_id, expires_at, state.family_id, state.token_version
+        )
+        return new_token, state.user_id, state.token_version
+
+    def revoke_refresh_token(self, token_str):
+        digest = _hash_refresh_secret(token_str)
+        state = self._load(digest)
+        if not state:
+            return False
+        self._mark_revoked(digest, state.expires_at)
+        return True
+
+    def _revoke_members(self, index_key):
+        for digest in self.client.smembers(index_key):
+            digest = self._text(digest)
+            state = self._load(digest)
+            if state and not state.is_revoked:
+                self._mark_revoked(digest, state.expires_at)
+
+    def revoke_refresh_family(self, family_id):
+        self._revoke_members(self._key('refresh-family', family_id))
+
+    def revoke_access_token(self, jti, expires_at):
+        ttl = self._ttl(expires_at)
+        if ttl is None:
+            return
+        now = datetime.now(timezone.utc).timestamp()
+        log_key = self._key('access-revoked-log')
+        self.client.set(self._key('access-revoked', jti), 1, ex=ttl)
+
+        # SORTED BY REVOCATION TIME FOR DENYLIST SYNC; AN ENTRY OLDER THAN THE ACCESS
+        # TOKEN LIFETIME CAN ONLY BELONG TO AN EXPIRED TOKEN
+        self.client.zadd(log_key, {jti: now})
+        self.client.zremrangebyscore(log_key, '-inf', now - self.access_token_lifetime)
+
+    def is_access_token_revoked(self, jti):
+        return self.client.get(self._key('access-revoked', jti)) is not None
+
+    def revoked_access_tokens(self, since):
+        members = self.client.zrangebyscore(self._key('access-revoked-log'), since.timestamp(), '+inf')
+        return [self._text(member) for member in members]
+
+
+# REGISTRY OF STORES BY TOKEN_STORE NAME
+TOKEN_STORES = {store.name: store for store in (SQLTokenStore, MemoryTokenStore, RedisTokenStore)}
+
+
+def init_token_store(app):
+    """Create the token store selected by TOKEN_STORE for an app"""
+    backend = app.config.get('TOKEN_STORE', 'sql')
+    try:
+        store_class = TOKEN_STORES[backend]
+    except KeyError:
+        raise ValueError(f"Unknown token store: {backend}")
+    store = store_class.from_config(app.config)
+    app.extensions['token_store'] = store
+    return store
+
+
+def get_token_store():
+    """Return the token store of the current app"""
+    store = current_app.extensions.get('token_store')
+    if store is None:
+        store = init_token_store(current_app)
+    return store
@@ -0,0 +1,259 @@
+import json
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from models.user_model import db, User
+from utils.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # OPTIONAL DEPENDENCY (redis)
+    redis = None
+
+
+_SNAPSHOT_FIELDS = ['id', 'name', 'email', 'role', 'is_verified', 'created_at', 'updated_at']
+
+
+class UserSnapshot(namedtuple('UserSnapshot', _SNAPSHOT_FIELDS)):
+    """
+    Immutable copy of the public columns of a user
+
+    Safe to share between requests and threads. Never holds the password
+    hash or the token version - those are read fresh where they matter.
+    """
+    __slots__ = ()
+
+    def to_dict(self):
+        """Same shape as User.to_dict"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'role': self.role,
+            'is_verified': self.is_verified,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+# COLUMNS OF A SNAPSHOT, IN FIELD ORDER
+_SNAPSHOT_COLUMNS = [getattr(User, field) for field in _SNAPSHOT_FIELDS]
+
+
+def load_user_snapshot(user_id):
+    """Read a user snapshot from the database (None if the user does not exist)"""
+    row = db.session.execute(select(*_SNAPSHOT_COLUMNS).where(User.id == user_id)).first()
+    return UserSnapshot(*row) if row else None
+
+
+def load_user_snapshot_by_email(email):
+    """Read a user snapshot by email, case-insensitive (None if no user has the email)"""
+    row = db.session.execute(select(*_SNAPSHOT_COLUMNS).where(User.email_matches(email))).first()
+    return UserSnapshot(*row) if row else None
+
+
+class UserCredentials:
+    """
+    What login needs to know about a user, read without the ORM
+
+    No identity map entry, attribute instrumentation or change tracking -
+    just the snapshot plus the two columns that must never be cached.
+    """
+    __slots__ = ('user', 'password_hash', 'token_version')
+
+    def __init__(self, user, password_hash, token_version):
+        self.user = user
+        self.password_hash = password_hash
+        self.token_version = token_version
+
+
+def load_user_credentials(email):
+    """
+    Read a user's snapshot, password hash and token version by email (case-insensitive)
+
+    Returns:
+        UserCredentials or None if no user has the email
+    """
+    row = db.session.execute(
+        select(*_SNAPSHOT_COLUMNS, User.password_hash, User.token_version).where(User.email_matches(email))
+    ).first()
+    if row is None:
+        return None
+    return UserCredentials(UserSnapshot(*row[:-2]), row[-2], row[-1])
+
+
+class UserCache(ABC):
+    """
+    Cache of user snapshots by user ID
+
+    Implementations only store and drop snapshots; reading through to the
+    database is done by get_user_snapshot.
+    """
+    name = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    @abstractmethod
+    def get(self, user_id):
+        """Return a cached snapshot or None"""
+
+    @abstractmethod
+    def set(self, snapshot):
+        """Cache a snapshot"""
+
+    @abstractmethod
+    def forget(self, user_id):
+        """Drop a user's snapshot (after changing the user)"""
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+class LocalUserCache(UserCache):
+    """
+    Per-process LRU + TTL cache
+
+    Writes made through another worker are only seen here once the local
+    entry expires, so keep USER_CACHE_TTL short.
+    """
+    name = 'local'
+
+    def __init__(self, maxsize=10000, ttl=30):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('USER_CACHE_SIZE', 10000), config.get('USER_CACHE_TTL', 30))
+
+    def get(self, user_id):
+        return self._cache.get(user_id)
+
+    def set(self, snapshot):
+        self._cache.set(snapshot.id, snapshot)
+
+    def forget(self, user_id):
+        self._cache.pop(user_id)
+
+    def stats(self):
+        return dict(self._cache.stats(), backend=self.name)
+
+
+class RedisUserCache(UserCache):
+    """
+    Cache shared by every worker in Redis
+
+    A write invalidates the snapshot for all workers at once, at the cost
+    of a round trip per lookup (still one key read instead of a query).
+    """
+    name = 'redis'
+
+    def __init__(self, client, prefix='auth:', ttl=30):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config):
+        if redis is None:
+            raise RuntimeError("The redis package is required for USER_CACHE=redis")
+        return cls(
+            redis.Redis.from_url(config.get('USER_CACHE_REDIS_URL') or config['TOKEN_STORE_REDIS_URL']),
+            config.get('TOKEN_STORE_PREFIX', 'auth:'),
+            config.get('USER_CACHE_TTL', 30)
+        )
+
+    def _key(self, user_id):
+        return f"{self.prefix}user:{user_id}"
+
+    def get(self, user_id):
+        value = self.client.get(self._key(user_id))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        data = json.loads(value)
+        for field in ('created_at', 'updated_at'):
+            if data[field]:
+                data[field] = datetime.fromisoformat(data[field])
+        return UserSnapshot(**data)
+
+    def set(self, snapshot):
+        self.client.set(self._key(snapshot.id), json.dumps(snapshot._asdict(), default=datetime.isoformat), ex=self.ttl)
+
+    def forget(self, user_id):
+        self.client.delete(self._key(user_id))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+USER_CACHES = {cache.name: cache for cache in (LocalUserCache, RedisUserCache)}
+
+
+def init_user_cache(app):
+    """
+    Create the user cache selected by USER_CACHE for an app
+
+    Returns:
+        UserCache or None if USER_CACHE_ENABLED is off
+    """
+    if not app.config.get('USER_CACHE_ENABLED', True):
+        app.extensions['user_cache'] = None
+        return None
+    backend = app.config.get('USER_CACHE', 'local')
+    try:
+        cache_class = USER_CACHES[backend]
+    except KeyError:
+        raise ValueError(f"Unknown user cache: {backend}")
+    cache = cache_class.from_config(app.config)
+    app.extensions['user_cache'] = cache
+    return cache
+
+
+def get_user_cache():
+    """Return the user cache of the current app (None if disabled)"""
+    if 'user_cache' not in current_app.extensions:
+        return init_user_cache(current_app)
+    return current_app.extensions['user_cache']
+
+
+def get_user_snapshot(user_id):
+    """
+    Read-through lookup of a user snapshot
+
+    Args:
+        user_id: The user's ID
+
+    Returns:
+        UserSnapshot or None if the user does not exist
+    """
+    cache = get_user_cache()
+    if cache is None:
+        return load_user_snapshot(user_id)
+
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        snapshot = load_user_snapshot(user_id)
+        if snapshot is not None:
+            cache.set(snapshot)
+    return snapshot
+
+
+def forget_user(user_id):
+    """Drop a user's cached snapshot - call after every committed change to the user"""
+    cache = get_user_cache()
+    if cache is not None:
+        cache.forget(user_id)
@@ -1,26 +1,74 @@
 import bcrypt
-import re
+import time
+from utils.password_hashers import get_hasher, identify_hasher
+from utils.password_policy import PasswordPolicy
 
-def hash_password(password):
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# BUILT-IN RULES (NO BREACHED PASSWORD FILTER) WHEN NO APP POLICY IS GIVEN
+DEFAULT_PASSWORD_POLICY = PasswordPolicy()
+
+def hash_password(password, algorithm='bcrypt', params=None):
+    """
+    Hash password with a registered algorithm
+    
+    Args:
+        password: The plaintext password
+        algorithm: 'bcrypt', 'scrypt' or 'argon2id'
+        params: Algorithm parameters (e.g. {'rounds': 12} for bcrypt)
+    
+    Returns:
+        str: The encoded hash, prefixed with its algorithm identifier
+    """
+    return get_hasher(algorithm).hash(password, **(params or {}))
+
+def normalize_email(email):
+    """
+    Canonical form of an email address, used for storage and lookups
+    
+    Lowercased as a whole: mail providers treat the local part
+    case-insensitively in practice, so "Foo@x.com" and "foo@x.com" must be
+    the same account (enforced by the unique lower(email) index on users).
+    """
+    return email.strip().lower()
 
 def check_password(password, password_hash):
-    """Verify password against stored hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    """Verify password against stored hash (algorithm detected from the hash prefix)"""
+    hasher = identify_hasher(password_hash)
+    if hasher is None:
+        return False
+    return hasher.verify(password, password_hash)
+
+def needs_rehash(password_hash, algorithm='bcrypt', params=None):
+    """Check if a stored hash uses another algorithm or different parameters"""
+    hasher = identify_hasher(password_hash)
+    if hasher is None or hasher.algorithm != algorithm:
+        return True
+    return hasher.needs_rehash(password_hash, **(params or {}))
+
+def calibrate_bcrypt_rounds(target_ms=250, min_rounds=10, max_rounds=16):
+    """
+    Find the highest bcrypt cost factor that hashes within target_ms on this machine
+    
+    Args:
+        target_ms: Target hashing latency in milliseconds
+        min_rounds: Lowest cost factor ever returned
+        max_rounds: Highest cost factor ever returned
+    
+    Returns:
+        int: The calibrated cost factor
+    """
+    rounds = min_rounds
+    while rounds < max_rounds:
+        # EACH EXTRA ROUND DOUBLES THE COST, SO STOP BEFORE THE NEXT ONE OVERSHOOTS
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', bcrypt.gensalt(rounds=rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms * 2 > target_ms:
+            break
+        rounds += 1
+    return rounds
 
-def validate_password_strength(password):
+def validate_password_strength(password, policy=None):
     """Validate password strength
     Returns (is_valid, message)
     """
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters"    
-    if not re.search(r'[A-Z]', password):
-        return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
-        return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'[0-9]', password):
-        return False, "Password must contain at least one digit"
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        return False, "Password must contain at least one special character"
-    return True, None
\ No newline at end of file
+    return (policy or DEFAULT_PASSWORD_POLICY).validate(password)
\ No newline at end of file